@@ -0,0 +1,34 @@
+"""다나와 카테고리 크롤러
+
+test.py(스펙, 가격, 제목, 가격추이)와 merged_crawler.py(제목과 스펙만)는 이 패키지의 main을 부르는 실행 파일이다.
+core(로그/시간 예산/재시도) → extract(상세 추출기) → browser, listing → normalize, storage → crawler(수집 패스)
+→ daemon, scheduler(배치/분산) → cli 순으로 아래 모듈만 가져다 쓴다.
+"""
+from danawa_crawler.analytics import analyze_price_trends
+from danawa_crawler.cli import main
+from danawa_crawler.core import BlockedPageError, SuspectPageError
+from danawa_crawler.crawler import crawl_category
+from danawa_crawler.extract import (
+    EXTRACTORS,
+    ExtractPlan,
+    decode_price_trend,
+    encode_price_trend,
+    register_extractor,
+)
+from danawa_crawler.scheduler import crawl_batch
+from danawa_crawler.storage import reparse_archive
+
+__all__ = [
+    "BlockedPageError",
+    "EXTRACTORS",
+    "ExtractPlan",
+    "analyze_price_trends",
+    "crawl_batch",
+    "crawl_category",
+    "decode_price_trend",
+    "encode_price_trend",
+    "main",
+    "register_extractor",
+    "reparse_archive",
+    "SuspectPageError",
+]
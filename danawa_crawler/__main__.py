@@ -0,0 +1,4 @@
+from danawa_crawler.cli import main
+
+if __name__ == "__main__":
+    main()
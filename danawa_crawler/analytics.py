@@ -0,0 +1,224 @@
+"""가격추이 CSV 분석"""
+import array
+import csv
+import datetime
+import os
+import re
+import time
+from typing import Dict, List, Optional, Tuple, Any
+
+from danawa_crawler.core import log
+from danawa_crawler.extract import decode_price_trend, TrendData
+from danawa_crawler.storage import open_output_text, output_chunk_paths
+
+
+TREND_LABEL_PATTERN = re.compile(r"^(\d{2,4})[./-](\d{1,2})(?:[./-](\d{1,2}))?\.?$")
+PRICE_STATS_FIELDNAMES = ["카테고리", "상품명", "URL", "관측수", "현재가", "최저", "최고", "평균", "변동성(%)"]
+PRICE_CATEGORY_FIELDNAMES = ["카테고리", "상품수", "추이있음", "평균현재가", "평균변동성(%)"]
+
+
+def price_analytics_paths(output_csv: str) -> Tuple[str, str]:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}_price_stats.csv", f"{root}_price_categories.csv"
+
+
+def _trend_label_date(label: str, year: int) -> Optional[datetime.date]:
+    """가격추이 라벨(YYYY.MM.DD, YY.MM.DD, MM.DD, YY.MM)을 날짜로 (연도가 없으면 year 사용)"""
+    match = TREND_LABEL_PATTERN.match(label)
+    if not match:
+        return None
+    first, second, third = match.groups()
+    try:
+        if third is not None:
+            full_year = int(first) if len(first) == 4 else 2000 + int(first)
+            return datetime.date(full_year, int(second), int(third))
+        if len(first) == 4 or int(first) > 12:
+            return datetime.date(int(first) if len(first) == 4 else 2000 + int(first), int(second), 1)
+        return datetime.date(year, int(first), int(second))
+    except ValueError:
+        return None
+
+
+def _trend_label_offsets(labels: Tuple[str, ...]) -> Optional[List[int]]:
+    """시간순 라벨들을 마지막 라벨로부터 며칠 전인지로 바꿈 (날짜로 읽을 수 없으면 None)
+
+    연도 없는 MM.DD 라벨은 뒤에서부터 거꾸로 읽으며 날짜가 뒤로 가지 않도록 연도를 하나씩 내린다.
+    윤년 2월 29일이 들어가도 되도록 기준 연도는 윤년으로 둔다.
+    """
+    year = 2024
+    dates: List[datetime.date] = []
+    for label in reversed(labels):
+        date = _trend_label_date(label, year)
+        if date is None:
+            return None
+        if dates and date > dates[-1]:
+            year -= 1
+            date = _trend_label_date(label, year)
+            if date is None or date > dates[-1]:
+                return None
+        dates.append(date)
+    latest = dates[0]
+    return [(latest - date).days for date in reversed(dates)]
+
+
+def _trend_points(
+    trend_data: TrendData,
+    offsets_cache: Dict[Tuple[str, ...], Optional[List[int]]],
+) -> Dict[int, int]:
+    """모든 기간의 가격추이를 {며칠 전: 가격}으로 합침 (같은 날은 촘촘한 짧은 기간 값을 우선)
+
+    날짜로 읽을 수 없는 라벨이면 점이 가장 많은 기간 하나만 하루 간격으로 본다.
+    """
+    points: Dict[int, int] = {}
+    fallback: List[Dict[str, Optional[int]]] = []
+    for series in sorted(trend_data.values(), key=len):
+        labels = tuple(point["label"] for point in series)
+        if labels not in offsets_cache:
+            offsets_cache[labels] = _trend_label_offsets(labels)
+        offsets = offsets_cache[labels]
+        if offsets is None:
+            if len(series) > len(fallback):
+                fallback = series
+            continue
+        for offset, point in zip(offsets, series):
+            if point["price"] is not None:
+                points.setdefault(offset, point["price"])
+    if not points:
+        last = len(fallback) - 1
+        points = {last - i: point["price"] for i, point in enumerate(fallback) if point["price"] is not None}
+    return points
+
+
+def analyze_price_trends(
+    output_csv: str,
+    change_weeks: Tuple[int, ...] = (1, 4, 12),
+    window_days: int = 365,
+) -> Tuple[str, str]:
+    """크롤링 결과의 가격추이를 (상품 × 며칠 전) NumPy 행렬로 모아 상품별/카테고리별 통계를 기록
+
+    가격추이 열만 한 번 디코드해 (행, 열, 가격) 배열에 쌓고 행렬에 한 번에 흩뿌린다. 최저/최고/평균과
+    변동성(표준편차/평균)은 관측점 배열에서, N주 전 대비 변화율은 행렬에서, 카테고리 집계는 bincount로
+    모두 배열 연산으로 계산한다.
+    N주 전 가격은 그날 또는 그 이전의 가장 최근 관측값이다. 압축/분할 출력이면 매니페스트의 조각들을 읽는다.
+    결과 파일 두 개의 경로를 돌려준다.
+    """
+    import numpy as np
+
+    started = time.perf_counter()
+    offsets_cache: Dict[Tuple[str, ...], Optional[List[int]]] = {}
+    categories: List[str] = []
+    titles: List[str] = []
+    urls: List[str] = []
+    rows = array.array("i")
+    cols = array.array("i")
+    prices = array.array("i")
+    for path in output_chunk_paths(output_csv):
+        with open_output_text(path) as f:
+            reader = csv.DictReader(f)
+            if "가격추이" not in (reader.fieldnames or []):
+                raise ValueError(f"가격추이 열이 없는 파일입니다(긴 형식은 지원하지 않음): {path}")
+            for row in reader:
+                index = len(urls)
+                categories.append(row.get("카테고리", ""))
+                titles.append(row["상품명"])
+                urls.append(row["URL"])
+                for offset, price in _trend_points(decode_price_trend(row["가격추이"]), offsets_cache).items():
+                    if offset <= window_days:
+                        rows.append(index)
+                        cols.append(offset)
+                        prices.append(price)
+
+    count = len(urls)
+    point_rows = np.frombuffer(rows, dtype=np.int32)
+    point_cols = np.frombuffer(cols, dtype=np.int32)
+    point_prices = np.frombuffer(prices, dtype=np.int32).astype(np.float64)
+    matrix = np.zeros((count, window_days + 1), dtype=np.int32)
+    observed = np.zeros((count, window_days + 1), dtype=bool)
+    matrix[point_rows, point_cols] = point_prices
+    observed[point_rows, point_cols] = True
+    observations = np.bincount(point_rows, minlength=count)
+    has_trend = observations > 0
+    product_rows = np.arange(count)
+
+    def price_as_of(days_ago: int) -> Any:
+        """각 상품의 days_ago일 전 또는 그 이전 가장 최근 관측 가격 (없으면 NaN)"""
+        window = observed[:, days_ago:]
+        first = window.argmax(axis=1)
+        return np.where(window.any(axis=1), matrix[product_rows, days_ago + first].astype(np.float64), np.nan)
+
+    safe_observations = np.maximum(observations, 1)
+    mean = np.where(has_trend, np.bincount(point_rows, weights=point_prices, minlength=count) / safe_observations, np.nan)
+    deviations = (point_prices - mean[point_rows]) ** 2
+    std = np.sqrt(np.bincount(point_rows, weights=deviations, minlength=count) / safe_observations)
+    lowest = np.full(count, np.inf)
+    highest = np.full(count, -np.inf)
+    np.minimum.at(lowest, point_rows, point_prices)
+    np.maximum.at(highest, point_rows, point_prices)
+    lowest[~has_trend] = np.nan
+    highest[~has_trend] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volatility = np.where(mean > 0, std / mean * 100, np.nan)
+        current = price_as_of(0)
+        changes = {
+            weeks: (current / price_as_of(weeks * 7) - 1) * 100 for weeks in change_weeks if weeks * 7 <= window_days
+        }
+
+    def column(values: Any, digits: int = 2) -> List[str]:
+        return np.where(np.isnan(values), "", np.char.mod(f"%.{digits}f", np.nan_to_num(values))).tolist()
+
+    stats_path, categories_path = price_analytics_paths(output_csv)
+    change_names = [f"{weeks}주변화(%)" for weeks in changes]
+    with open(stats_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(PRICE_STATS_FIELDNAMES + change_names)
+        writer.writerows(zip(
+            categories,
+            titles,
+            urls,
+            observations.tolist(),
+            column(current, 0),
+            column(lowest, 0),
+            column(highest, 0),
+            column(mean, 0),
+            column(volatility),
+            *(column(change) for change in changes.values()),
+        ))
+
+    names, group = np.unique(np.array(categories, dtype=object).astype(str), return_inverse=True)
+    groups = len(names)
+
+    def group_mean(values: Any) -> Any:
+        valid = ~np.isnan(values)
+        totals = np.bincount(group, weights=np.where(valid, values, 0.0), minlength=groups)
+        counts = np.bincount(group, weights=valid, minlength=groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, totals / counts, np.nan)
+
+    def group_share(flags: Any, valid: Any) -> Any:
+        counts = np.bincount(group, weights=valid, minlength=groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(counts > 0, np.bincount(group, weights=flags & valid, minlength=groups) / counts * 100, np.nan)
+
+    with open(categories_path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            PRICE_CATEGORY_FIELDNAMES
+            + [name for weeks in changes for name in (f"평균{weeks}주변화(%)", f"{weeks}주하락비율(%)")]
+        )
+        writer.writerows(zip(
+            names.tolist(),
+            np.bincount(group, minlength=groups).tolist(),
+            np.bincount(group, weights=has_trend, minlength=groups).astype(int).tolist(),
+            column(group_mean(current), 0),
+            column(group_mean(volatility)),
+            *(
+                values
+                for change in changes.values()
+                for values in (column(group_mean(change)), column(group_share(change < 0, ~np.isnan(change))))
+            ),
+        ))
+    log.info(
+        f"\n[가격 분석 완료] 상품 {count}개(추이 있음 {int(has_trend.sum())}개), 카테고리 {groups}개, "
+        f"{time.perf_counter() - started:.1f}초: {stats_path}, {categories_path}"
+    )
+    return stats_path, categories_path
@@ -0,0 +1,141 @@
+"""브라우저 실행 프로필과 컨텍스트, 주기적으로 새로 띄우는 BrowserSession"""
+from typing import Dict, Optional, Any
+
+from playwright.sync_api import Playwright, BrowserContext
+
+from danawa_crawler.core import log, MemoryMonitor
+from danawa_crawler.extract import install_fused_extract
+
+
+LEAN_CHROMIUM_ARGS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-gpu",
+    "--no-first-run",
+    "--mute-audio",
+    "--metrics-recording-only",
+    "--disable-site-isolation-trials",
+    "--renderer-process-limit=2",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+]
+
+# default: 기존 설정 그대로 / lean: 대량 수집용 (백그라운드 네트워크, GPU, 확장 끔, 렌더러 프로세스 수 제한,
+# 작은 뷰포트, 이미지/폰트/미디어 차단) / nojs: lean + 페이지 JS 끔 — 목록 전용 수집과 가격 갱신처럼
+# 가격추이 그래프(echarts)가 필요 없는 페이지용. 어느 쪽이 맞는지는 --benchmark-profiles로 확인한다.
+LAUNCH_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "args": [],
+        "viewport": {"width": 1366, "height": 800},
+        "java_script_enabled": True,
+        "block_resources": False,
+    },
+    "lean": {
+        "args": LEAN_CHROMIUM_ARGS,
+        "viewport": {"width": 1024, "height": 700},
+        "java_script_enabled": True,
+        "block_resources": True,
+    },
+    "nojs": {
+        "args": LEAN_CHROMIUM_ARGS,
+        "viewport": {"width": 1024, "height": 700},
+        "java_script_enabled": False,
+        "block_resources": True,
+    },
+}
+
+
+def profile_runs_scripts(profile: str) -> bool:
+    """프로필이 페이지 JS를 켜는지 — 꺼져 있으면 목록의 movePage로 페이지를 옮길 수 없다"""
+    return bool(LAUNCH_PROFILES[profile]["java_script_enabled"])
+
+
+def block_heavy_resources(context: BrowserContext) -> None:
+    """가격만 읽을 때는 이미지/폰트/미디어 요청을 막아 페이지 로드를 줄임"""
+    def handle(route: Any) -> None:
+        if route.request.resource_type in ("image", "font", "media"):
+            route.abort()
+        else:
+            route.continue_()
+
+    context.route("**/*", handle)
+
+
+def open_new_context(playwright: Playwright, headless: bool, profile: str = "default") -> BrowserContext:
+    settings = LAUNCH_PROFILES[profile]
+    chromium = playwright.chromium
+    browser = chromium.launch(headless=headless, args=settings["args"])
+    user_agent = (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0.0.0 Safari/537.36"
+    )
+    context = browser.new_context(
+        user_agent=user_agent,
+        viewport=settings["viewport"],
+        locale="ko-KR",
+        timezone_id="Asia/Seoul",
+        device_scale_factor=1.0,
+        has_touch=False,
+        java_script_enabled=settings["java_script_enabled"],
+    )
+    if settings["block_resources"]:
+        block_heavy_resources(context)
+    install_fused_extract(context)
+    return context
+
+
+class BrowserSession:
+    """브라우저/컨텍스트 하나를 소유하고, 오래 돌 때 메모리가 쌓이지 않도록 주기적으로 새로 띄움
+
+    recycle_every개 상품마다, 또는 브라우저 프로세스 RSS 합계가 max_browser_mb를 넘으면
+    브라우저를 닫고 같은 프로필로 다시 연다. 큐에 남은 작업은 파이썬 쪽에 있으므로 잃지 않고,
+    호출한 쪽은 product_done()이 True를 돌려줄 때 열어 둔 페이지만 새 context에서 다시 열면 된다.
+    """
+
+    def __init__(
+        self,
+        playwright: Playwright,
+        headless: bool,
+        profile: str = "default",
+        recycle_every: int = 0,
+        max_browser_mb: float = 0.0,
+        monitor: Optional[MemoryMonitor] = None,
+    ) -> None:
+        self.playwright = playwright
+        self.headless = headless
+        self.profile = profile
+        self.recycle_every = recycle_every
+        self.max_browser_mb = max_browser_mb
+        self.monitor = monitor if monitor is not None else MemoryMonitor()
+        self.products = 0
+        self.recycles = 0
+        self.context = open_new_context(playwright, headless=headless, profile=profile)
+
+    def product_done(self) -> bool:
+        """상품 하나를 처리한 뒤 호출. 브라우저를 새로 띄웠으면 True"""
+        self.products += 1
+        _, browser_rss = self.monitor.sample()
+        if self.recycle_every and self.products >= self.recycle_every:
+            self.recycle(f"상품 {self.products}개 처리")
+            return True
+        if self.max_browser_mb and browser_rss and browser_rss > self.max_browser_mb * 1024 * 1024:
+            self.recycle(f"브라우저 RSS {browser_rss / (1024 * 1024):.0f}MB")
+            return True
+        return False
+
+    def recycle(self, reason: str) -> None:
+        log.info(f"  [브라우저 재시작] {reason} — 새 브라우저로 교체합니다.")
+        self.close()
+        self.context = open_new_context(self.playwright, headless=self.headless, profile=self.profile)
+        self.products = 0
+        self.recycles += 1
+
+    def close(self) -> None:
+        try:
+            self.context.browser.close()
+        except Exception:
+            pass
@@ -0,0 +1,466 @@
+"""명령행 인자와 모드 선택, 실행 프로필 벤치마크"""
+import argparse
+import atexit
+import importlib.util
+import time
+from typing import Dict, List, Any
+
+from playwright.sync_api import sync_playwright
+
+from danawa_crawler.core import (
+    browser_memory_bytes,
+    log,
+    LOG_LEVELS,
+    run_profiler,
+    setup_logging,
+    wait_for_network_idle,
+)
+from danawa_crawler.extract import (
+    block_monitor,
+    DEFAULT_EXTRACTORS,
+    EXTRACTORS,
+    ExtractPlan,
+    fetch_product_detail,
+    selector_memory,
+)
+from danawa_crawler.browser import LAUNCH_PROFILES, open_new_context
+from danawa_crawler.listing import collect_list_items_from_category
+from danawa_crawler.storage import OUTPUT_COMPRESSIONS, reparse_archive
+from danawa_crawler.analytics import analyze_price_trends
+from danawa_crawler.crawler import crawl_category, crawl_list_only, refresh_prices
+from danawa_crawler.daemon import serve_daemon
+from danawa_crawler.scheduler import BatchCategory, coordinate_distributed, crawl_batch, load_batch_file, run_crawl_node
+
+
+def _detail_matches(detail: Dict[str, Any], reference: Dict[str, Any]) -> bool:
+    """기준 프로필과 같은 결과를 냈는지: 제목, 스펙 키, 가격, 가격추이 유무"""
+    return (
+        detail.get("title") == reference.get("title")
+        and set(detail.get("specs") or {}) == set(reference.get("specs") or {})
+        and detail.get("min_price") == reference.get("min_price")
+        and detail.get("max_price") == reference.get("max_price")
+        and bool(detail.get("price_trend")) == bool(reference.get("price_trend"))
+    )
+
+
+def benchmark_launch_profiles(
+    category_url: str,
+    profiles: List[str],
+    headless: bool,
+    sample_size: int = 5,
+    open_pages: int = 4,
+    base_delay_ms: int = 0,
+) -> List[Dict[str, Any]]:
+    """실행 프로필별로 처리량과 메모리를 재고, default 프로필과 추출 결과가 같은지 확인
+
+    프로필마다 브라우저를 새로 띄워 첫 목록 페이지를 수집하고(목록 상품 수), 같은 상품 sample_size개의
+    상세 페이지를 순서대로 추출해 초당 페이지 수를 잰다. 그 다음 open_pages개 탭을 동시에 열어 둔 상태의
+    브라우저 RSS 증가분을 탭 수로 나눠 페이지당 메모리로 보고한다.
+    """
+    if "default" in profiles:
+        profiles = ["default"] + [name for name in profiles if name != "default"]
+    else:
+        profiles = ["default"] + profiles
+    links: List[str] = []
+    reference: Dict[str, Dict[str, Any]] = {}
+    results: List[Dict[str, Any]] = []
+
+    for profile in profiles:
+        log.info(f"\n=== 프로필 벤치마크: {profile} ===")
+        with sync_playwright() as p:
+            before_launch = browser_memory_bytes()
+            context = open_new_context(p, headless=headless, profile=profile)
+            try:
+                page = context.new_page()
+                page.set_default_timeout(10000)
+                started = time.perf_counter()
+                page.goto(category_url)
+                wait_for_network_idle(page)
+                items = collect_list_items_from_category(page, None)
+                list_seconds = time.perf_counter() - started
+                page.close()
+                if not links:
+                    links = [item["URL"] for item in items[:sample_size]]
+
+                matched = 0
+                started = time.perf_counter()
+                for link in links:
+                    try:
+                        detail = fetch_product_detail(context, link, base_delay_ms)
+                    except Exception as e:
+                        log.warning(f"  상세 추출 실패 ({link}): {e}")
+                        continue
+                    if profile == "default":
+                        reference[link] = detail
+                    if link in reference and _detail_matches(detail, reference[link]):
+                        matched += 1
+                detail_seconds = time.perf_counter() - started
+
+                idle_memory = browser_memory_bytes()
+                tabs = []
+                for link in (links * open_pages)[:open_pages]:
+                    tab = context.new_page()
+                    try:
+                        tab.goto(link, wait_until="domcontentloaded", timeout=15000)
+                    except Exception:
+                        pass
+                    tabs.append(tab)
+                loaded_memory = browser_memory_bytes()
+                for tab in tabs:
+                    tab.close()
+            finally:
+                context.browser.close()
+
+        per_page_mb = None
+        browser_mb = None
+        if idle_memory is not None and loaded_memory is not None and tabs:
+            per_page_mb = (loaded_memory - idle_memory) / len(tabs) / (1024 * 1024)
+        if idle_memory is not None and before_launch is not None:
+            browser_mb = (idle_memory - before_launch) / (1024 * 1024)
+        result = {
+            "profile": profile,
+            "list_items": len(items),
+            "list_seconds": list_seconds,
+            "pages_per_sec": len(links) / detail_seconds if detail_seconds > 0 else 0.0,
+            "rss_per_page_mb": per_page_mb,
+            "browser_rss_mb": browser_mb,
+            "matched": matched,
+            "sampled": len(links),
+        }
+        results.append(result)
+
+    log.info(f"\n{'프로필':<10}{'목록상품':>8}{'목록(초)':>10}{'상세/초':>10}{'탭당MB':>10}{'브라우저MB':>12}{'일치':>8}")
+    for result in results:
+        per_page = f"{result['rss_per_page_mb']:.1f}" if result["rss_per_page_mb"] is not None else "-"
+        browser = f"{result['browser_rss_mb']:.1f}" if result["browser_rss_mb"] is not None else "-"
+        log.info(
+            f"{result['profile']:<10}{result['list_items']:>8}{result['list_seconds']:>10.2f}"
+            f"{result['pages_per_sec']:>10.2f}{per_page:>10}{browser:>12}"
+            f"{result['matched']:>5}/{result['sampled']}"
+        )
+    return results
+
+
+def parse_args(default_extract: str = DEFAULT_EXTRACTORS) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Danawa category crawler -> CSV")
+    parser.add_argument("--category-url", help="Danawa category URL (list view)")
+    parser.add_argument("--output", default="danawa_output.csv", help="Output CSV filepath")
+    parser.add_argument("--pages", type=int, default=1, help="Max pages to crawl")
+    parser.add_argument("--items-per-page", type=int, default=0, help="Max items per page (0 for all)")
+    parser.add_argument("--headless", action="store_true", help="Run browser headless")
+    parser.add_argument("--max-total-items", type=int, default=0, help="Stop after N items across pages (0=unlimited)")
+    parser.add_argument("--delay-ms", type=int, default=1000, help="Base human-like delay in ms (기본값: 1000ms)")
+    parser.add_argument("--long-format", action="store_true", help="Export as rows: 상품명,URL,key,value")
+    parser.add_argument("--seen-store", help="Persistent pcode store; products already in it are skipped and new ones added")
+    parser.add_argument("--seen-bloom", action="store_true", help="Keep a Bloom filter next to --seen-store for the new-product check")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Attempts per product before it is reported as failed (기본값: 3)")
+    parser.add_argument("--retry-backoff", type=float, default=5.0, help="First retry delay in seconds, doubled per attempt (기본값: 5)")
+    parser.add_argument("--breaker-threshold", type=float, default=0.5, help="Pause the host when the recent failure rate reaches this (기본값: 0.5)")
+    parser.add_argument("--breaker-cooldown", type=float, default=60.0, help="Seconds to pause the host once the breaker trips (기본값: 60)")
+    parser.add_argument("--launch-profile", choices=sorted(LAUNCH_PROFILES), default="default", help="Chromium launch profile: default, lean (bulk crawling) or nojs (list/price pages only)")
+    parser.add_argument("--recycle-every", type=int, default=0, help="Restart the browser after N products to cap memory (0=never)")
+    parser.add_argument("--max-browser-mb", type=float, default=0.0, help="Restart the browser when browser RSS exceeds this many MB (0=no limit)")
+    parser.add_argument("--selector-memory", help="JSON file remembering which selector variants match per category/layout")
+    parser.add_argument("--benchmark-profiles", help="Comma-separated launch profiles to benchmark on --category-url (or 'all'), then exit")
+    parser.add_argument("--benchmark-samples", type=int, default=5, help="Detail pages per profile in --benchmark-profiles (기본값: 5)")
+    parser.add_argument("--benchmark-open-pages", type=int, default=4, help="Tabs held open for the per-page RSS measurement (기본값: 4)")
+    parser.add_argument("--list-only", action="store_true", help="Only harvest list pages (pcode,상품명,URL,목록가,스펙요약); no detail pages")
+    parser.add_argument("--refresh-prices", help="Watchlist of pcodes/URLs (or a previous output CSV) to re-check prices only")
+    parser.add_argument("--changes-output", default="price_changes.csv", help="CSV that price refresh appends changed prices to")
+    parser.add_argument("--price-state", default="price_state.json", help="Last known prices per pcode for --refresh-prices")
+    parser.add_argument("--refresh-interval", type=float, default=60.0, help="Minutes between price refresh rounds, jittered ±10%% (기본값: 60)")
+    parser.add_argument("--refresh-rounds", type=int, default=1, help="Price refresh rounds to run (0=until stopped)")
+    parser.add_argument("--delta-state", help="Per-pcode field hashes of the previous run; compared and replaced after this run")
+    parser.add_argument("--archive", help="Directory to append raw per-product snapshots to (compressed, indexed by pcode) for offline --reparse")
+    parser.add_argument("--reparse", help="Rebuild --output from an --archive directory with the current normalization rules; no browser")
+    parser.add_argument("--reparse-workers", type=int, default=0, help="Processes for --reparse (0=CPU count)")
+    parser.add_argument(
+        "--extract",
+        default=default_extract,
+        help=f"Comma-separated detail extractors ({', '.join(EXTRACTORS)}) or 'all'; disabled ones cost no clicks or waits (기본값: {default_extract})",
+    )
+    parser.add_argument("--trend-periods", help="Only read these 가격추이 periods (data-attr values, e.g. 1,3); default all")
+    parser.add_argument(
+        "--no-fused-extract",
+        dest="fused_extract",
+        action="store_false",
+        help="Run each extractor with its own page calls instead of the single injected per-product evaluate",
+    )
+    parser.add_argument("--block-window", type=int, default=20, help="Recent products in the empty-spec window used to warn about silent blocking (기본값: 20)")
+    parser.add_argument(
+        "--block-empty-ratio",
+        type=float,
+        default=0.8,
+        help="Warn once this share of the window has empty specs; empty-spec rows are held for one retry until a block is confirmed or ruled out. Only status/redirect/captcha markers pause (0=no empty-spec handling) (기본값: 0.8)",
+    )
+    parser.add_argument("--block-pause", type=float, default=120.0, help="Seconds to pause all workers on the first block; doubles on repeats (기본값: 120)")
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), default="info", help="Log verbosity; page recovery/navigation chatter is debug (기본값: info)")
+    parser.add_argument("--log-json", action="store_true", help="Write one JSON object per log line (ts, level, thread, msg, pcode, cid, ...)")
+    parser.add_argument("--log-file", help="Write logs to this file instead of stdout")
+    parser.add_argument("--profile-dir", help="Opt-in profiling: write cProfile stats, per-product timings and Playwright traces to a run-<time>/ directory here")
+    parser.add_argument("--profile-slow-s", type=float, default=10.0, help="With --profile-dir: save a Playwright trace for products slower than this many seconds (기본값: 10)")
+    parser.add_argument("--profile-sample", type=float, default=0.01, help="With --profile-dir: also trace this fraction of products at random (기본값: 0.01)")
+    parser.add_argument("--profile-tracemalloc-every", type=int, default=0, help="With --profile-dir: tracemalloc snapshot every N products (0=off)")
+    parser.add_argument("--compress", choices=list(OUTPUT_COMPRESSIONS), default="none", help="Stream-compress result CSVs (zstd needs the zstandard package)")
+    parser.add_argument("--rotate-rows", type=int, default=0, help="Start a new result chunk file every N products; chunks are listed in <output>.manifest.json (0=off)")
+    parser.add_argument("--rotate-mb", type=float, default=0.0, help="Start a new result chunk file once the current one reaches this many MB on disk (0=off)")
+    parser.add_argument("--analyze", action="store_true", help="After the crawl, write NumPy price-trend stats next to --output (<output>_price_stats.csv, <output>_price_categories.csv)")
+    parser.add_argument("--analyze-csv", help="Only run the price-trend analysis on an existing wide-format output CSV, then exit")
+    parser.add_argument("--analyze-weeks", default="1,4,12", help="Comma-separated N-week price changes for the analysis (기본값: 1,4,12)")
+    parser.add_argument("--delta-output", help="Delta CSV of added/removed/changed products (기본값: <output>_delta.csv)")
+    parser.add_argument("--product-deadline", type=float, default=0.0, help="Total seconds per product shared by all stages; late stages are cut and flagged in 부분수집 (0=off)")
+    parser.add_argument("--batch", help="CSV of categories (category_url[,pages,items_per_page,max_total_items,output])")
+    parser.add_argument("--queue", help="Shared SQLite work queue file for distributed crawling (--coordinate / --node)")
+    parser.add_argument("--coordinate", action="store_true", help="Seed --queue from --batch or --category-url, wait for nodes, then export")
+    parser.add_argument("--seed-only", action="store_true", help="With --coordinate: only seed the queue and exit")
+    parser.add_argument("--node", action="store_true", help="Run as a crawler node pulling work from --queue until it is drained")
+    parser.add_argument("--node-id", help="Node name recorded with leases and results (기본값: hostname-pid)")
+    parser.add_argument("--lease-seconds", type=float, default=120.0, help="Work lease length; renewed by heartbeat while working (기본값: 120)")
+    parser.add_argument("--batch-output-dir", help="Write one CSV per batch category into this directory (기본값: --output 하나로 합침)")
+    parser.add_argument("--workers", type=int, default=2, help="Worker browsers for --batch and for list-page fan-out in single-category and --list-only crawls (기본값: 2)")
+    parser.add_argument("--rate", type=float, default=1.0, help="Request rate limit per second shared by all workers; list pages only in single-category crawls (기본값: 1.0)")
+    parser.add_argument("--serve", action="store_true", help="Run as a daemon accepting crawl jobs over HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="Daemon bind address (기본값: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Daemon port (기본값: 8765)")
+    parser.add_argument("--serve-output-dir", default=".", help="Directory that daemon job 'output' paths are resolved under (기본값: .)")
+    args = parser.parse_args()
+    if not (args.serve or args.batch or args.refresh_prices or args.node or args.reparse or args.analyze_csv or args.category_url):
+        parser.error(
+            "--category-url is required unless --serve, --batch, --refresh-prices, --node, --reparse or --analyze-csv is given"
+        )
+    try:
+        args.analyze_weeks = tuple(int(weeks) for weeks in args.analyze_weeks.split(","))
+    except ValueError:
+        parser.error("--analyze-weeks must be comma-separated integers")
+    if args.analyze and (
+        args.long_format or args.batch_output_dir or args.list_only or args.refresh_prices or args.serve or args.node
+    ):
+        parser.error(
+            "--analyze needs a single wide-format --output "
+            "(not --long-format, --batch-output-dir, --list-only, --refresh-prices, --serve or --node)"
+        )
+    if (args.coordinate or args.node) and not args.queue:
+        parser.error("--coordinate and --node need --queue")
+    if args.coordinate and args.node:
+        parser.error("run --coordinate and --node as separate processes")
+    if args.benchmark_profiles:
+        if not args.category_url:
+            parser.error("--benchmark-profiles needs --category-url")
+        names = list(LAUNCH_PROFILES) if args.benchmark_profiles == "all" else args.benchmark_profiles.split(",")
+        unknown = [name for name in names if name not in LAUNCH_PROFILES]
+        if unknown:
+            parser.error(f"unknown launch profile(s): {', '.join(unknown)}")
+        args.benchmark_profiles = names
+    try:
+        args.extract = ExtractPlan.parse(args.extract, args.trend_periods, args.fused_extract)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.compress == "zstd" and importlib.util.find_spec("zstandard") is None:
+        parser.error("--compress zstd needs the zstandard package (pip install zstandard)")
+    args.sink_options = {"compression": args.compress, "rotate_rows": args.rotate_rows, "rotate_mb": args.rotate_mb}
+    if args.list_only and (args.serve or args.batch):
+        parser.error("--list-only works with a single --category-url")
+    return args
+
+
+def main(default_extract: str = DEFAULT_EXTRACTORS) -> None:
+    """명령행 진입점 — test.py는 스펙, 가격, 제목, 가격추이를, merged_crawler.py는 제목과 스펙만 기본으로 켠다"""
+    args = parse_args(default_extract)
+    setup_logging(args.log_level, json_format=args.log_json, log_file=args.log_file)
+    block_monitor.configure(
+        window=args.block_window,
+        empty_ratio=args.block_empty_ratio,
+        pause_s=args.block_pause,
+        defer_empty=args.max_attempts > 1,
+    )
+    if args.profile_dir:
+        run_profiler.start(
+            args.profile_dir,
+            slow_s=args.profile_slow_s,
+            sample_rate=args.profile_sample,
+            tracemalloc_every=args.profile_tracemalloc_every,
+        )
+    try:
+        dispatch(args)
+    finally:
+        run_profiler.finish()
+
+
+def dispatch(args: argparse.Namespace) -> None:
+    if args.selector_memory:
+        selector_memory.load(args.selector_memory)
+        atexit.register(selector_memory.save)
+    if args.benchmark_profiles:
+        benchmark_launch_profiles(
+            args.category_url,
+            args.benchmark_profiles,
+            headless=args.headless,
+            sample_size=args.benchmark_samples,
+            open_pages=args.benchmark_open_pages,
+        )
+        return
+    if args.analyze_csv:
+        analyze_price_trends(args.analyze_csv, change_weeks=args.analyze_weeks)
+        return
+    if args.reparse:
+        reparse_archive(
+            args.reparse,
+            args.output,
+            long_format=args.long_format,
+            workers=args.reparse_workers,
+            sink_options=args.sink_options,
+        )
+        if args.analyze:
+            analyze_price_trends(args.output, change_weeks=args.analyze_weeks)
+        return
+    if args.serve:
+        serve_daemon(
+            args.host,
+            args.port,
+            headless=args.headless,
+            base_delay_ms=args.delay_ms,
+            launch_profile=args.launch_profile,
+            recycle_every=args.recycle_every,
+            max_browser_mb=args.max_browser_mb,
+            extract=args.extract,
+            output_dir=args.serve_output_dir,
+            sink_options=args.sink_options,
+        )
+        return
+    if args.node:
+        run_crawl_node(
+            args.queue,
+            headless=args.headless,
+            requests_per_sec=args.rate,
+            base_delay_ms=args.delay_ms,
+            node_id=args.node_id,
+            lease_s=args.lease_seconds,
+            max_attempts=args.max_attempts,
+            retry_backoff_s=args.retry_backoff,
+            breaker_threshold=args.breaker_threshold,
+            breaker_cooldown_s=args.breaker_cooldown,
+            product_deadline_s=(args.product_deadline or None),
+            launch_profile=args.launch_profile,
+            recycle_every=args.recycle_every,
+            max_browser_mb=args.max_browser_mb,
+            extract=args.extract,
+        )
+        return
+    if args.coordinate:
+        if args.batch:
+            categories = load_batch_file(
+                args.batch, args.pages, args.items_per_page or None, args.max_total_items or None
+            )
+        else:
+            categories = [BatchCategory(
+                index=1,
+                category_url=args.category_url,
+                pages=args.pages,
+                items_per_page=(args.items_per_page or None),
+                max_total_items=(args.max_total_items or None),
+            )]
+        coordinate_distributed(
+            args.queue,
+            categories,
+            output_csv=args.output,
+            output_dir=args.batch_output_dir,
+            long_format=args.long_format,
+            product_deadline_s=(args.product_deadline or None),
+            seed_only=args.seed_only,
+            sink_options=args.sink_options,
+            extract=args.extract,
+        )
+        if args.analyze and not args.seed_only:
+            analyze_price_trends(args.output, change_weeks=args.analyze_weeks)
+        return
+    if args.refresh_prices:
+        refresh_prices(
+            watchlist_path=args.refresh_prices,
+            changes_csv=args.changes_output,
+            state_path=args.price_state,
+            headless=args.headless,
+            requests_per_sec=args.rate,
+            interval_minutes=args.refresh_interval,
+            rounds=args.refresh_rounds,
+            launch_profile=args.launch_profile,
+        )
+        return
+    if args.list_only:
+        crawl_list_only(
+            category_url=args.category_url,
+            output_csv=args.output,
+            max_pages=args.pages,
+            max_items_per_page=(args.items_per_page or None),
+            headless=args.headless,
+            max_total_items=(args.max_total_items or None),
+            base_delay_ms=args.delay_ms,
+            launch_profile=args.launch_profile,
+            workers=args.workers,
+            requests_per_sec=args.rate,
+        )
+        return
+    if args.batch:
+        crawl_batch(
+            batch_file=args.batch,
+            output_csv=args.output,
+            output_dir=args.batch_output_dir,
+            default_pages=args.pages,
+            default_items_per_page=(args.items_per_page or None),
+            default_max_total_items=(args.max_total_items or None),
+            headless=args.headless,
+            workers=args.workers,
+            requests_per_sec=args.rate,
+            base_delay_ms=args.delay_ms,
+            long_format=args.long_format,
+            seen_store=args.seen_store,
+            seen_bloom=args.seen_bloom,
+            max_attempts=args.max_attempts,
+            retry_backoff_s=args.retry_backoff,
+            breaker_threshold=args.breaker_threshold,
+            breaker_cooldown_s=args.breaker_cooldown,
+            product_deadline_s=(args.product_deadline or None),
+            delta_state=args.delta_state,
+            delta_output=args.delta_output,
+            launch_profile=args.launch_profile,
+            recycle_every=args.recycle_every,
+            max_browser_mb=args.max_browser_mb,
+            archive_dir=args.archive,
+            sink_options=args.sink_options,
+            extract=args.extract,
+        )
+        if args.analyze:
+            analyze_price_trends(args.output, change_weeks=args.analyze_weeks)
+        return
+    crawl_category(
+        category_url=args.category_url,
+        output_csv=args.output,
+        max_pages=args.pages,
+        max_items_per_page=(args.items_per_page or None),
+        headless=args.headless,
+        max_total_items=(args.max_total_items or None),
+        base_delay_ms=args.delay_ms,
+        long_format=args.long_format,
+        seen_store=args.seen_store,
+        seen_bloom=args.seen_bloom,
+        max_attempts=args.max_attempts,
+        retry_backoff_s=args.retry_backoff,
+        breaker_threshold=args.breaker_threshold,
+        breaker_cooldown_s=args.breaker_cooldown,
+        product_deadline_s=(args.product_deadline or None),
+        delta_state=args.delta_state,
+        delta_output=args.delta_output,
+        launch_profile=args.launch_profile,
+        recycle_every=args.recycle_every,
+        max_browser_mb=args.max_browser_mb,
+        archive_dir=args.archive,
+        sink_options=args.sink_options,
+        extract=args.extract,
+        workers=args.workers,
+        requests_per_sec=args.rate,
+    )
+    if args.analyze:
+        analyze_price_trends(args.output, change_weeks=args.analyze_weeks)
+
+
+if __name__ == "__main__":
+    main()
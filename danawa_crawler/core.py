@@ -0,0 +1,571 @@
+"""로그, 시간 예산, 메모리/프로파일, 재시도와 차단기처럼 모든 모드가 함께 쓰는 기반"""
+import atexit
+import contextvars
+import cProfile
+import csv
+import heapq
+import io
+import json
+import logging
+import logging.handlers
+import os
+import pstats
+import queue
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+import weakref
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Any
+from urllib.parse import urljoin
+
+from playwright.sync_api import Page, BrowserContext
+
+
+log = logging.getLogger("danawa")
+LOG_LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+_log_product: "contextvars.ContextVar[Optional[Tuple[str, str]]]" = contextvars.ContextVar("danawa_log_product", default=None)
+
+
+class ProductLogContext:
+    """with 블록 안에서 남기는 로그에 상품 pcode와 시도마다 새로 만드는 상관 ID(cid)를 붙임
+
+    컨텍스트 변수라서 워커 스레드마다 따로 유지된다. link가 None이면 아무것도 하지 않는다.
+    """
+
+    def __init__(self, link: Optional[str]) -> None:
+        self.pcode = (extract_pcode(link) or link) if link else None
+        self.cid = f"{self.pcode}-{uuid.uuid4().hex[:8]}" if self.pcode else None
+        self._token: Optional[contextvars.Token] = None
+
+    def __enter__(self) -> "ProductLogContext":
+        if self.pcode and self.cid:
+            self._token = _log_product.set((self.pcode, self.cid))
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._token is not None:
+            _log_product.reset(self._token)
+
+
+class _ProductContextFilter(logging.Filter):
+    """로그를 남긴 스레드의 상품 컨텍스트를 레코드에 복사 (큐로 넘어가기 전에 실행됨)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        product = _log_product.get()
+        record.pcode, record.cid = product if product else (None, None)
+        return True
+
+
+class JsonLogFormatter(logging.Formatter):
+    """한 줄에 JSON 하나: ts, level, thread, msg, 상품 컨텍스트(pcode, cid)와 extra={"data": {...}} 필드"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "thread": record.threadName,
+            "msg": record.getMessage().strip(),
+        }
+        if getattr(record, "cid", None):
+            entry["pcode"] = record.pcode
+            entry["cid"] = record.cid
+        entry.update(getattr(record, "data", None) or {})
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = "info", json_format: bool = False, log_file: Optional[str] = None) -> None:
+    """크롤러 로그를 큐로 받아 백그라운드 스레드 하나가 터미널/파일에 쓰도록 설정
+
+    워커 스레드는 큐에 넣기만 하므로 출력 때문에 서로 기다리지 않는다. 기본 info 단계에서는
+    페이지 복구나 페이지 이동 시도 같은 debug 로그가 걸러진다.
+    """
+    handler: logging.Handler = (
+        logging.FileHandler(log_file, encoding="utf-8") if log_file else logging.StreamHandler(sys.stdout)
+    )
+    handler.setFormatter(JsonLogFormatter() if json_format else logging.Formatter("%(message)s"))
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(_ProductContextFilter())
+    for existing in list(log.handlers):
+        log.removeHandler(existing)
+    log.addHandler(queue_handler)
+    log.setLevel(LOG_LEVELS[level])
+    log.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+
+class Deadline:
+    """상품 하나에 주어진 전체 시간 예산 — 각 단계는 남은 시간 안에서만 기다린다
+
+    budget_s가 없으면 제한이 없고, 예산이 모자라 건너뛰거나 중간에 멈춘 단계는 cut_stages에 남는다.
+    """
+
+    def __init__(self, budget_s: Optional[float] = None) -> None:
+        self.expires_at = time.monotonic() + budget_s if budget_s else None
+        self.cut_stages: List[str] = []
+
+    def remaining_ms(self, cap_ms: int) -> int:
+        if self.expires_at is None:
+            return cap_ms
+        return max(0, min(cap_ms, int((self.expires_at - time.monotonic()) * 1000)))
+
+    def budget_ms(self, stage: str, cap_ms: int) -> int:
+        """이 단계에 쓸 수 있는 시간(ms). 남은 시간이 없으면 단계를 잘린 것으로 기록하고 0"""
+        remaining = self.remaining_ms(cap_ms)
+        if remaining <= 0:
+            self.cut(stage)
+        return remaining
+
+    def cut(self, stage: str) -> None:
+        if stage not in self.cut_stages:
+            self.cut_stages.append(stage)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.cut_stages)
+
+
+def wait_for_network_idle(page: Page, timeout_ms: int = 3000) -> None:
+    start = time.time()
+    page.wait_for_load_state("domcontentloaded")
+    try:
+        page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    except Exception:
+        pass
+    finally:
+        _ = start
+
+
+def browser_memory_bytes() -> Optional[int]:
+    """이 프로세스 아래에서 뜬 드라이버/브라우저 프로세스들의 RSS 합계 (측정할 수 없으면 None)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        children = psutil.Process().children(recursive=True)
+        total = 0
+        for child in children:
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                continue
+        return total
+    if not os.path.isdir("/proc"):
+        return None
+    parents: Dict[int, int] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        parents[int(name)] = int(stat[stat.rindex(b")") + 2:].split()[1])
+    descendants = {os.getpid()}
+    changed = True
+    while changed:
+        changed = False
+        for pid, parent in parents.items():
+            if parent in descendants and pid not in descendants:
+                descendants.add(pid)
+                changed = True
+    descendants.discard(os.getpid())
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    for pid in descendants:
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except OSError:
+            continue
+    return total
+
+
+def process_memory_bytes() -> Optional[int]:
+    """파이썬 프로세스 자신의 현재 RSS (측정할 수 없으면 None)"""
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return None
+
+
+class MemoryMonitor:
+    """파이썬 프로세스와 브라우저 프로세스들의 RSS를 재고 실행 중 최고치를 기록"""
+
+    def __init__(self) -> None:
+        self.peak_python = 0
+        self.peak_browser = 0
+        self._lock = threading.Lock()
+
+    def sample(self) -> Tuple[Optional[int], Optional[int]]:
+        python_rss = process_memory_bytes()
+        browser_rss = browser_memory_bytes()
+        with self._lock:
+            self.peak_python = max(self.peak_python, python_rss or 0)
+            self.peak_browser = max(self.peak_browser, browser_rss or 0)
+        return python_rss, browser_rss
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "peak_python_mb": round(self.peak_python / (1024 * 1024), 1),
+            "peak_browser_mb": round(self.peak_browser / (1024 * 1024), 1),
+        }
+
+
+class _NoProductProfile:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NO_PRODUCT_PROFILE = _NoProductProfile()
+
+
+class _ProductProfile:
+    """상품 하나를 Playwright 트레이스 조각으로 감싸고, 느리거나 표본으로 뽑힌 상품만 파일로 남김"""
+
+    def __init__(self, profiler: "RunProfiler", context: BrowserContext, link: str) -> None:
+        self.profiler = profiler
+        self.context = context
+        self.link = link
+        self.tracing = False
+
+    def __enter__(self) -> None:
+        self.tracing = self.profiler._start_trace_chunk(self.context)
+        self.started = time.perf_counter()
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        elapsed = time.perf_counter() - self.started
+        reason = ""
+        if self.profiler.slow_s and elapsed >= self.profiler.slow_s:
+            reason = "slow"
+        elif random.random() < self.profiler.sample_rate:
+            reason = "sample"
+        trace_file = ""
+        if self.tracing:
+            pcode = extract_pcode(self.link) or "product"
+            if reason:
+                trace_file = os.path.join("traces", f"{reason}-{pcode}-{elapsed:.1f}s.zip")
+            try:
+                if trace_file:
+                    self.context.tracing.stop_chunk(path=os.path.join(self.profiler.directory, trace_file))
+                else:
+                    self.context.tracing.stop_chunk()
+            except Exception as e:
+                log.debug(f"  [프로파일] 트레이스 저장 실패 - {e}")
+                trace_file = ""
+        self.profiler._product_finished(self.link, elapsed, exc_type is None, trace_file)
+
+
+class RunProfiler:
+    """--profile-dir로 켜는 실행 단위 프로파일러 — 꺼져 있으면 상품/스레드마다 하는 일이 없다
+
+    켜면 실행마다 <profile-dir>/run-<시각>/ 디렉터리를 만들고
+    - 메인 스레드와 wrap()으로 감싼 워커 스레드마다 cProfile을 돌려 cpu-<스레드>.prof와 합친 cpu-summary.txt,
+    - 상품마다 걸린 시간을 products.csv,
+    - slow_s초 이상 걸렸거나 sample_rate 확률로 뽑힌 상품의 Playwright 트레이스를 traces/,
+    - tracemalloc_every개 상품마다 tracemalloc 스냅샷과 직전 대비 상위 증가분을 tracemalloc/에 남긴다.
+    트레이스는 컨텍스트마다 한 번 tracing.start()를 한 뒤 상품마다 조각(start_chunk/stop_chunk)으로 끊고,
+    남길 필요가 없는 조각은 경로 없이 멈춰 버린다. 트레이스는 `playwright show-trace`로 연다.
+    """
+
+    def __init__(self) -> None:
+        self.directory: Optional[str] = None
+        self.slow_s = 0.0
+        self.sample_rate = 0.0
+        self.tracemalloc_every = 0
+        self._lock = threading.Lock()
+        self._profiles: List[Tuple[str, cProfile.Profile]] = []
+        self._traced_contexts: "weakref.WeakSet[BrowserContext]" = weakref.WeakSet()
+        self._products = 0
+        self._products_file: Any = None
+        self._products_writer: Any = None
+        self._last_snapshot: Any = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def start(self, profile_dir: str, slow_s: float = 10.0, sample_rate: float = 0.01, tracemalloc_every: int = 0) -> str:
+        self.directory = os.path.join(profile_dir, time.strftime("run-%Y%m%d-%H%M%S"))
+        os.makedirs(os.path.join(self.directory, "traces"), exist_ok=True)
+        self.slow_s = slow_s
+        self.sample_rate = sample_rate
+        self.tracemalloc_every = tracemalloc_every
+        self._products_file = open(os.path.join(self.directory, "products.csv"), "w", encoding="utf-8-sig", newline="")
+        self._products_writer = csv.writer(self._products_file)
+        self._products_writer.writerow(["thread", "url", "seconds", "ok", "trace"])
+        if tracemalloc_every:
+            os.makedirs(os.path.join(self.directory, "tracemalloc"), exist_ok=True)
+            tracemalloc.start(25)
+        self._start_thread_profile()
+        log.info(f"  [프로파일] 결과 디렉터리: {self.directory}")
+        return self.directory
+
+    def _start_thread_profile(self) -> Optional[cProfile.Profile]:
+        """현재 스레드용 cProfile 시작 — 파이썬 3.12부터는 프로파일러가 전역 하나라서 메인 스레드 것이
+        모든 스레드를 재므로, 두 번째부터 거부되면 None"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            return None
+        with self._lock:
+            self._profiles.append((threading.current_thread().name, profile))
+        return profile
+
+    def wrap(self, target: Callable[..., Any]) -> Callable[..., Any]:
+        """워커 스레드 함수를 cProfile로 감쌈 (꺼져 있으면 그대로 돌려줌)"""
+        if not self.enabled:
+            return target
+
+        def profiled(*args: Any, **kwargs: Any) -> Any:
+            profile = self._start_thread_profile()
+            try:
+                return target(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+
+        return profiled
+
+    def product(self, context: BrowserContext, link: str) -> Any:
+        if not self.enabled:
+            return _NO_PRODUCT_PROFILE
+        return _ProductProfile(self, context, link)
+
+    def _start_trace_chunk(self, context: BrowserContext) -> bool:
+        try:
+            if context not in self._traced_contexts:
+                context.tracing.start(screenshots=True, snapshots=True, sources=False)
+                self._traced_contexts.add(context)
+            context.tracing.start_chunk()
+            return True
+        except Exception as e:
+            log.debug(f"  [프로파일] 트레이스 시작 실패 - {e}")
+            return False
+
+    def _product_finished(self, link: str, elapsed: float, ok: bool, trace_file: str) -> None:
+        with self._lock:
+            self._products += 1
+            count = self._products
+            self._products_writer.writerow(
+                [threading.current_thread().name, link, f"{elapsed:.3f}", int(ok), trace_file]
+            )
+            self._products_file.flush()
+            if not (self.tracemalloc_every and count % self.tracemalloc_every == 0):
+                return
+            snapshot = tracemalloc.take_snapshot()
+            path = os.path.join(self.directory, "tracemalloc", f"{count:06d}")
+            snapshot.dump(path + ".snap")
+            baseline = self._last_snapshot
+            self._last_snapshot = snapshot
+        if baseline is not None:
+            top = snapshot.compare_to(baseline, "lineno")[:25]
+        else:
+            top = snapshot.statistics("lineno")[:25]
+        with open(path + ".txt", "w", encoding="utf-8") as f:
+            f.write("\n".join(str(stat) for stat in top) + "\n")
+
+    def finish(self) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            profiles = list(self._profiles)
+        for index, (name, profile) in enumerate(profiles):
+            profile.disable()
+            profile.dump_stats(os.path.join(self.directory, f"cpu-{index:02d}-{name}.prof"))
+        # 상품을 하나도 처리하기 전에 끝난 실행(목록만, 일찍 중단 등)은 CPU 프로파일이 없음
+        if profiles:
+            summary = io.StringIO()
+            stats = pstats.Stats(profiles[0][1], stream=summary)
+            for _, profile in profiles[1:]:
+                stats.add(profile)
+            stats.sort_stats("cumulative").print_stats(40)
+            stats.sort_stats("tottime").print_stats(40)
+            with open(os.path.join(self.directory, "cpu-summary.txt"), "w", encoding="utf-8") as f:
+                f.write(summary.getvalue())
+        if self.tracemalloc_every:
+            tracemalloc.stop()
+        self._products_file.close()
+        log.info(f"  [프로파일] 상품 {self._products}개 기록: {self.directory}")
+
+
+run_profiler = RunProfiler()
+
+
+def human_delay(base_delay_ms: int = 500, deadline: Optional[Deadline] = None) -> None:
+    jitter = random.randint(0, base_delay_ms)
+    delay_ms = base_delay_ms + jitter
+    if deadline is not None:
+        delay_ms = deadline.remaining_ms(delay_ms)
+    time.sleep(delay_ms / 1000.0)
+
+
+def slow_scroll(
+    page: Page,
+    steps: int = 6,
+    step_px: int = 800,
+    base_delay_ms: int = 300,
+    deadline: Optional[Deadline] = None,
+) -> None:
+    for _ in range(steps):
+        if deadline is not None and deadline.budget_ms("scroll", 1) <= 0:
+            return
+                                                   
+        page.evaluate("step => window.scrollBy(0, step)", step_px)
+        human_delay(base_delay_ms, deadline=deadline)
+
+
+DANAWA_PRODUCT_URL = "https://prod.danawa.com/info/?pcode={pcode}"
+PCODE_PATTERN = re.compile(r"[?&]pcode=(\d+)")
+
+
+def extract_pcode(href: str) -> Optional[str]:
+    match = PCODE_PATTERN.search(href or "")
+    return match.group(1) if match else None
+
+
+def canonical_product_url(href: str) -> Tuple[str, str]:
+    """상품 링크를 (중복 확인 키, 정규 URL)로 변환 — pcode가 있으면 pcode 기준"""
+    pcode = extract_pcode(href)
+    if pcode:
+        return pcode, DANAWA_PRODUCT_URL.format(pcode=pcode)
+    url = urljoin("https://prod.danawa.com/", href).split("#", 1)[0]
+    return url, url
+
+
+class RetryQueue:
+    """실패한 상품을 지수 백오프로 다시 시도하는 큐 (max_attempts번 실패하면 최종 실패로 기록)"""
+
+    def __init__(self, max_attempts: int = 3, base_delay_s: float = 5.0, max_delay_s: float = 300.0) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay_s = base_delay_s
+        self.max_delay_s = max_delay_s
+        self.attempts: Dict[str, int] = {}
+        self.permanent_failures: Dict[str, str] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def record_failure(self, link: str, error: str) -> Optional[float]:
+        """실패를 기록하고 다시 시도할 때까지의 초를 반환, 시도 횟수를 다 썼으면 None"""
+        with self._lock:
+            attempts = self.attempts.get(link, 0) + 1
+            self.attempts[link] = attempts
+            if attempts >= self.max_attempts:
+                self.permanent_failures[link] = error
+                return None
+            delay = min(self.max_delay_s, self.base_delay_s * (2 ** (attempts - 1)))
+            delay *= random.uniform(0.8, 1.2)
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._seq, link))
+            self._seq += 1
+            return delay
+
+    def give_up(self, link: str, error: str) -> None:
+        """다시 시도할 수 없는 실패(처리할 브라우저가 남지 않음 등)를 시도 횟수와 상관없이 최종 실패로 기록"""
+        with self._lock:
+            self.permanent_failures[link] = error
+
+    def pop_ready(self) -> Optional[str]:
+        with self._lock:
+            if self._heap and self._heap[0][0] <= time.monotonic():
+                return heapq.heappop(self._heap)[2]
+            return None
+
+    def next_ready_in(self) -> float:
+        with self._lock:
+            if not self._heap:
+                return 0.0
+            return max(0.0, self._heap[0][0] - time.monotonic())
+
+
+class CircuitBreaker:
+    """최근 window번 요청의 실패율이 threshold 이상이면 cooldown_s 동안 호스트 요청을 멈춤"""
+
+    def __init__(
+        self,
+        window: int = 20,
+        threshold: float = 0.5,
+        min_requests: int = 6,
+        cooldown_s: float = 60.0,
+    ) -> None:
+        self.threshold = threshold
+        self.min_requests = min_requests
+        self.cooldown_s = cooldown_s
+        self.open_until = 0.0
+        self.trips = 0
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self._results.append(success)
+            if len(self._results) < self.min_requests or time.monotonic() < self.open_until:
+                return
+            failure_rate = self._results.count(False) / len(self._results)
+            if failure_rate >= self.threshold:
+                self.open_until = time.monotonic() + self.cooldown_s
+                self.trips += 1
+                self._results.clear()
+                log.warning(f"  [차단기] 최근 실패율 {failure_rate:.0%} — {self.cooldown_s:.0f}초 동안 요청을 멈춥니다.")
+
+    def record_error(self, error: Exception) -> None:
+        """상품 실패를 기록 — 차단 확인 전까지 미뤄 둔 빈 스펙 상품(SuspectPageError)은 실패로 세지 않음"""
+        if not isinstance(error, SuspectPageError):
+            self.record(False)
+
+    def wait_if_open(self) -> None:
+        remaining = self.open_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+
+class BlockedPageError(RuntimeError):
+    """상세 페이지 대신 차단/캡차 페이지를 받음 — 빈 행을 쓰지 않고 실패로 돌려 재시도 큐에 넣게 한다"""
+
+
+class SuspectPageError(RuntimeError):
+    """차단 신호 없이 스펙만 빈 상세 페이지 — 조용한 차단일 수 있어 행을 쓰지 않고 한 번 재시도 큐로 미룬다"""
+
+
+class RateLimiter:
+    """여러 워커가 공유하는 요청 속도 제한 (초당 requests_per_sec 회 이하)"""
+
+    def __init__(self, requests_per_sec: float) -> None:
+        self.interval = 1.0 / requests_per_sec if requests_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self) -> None:
+        if self.interval <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_at)
+            self._next_at = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
@@ -0,0 +1,810 @@
+"""카테고리 크롤링 본체: 상세 수집 패스, 목록만 수집, 가격 갱신"""
+import csv
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Set, Optional, Tuple, Any
+
+from playwright.sync_api import sync_playwright, Page, BrowserContext
+
+from danawa_crawler.core import (
+    canonical_product_url,
+    CircuitBreaker,
+    DANAWA_PRODUCT_URL,
+    extract_pcode,
+    human_delay,
+    log,
+    ProductLogContext,
+    RateLimiter,
+    RetryQueue,
+    slow_scroll,
+    wait_for_network_idle,
+)
+from danawa_crawler.extract import (
+    _parse_price,
+    DEFAULT_EXTRACT_PLAN,
+    extract_price_range,
+    extract_specs_from_detail,
+    ExtractPlan,
+    fetch_product_detail,
+    PRICE_LIST_SELECTORS,
+)
+from danawa_crawler.browser import (
+    block_heavy_resources,
+    BrowserSession,
+    LAUNCH_PROFILES,
+    open_new_context,
+    profile_runs_scripts,
+)
+from danawa_crawler.listing import (
+    collect_list_items_from_category,
+    collect_product_links_from_category,
+    fan_out_list_pages,
+    LIST_ONLY_FIELDNAMES,
+    paginate_category,
+)
+from danawa_crawler.normalize import analyze_and_create_mapping, collect_checkmark_items, normalize_spec_pairs
+from danawa_crawler.storage import (
+    build_output_row,
+    CsvRowSink,
+    delta_output_path,
+    DeltaSink,
+    DeltaTracker,
+    failure_report_path,
+    output_fieldnames,
+    PcodeStore,
+    SeenProducts,
+    SnapshotArchive,
+    write_failure_report,
+)
+
+
+def learn_checkmark_patterns(
+    category_url: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int],
+    base_delay_ms: int,
+) -> List[str]:
+    """Pass 1: 모든 상품을 빠르게 스캔하여 체크마크 항목들을 수집"""
+    with sync_playwright() as p:
+        context = open_new_context(p, headless=headless)
+        try:
+            return scan_checkmark_items(
+                context,
+                category_url=category_url,
+                max_pages=max_pages,
+                max_items_per_page=max_items_per_page,
+                max_total_items=max_total_items,
+                base_delay_ms=base_delay_ms,
+            )
+        finally:
+            context.browser.close()
+
+
+def scan_checkmark_items(
+    context: BrowserContext,
+    category_url: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    max_total_items: Optional[int],
+    base_delay_ms: int,
+) -> List[str]:
+    """이미 열린 컨텍스트에서 Pass 1 스캔을 수행"""
+    log.info("\n=== PASS 1: 데이터 구조 학습 중 ===")
+    checkmark_items = []
+    
+    page = context.new_page()
+    page.set_default_timeout(10000)
+    
+    page.goto(category_url)
+    wait_for_network_idle(page)
+    slow_scroll(page)
+    human_delay(base_delay_ms)
+    
+    items_scanned = 0
+    seen = SeenProducts()
+    
+    for page_index in range(max_pages):
+        try:
+            log.info(f"  페이지 {page_index + 1}/{max_pages} 스캔 중...")
+            product_links = collect_product_links_from_category(page, max_items_per_page, seen=seen)
+            log.info(f"    - {len(product_links)}개 링크 발견")
+            
+            if not product_links:
+                break
+            
+            for link in product_links:
+                if max_total_items and items_scanned >= max_total_items:
+                    break
+                
+                try:
+                    detail_page = context.new_page()
+                    detail_page.set_default_timeout(15000)
+                    detail_page.goto(link, wait_until="domcontentloaded", timeout=15000)
+                    wait_for_network_idle(detail_page)
+                    
+                                     
+                    specs = extract_specs_from_detail(detail_page)
+                    collect_checkmark_items(specs, checkmark_items)
+                    
+                    detail_page.close()
+                    items_scanned += 1
+                    
+                except Exception as e:
+                    log.warning(f"    경고: {link[:50]}... 스캔 실패 - {e}")
+                    continue
+            
+            if max_total_items and items_scanned >= max_total_items:
+                break
+            
+                        
+            if page_index < max_pages - 1:
+                next_page_num = page_index + 2
+                moved = paginate_category(page, category_url, next_page_num)
+                if not moved:
+                    break
+                slow_scroll(page)
+                human_delay(base_delay_ms)
+                
+        except Exception as e:
+            log.warning(f"    페이지 {page_index + 1} 스캔 중 오류: {e}")
+            continue
+    
+    page.close()
+    
+    log.info(f"  [완료] {items_scanned}개 상품 스캔 완료, {len(checkmark_items)}개 체크마크 항목 발견")
+    return checkmark_items
+
+
+def crawl_category(
+    category_url: str,
+    output_csv: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int] = None,
+    base_delay_ms: int = 500,
+    long_format: bool = False,
+    seen_store: Optional[str] = None,
+    seen_bloom: bool = False,
+    max_attempts: int = 3,
+    retry_backoff_s: float = 5.0,
+    breaker_threshold: float = 0.5,
+    breaker_cooldown_s: float = 60.0,
+    product_deadline_s: Optional[float] = None,
+    delta_state: Optional[str] = None,
+    delta_output: Optional[str] = None,
+    launch_profile: str = "default",
+    recycle_every: int = 0,
+    max_browser_mb: float = 0.0,
+    archive_dir: Optional[str] = None,
+    sink_options: Optional[Dict[str, Any]] = None,
+    extract: Optional[ExtractPlan] = None,
+    workers: int = 1,
+    requests_per_sec: float = 0.0,
+) -> None:
+    """카테고리 하나를 Pass 1(체크마크 학습), Pass 2(상세 수집) 순서로 크롤링해 output_csv에 기록
+
+    Pass 2의 목록 페이지는 workers개의 브라우저가 requests_per_sec 한도 안에서 동시에 연다.
+    """
+    store = PcodeStore(seen_store, use_bloom=seen_bloom) if seen_store else None
+    retry_queue = RetryQueue(max_attempts=max_attempts, base_delay_s=retry_backoff_s)
+    delta = DeltaTracker(delta_state, delta_output or delta_output_path(output_csv)) if delta_state else None
+    archive = SnapshotArchive(archive_dir) if archive_dir else None
+    try:
+        _crawl_category(
+            category_url=category_url,
+            output_csv=output_csv,
+            max_pages=max_pages,
+            max_items_per_page=max_items_per_page,
+            headless=headless,
+            max_total_items=max_total_items,
+            base_delay_ms=base_delay_ms,
+            long_format=long_format,
+            seen=SeenProducts(store),
+            retry_queue=retry_queue,
+            breaker=CircuitBreaker(threshold=breaker_threshold, cooldown_s=breaker_cooldown_s),
+            product_deadline_s=product_deadline_s,
+            delta=delta,
+            launch_profile=launch_profile,
+            recycle_every=recycle_every,
+            max_browser_mb=max_browser_mb,
+            archive=archive,
+            sink_options=sink_options,
+            extract=extract,
+            list_workers=workers,
+            rate_limiter=RateLimiter(requests_per_sec),
+        )
+    except BaseException:
+        if delta is not None:
+            delta.abort()
+        raise
+    else:
+        if delta is not None:
+            delta.close()
+    finally:
+        if store is not None:
+            store.compact()
+            store.close()
+        if archive is not None:
+            archive.close()
+    if retry_queue.permanent_failures:
+        write_failure_report(failure_report_path(output_csv), retry_queue)
+
+
+def _crawl_category(
+    category_url: str,
+    output_csv: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int],
+    base_delay_ms: int,
+    long_format: bool,
+    seen: SeenProducts,
+    retry_queue: RetryQueue,
+    breaker: CircuitBreaker,
+    product_deadline_s: Optional[float],
+    delta: Optional[DeltaTracker] = None,
+    launch_profile: str = "default",
+    recycle_every: int = 0,
+    max_browser_mb: float = 0.0,
+    archive: Optional[SnapshotArchive] = None,
+    sink_options: Optional[Dict[str, Any]] = None,
+    extract: Optional[ExtractPlan] = None,
+    list_workers: int = 1,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> None:
+    extract = extract or DEFAULT_EXTRACT_PLAN
+    with sync_playwright() as p:
+        session = BrowserSession(
+            p,
+            headless=headless,
+            profile=launch_profile,
+            recycle_every=recycle_every,
+            max_browser_mb=max_browser_mb,
+        )
+        try:
+            learned_mapping: Dict[str, str] = {}
+            if "specs" in extract:
+                checkmark_items = scan_checkmark_items(
+                    session.context,
+                    category_url=category_url,
+                    max_pages=max_pages,
+                    max_items_per_page=max_items_per_page,
+                    max_total_items=max_total_items,
+                    base_delay_ms=base_delay_ms,
+                )
+                learned_mapping = analyze_and_create_mapping(checkmark_items)
+                if recycle_every or max_browser_mb:
+                    session.recycle("Pass 1 종료")
+
+            sink: Any = CsvRowSink(
+                output_csv,
+                long_format=long_format,
+                fieldnames=output_fieldnames(product_deadline_s, extract),
+                **(sink_options or {}),
+            )
+            if delta is not None:
+                sink = DeltaSink(sink, delta)
+            try:
+                crawl_detail_pass(
+                    session.context,
+                    category_url=category_url,
+                    max_pages=max_pages,
+                    max_items_per_page=max_items_per_page,
+                    max_total_items=max_total_items,
+                    base_delay_ms=base_delay_ms,
+                    learned_mapping=learned_mapping,
+                    sink=sink,
+                    progress=delta.observe_progress if delta is not None else None,
+                    seen=seen,
+                    retry_queue=retry_queue,
+                    breaker=breaker,
+                    product_deadline_s=product_deadline_s,
+                    session=session,
+                    archive=archive,
+                    extract=extract,
+                    list_workers=list_workers,
+                    rate_limiter=rate_limiter,
+                )
+            finally:
+                sink.close()
+        finally:
+            session.close()
+
+
+def crawl_detail_pass(
+    context: BrowserContext,
+    category_url: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    max_total_items: Optional[int],
+    base_delay_ms: int,
+    learned_mapping: Dict[str, str],
+    sink: Any,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    seen: Optional[SeenProducts] = None,
+    retry_queue: Optional[RetryQueue] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    product_deadline_s: Optional[float] = None,
+    session: Optional[BrowserSession] = None,
+    archive: Optional[SnapshotArchive] = None,
+    extract: Optional[ExtractPlan] = None,
+    headless: bool = True,
+    launch_profile: str = "default",
+    list_workers: int = 1,
+    rate_limiter: Optional[RateLimiter] = None,
+) -> int:
+    """Pass 2: 학습된 매핑으로 상품 상세를 크롤링하여 sink로 전달, 수집 개수 반환
+
+    목록 페이지는 fan_out_list_pages가 list_workers개의 별도 브라우저에서 페이지 번호로 바로 열고(요청 속도는
+    rate_limiter), 상세 수집은 도착한 페이지의 링크부터 페이지 순서대로 context에서 처리한다. 목록 탭이 상세
+    수집과 분리되어 있으므로 목록 페이지를 되돌리거나 다시 찾아가는 복구 과정이 없다.
+    seen은 실행 전체의 pcode 집합으로, 다른 목록 페이지나 다른 쿼리스트링으로 다시 나온
+    상품은 상세 페이지를 열지 않고 중복으로만 센다.
+    실패한 상품은 retry_queue에 백오프와 함께 넣고, 다음 상품들 사이사이에 때가 된 것만
+    다시 시도한다. 목록을 다 돈 뒤에도 남은 재시도는 순서대로 기다렸다가 처리한다.
+    session을 주면 상품마다 메모리를 재고, 브라우저가 새로 뜨면 새 context로 이어서 처리한다(목록 브라우저의
+    headless/프로필도 session을 따른다). 남은 링크와 재시도 큐는 그대로 이어서 처리한다.
+    마지막 summary 이벤트의 incomplete에는 카테고리를 다 돌지 못한 이유(개수/페이지 제한, 목록 오류,
+    최종 실패, 이미 수집해 건너뛴 상품)가 담긴다. 비어 있어야 전체를 본 실행이다.
+    archive를 주면 정규화 전 추출 결과를 상품마다 보관해 나중에 reparse_archive로 다시 만들 수 있다.
+    """
+    if seen is None:
+        seen = SeenProducts()
+    if retry_queue is None:
+        retry_queue = RetryQueue()
+    if breaker is None:
+        breaker = CircuitBreaker()
+    if session is not None:
+        headless, launch_profile = session.headless, session.profile
+    log.info(f"\n=== PASS 2: 실제 데이터 크롤링 시작 (완성된 매핑 적용) ===\n")
+
+    def report(event: str, **fields: Any) -> None:
+        if progress is not None:
+            progress({"event": event, **fields})
+
+    collected_count = 0
+    list_page_number = 1
+
+    def after_product() -> None:
+        nonlocal context
+        if session is None or not session.product_done():
+            return
+        context = session.context
+        report("recycle", recycles=session.recycles, page=list_page_number)
+
+    def crawl_one(link: str) -> None:
+        try:
+            with ProductLogContext(link):
+                fetch_one(link)
+        finally:
+            after_product()
+
+    def fetch_one(link: str) -> None:
+        nonlocal collected_count
+        breaker.wait_if_open()
+        attempt = retry_queue.attempts.get(link, 0) + 1
+        retry_note = f" (재시도 {attempt}/{retry_queue.max_attempts})" if attempt > 1 else ""
+        log.debug(f"  [{collected_count + 1}] {link[:80]}... 크롤링 중...{retry_note}")
+        try:
+            detail = fetch_product_detail(context, link, base_delay_ms, deadline_s=product_deadline_s, extract=extract)
+            if archive is not None:
+                archive.append(detail, category_url)
+            spec_pairs = normalize_spec_pairs(detail["specs"], learned_mapping)
+            sink.write(build_output_row(detail), spec_pairs)
+        except Exception as e:
+            breaker.record_error(e)
+            log.warning(
+                f"    오류: {link} 크롤링 실패 - {e}",
+                extra={"data": {"event": "error", "url": link, "error": str(e), "attempt": attempt}},
+            )
+            retry_in = retry_queue.record_failure(link, str(e))
+            if retry_in is not None:
+                log.info(f"    [재시도 예약] {retry_in:.1f}초 뒤 다시 시도합니다.")
+            report("error", url=link, error=str(e), attempt=attempt, retry_in=retry_in)
+            return
+        breaker.record(True)
+        seen.mark_done(canonical_product_url(link)[0])
+        collected_count += 1
+        log.info(
+            f"    완료! (총 {collected_count}개 수집)",
+            extra={"data": {"event": "product", "count": collected_count, "url": link, "partial": detail["partial"]}},
+        )
+        report("product", count=collected_count, url=link, partial=detail["partial"])
+
+    def run_due_retries() -> None:
+        while not (max_total_items and collected_count >= max_total_items):
+            link = retry_queue.pop_ready()
+            if link is None:
+                return
+            crawl_one(link)
+
+    def harvest(page: Page) -> List[str]:
+        # 개수 제한은 seen으로 거른 뒤에 적용해야 하므로 목록 워커는 링크를 모두 모아 옴
+        return collect_product_links_from_category(page, None)
+
+    reached_end = False
+    page_errors = 0
+    stop = threading.Event()
+    pages = fan_out_list_pages(
+        category_url,
+        max_pages,
+        harvest,
+        headless=headless,
+        workers=list_workers,
+        rate_limiter=rate_limiter or RateLimiter(0.0),
+        launch_profile=launch_profile,
+        stop=stop,
+    )
+    try:
+        for page_number, links in pages:
+            if stop.is_set():
+                continue
+            list_page_number = page_number
+            log.info(f"페이지 {page_number}/{max_pages} 크롤링 중...")
+            if links is None:
+                page_errors += 1
+                log.warning(f"  - 페이지 {page_number} 목록을 가져오지 못했습니다. 다음 페이지로 넘어갑니다.")
+                continue
+            if not links:
+                log.info(f"  - 페이지 {page_number}에 제품이 없습니다. 종료합니다.")
+                reached_end = True
+                stop.set()
+                continue
+            product_links = [link for link in links if seen.add(canonical_product_url(link)[0])]
+            if max_items_per_page:
+                product_links = product_links[:max_items_per_page]
+            log.info(f"  - {len(product_links)}개 링크 발견")
+            report("page", page=page_number, links=len(product_links))
+
+            for link in product_links:
+                if max_total_items and collected_count >= max_total_items:
+                    break
+                crawl_one(link)
+                human_delay(base_delay_ms)
+                run_due_retries()
+
+            if max_total_items and collected_count >= max_total_items:
+                log.info(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+                stop.set()
+
+        while len(retry_queue) and not (max_total_items and collected_count >= max_total_items):
+            wait_s = retry_queue.next_ready_in()
+            if wait_s > 0:
+                log.info(f"  [재시도] 남은 {len(retry_queue)}개 상품, {wait_s:.0f}초 대기...")
+                time.sleep(wait_s)
+            run_due_retries()
+    finally:
+        # 중간에 빠져나가도 목록 워커가 남은 페이지를 열지 않고 끝나도록 함
+        stop.set()
+        pages.close()
+
+    failed = list(retry_queue.permanent_failures)
+    log.info(f"\n[완료] {collected_count}개 수집, 중복 상품 {seen.duplicates}개, 이미 수집된 상품 {seen.known}개 건너뜀")
+    if failed:
+        log.warning(f"  최종 실패 {len(failed)}개: {', '.join(extract_pcode(link) or link for link in failed)}")
+    incomplete: List[str] = []
+    if max_items_per_page:
+        incomplete.append("items_per_page")
+    if max_total_items and collected_count >= max_total_items:
+        incomplete.append("max_total_items")
+    elif not reached_end:
+        incomplete.append("pages")
+    if page_errors:
+        incomplete.append("page_errors")
+    if failed:
+        incomplete.append("failures")
+    if seen.known:
+        incomplete.append("seen_store")
+    memory: Dict[str, Any] = {}
+    if session is not None:
+        session.monitor.sample()
+        memory = {"recycles": session.recycles, **session.monitor.summary()}
+        log.info(
+            f"  최대 메모리: 파이썬 {memory['peak_python_mb']}MB, 브라우저 {memory['peak_browser_mb']}MB "
+            f"(브라우저 재시작 {memory['recycles']}회)"
+        )
+    report(
+        "summary",
+        collected=collected_count,
+        duplicates=seen.duplicates,
+        known=seen.known,
+        failed=[extract_pcode(link) or link for link in failed],
+        incomplete=incomplete,
+        **memory,
+    )
+    return collected_count
+
+
+
+def crawl_list_only(
+    category_url: str,
+    output_csv: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int] = None,
+    base_delay_ms: int = 500,
+    launch_profile: str = "default",
+    workers: int = 1,
+    requests_per_sec: float = 0.0,
+) -> int:
+    """상세 페이지를 열지 않고 목록 페이지 정보만으로 카탈로그 스냅샷 CSV를 만듦
+
+    workers가 2 이상이면 목록 페이지들을 동시에 연다(fan_out_list_pages). JS를 끈 프로필은 movePage로
+    페이지를 옮길 수 없으므로 워커가 하나여도 페이지마다 주소로 여는 fan_out_list_pages를 쓴다.
+    """
+    log.info(f"\n=== 목록 전용 수집: {category_url} ===\n")
+    if max_pages > 1 and (workers > 1 or not profile_runs_scripts(launch_profile)):
+        return _crawl_list_only_parallel(
+            category_url, output_csv, max_pages, max_items_per_page, headless,
+            max_total_items, launch_profile, workers, requests_per_sec,
+        )
+    seen = SeenProducts()
+    written = 0
+    with sync_playwright() as p:
+        context = open_new_context(p, headless=headless, profile=launch_profile)
+        try:
+            page = context.new_page()
+            page.set_default_timeout(10000)
+            page.goto(category_url)
+            wait_for_network_idle(page)
+            slow_scroll(page)
+            human_delay(base_delay_ms)
+
+            with open(output_csv, "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=LIST_ONLY_FIELDNAMES)
+                writer.writeheader()
+                for page_index in range(max_pages):
+                    items = collect_list_items_from_category(page, max_items_per_page, seen=seen)
+                    log.info(f"페이지 {page_index + 1}/{max_pages}: {len(items)}개 상품")
+                    if not items:
+                        break
+                    for item in items:
+                        if max_total_items and written >= max_total_items:
+                            break
+                        writer.writerow(item)
+                        written += 1
+                    f.flush()
+                    if max_total_items and written >= max_total_items:
+                        log.info(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+                        break
+                    if page_index < max_pages - 1:
+                        if not paginate_category(page, category_url, page_index + 2):
+                            log.info(f"  다음 페이지로 이동할 수 없습니다. 종료합니다.")
+                            break
+                        slow_scroll(page)
+                        human_delay(base_delay_ms)
+        finally:
+            context.browser.close()
+    log.info(f"\n[완료] {written}개 상품 기록, 중복 {seen.duplicates}개 건너뜀: {output_csv}")
+    return written
+
+
+def _crawl_list_only_parallel(
+    category_url: str,
+    output_csv: str,
+    max_pages: int,
+    max_items_per_page: Optional[int],
+    headless: bool,
+    max_total_items: Optional[int],
+    launch_profile: str,
+    workers: int,
+    requests_per_sec: float,
+) -> int:
+    """목록 페이지를 동시에 열고, 결과는 페이지 순서대로 기록 (fan_out_list_pages가 페이지 순서로 내보내므로
+    개수 제한도 카테고리 순서의 앞 상품부터 채운다)"""
+    seen = SeenProducts()
+    written = 0
+    stop = threading.Event()
+
+    def harvest(page: Page) -> List[Dict[str, str]]:
+        return collect_list_items_from_category(page, max_items_per_page)
+
+    with open(output_csv, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=LIST_ONLY_FIELDNAMES)
+        writer.writeheader()
+        pages = fan_out_list_pages(
+            category_url,
+            max_pages,
+            harvest,
+            headless=headless,
+            workers=workers,
+            rate_limiter=RateLimiter(requests_per_sec),
+            launch_profile=launch_profile,
+            stop=stop,
+        )
+        for page_number, items in pages:
+            if items is None:
+                log.warning(f"페이지 {page_number}/{max_pages}: 목록을 가져오지 못해 건너뜁니다.")
+                continue
+            log.info(f"페이지 {page_number}/{max_pages}: {len(items)}개 상품")
+            for item in items:
+                if max_total_items and written >= max_total_items:
+                    stop.set()
+                    break
+                if not seen.add(canonical_product_url(item["URL"])[0]):
+                    continue
+                writer.writerow(item)
+                written += 1
+            f.flush()
+    if max_total_items and written >= max_total_items:
+        log.info(f"최대 아이템 수({max_total_items})에 도달했습니다.")
+    log.info(f"\n[완료] {written}개 상품 기록, 중복 {seen.duplicates}개 건너뜀: {output_csv}")
+    return written
+
+
+PRICE_FIELDS = ["최저가", "최고가", "현재가"]
+PRICE_CHANGE_FIELDNAMES = ["확인시각", "pcode", "URL"] + [
+    name for field in PRICE_FIELDS for name in (f"이전{field}", field)
+]
+
+PRICE_LIST_WAIT_SELECTOR = ", ".join(PRICE_LIST_SELECTORS)
+
+CURRENT_PRICE_JS = """() => {
+    const selectors = ['.lowest_area .lwst_prc .prc_c', '.lwst_prc .prc_c', '.lowest_price .prc_c', 'em.prc_c'];
+    for (const selector of selectors) {
+        const el = document.querySelector(selector);
+        if (el && el.textContent.trim()) {
+            return el.textContent.trim();
+        }
+    }
+    return '';
+}"""
+
+
+def load_watchlist(path: str) -> List[Tuple[str, Dict[str, str]]]:
+    """감시할 pcode 목록 읽기 — pcode 또는 URL 열이 있는 CSV(이전 크롤링 결과 포함)나 한 줄에 하나씩 적은 파일
+
+    이전 결과 CSV라면 최저가/최고가/현재가 값을 비교 기준으로 함께 돌려준다.
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith("#")]
+    if not lines:
+        return []
+
+    watchlist: List[Tuple[str, Dict[str, str]]] = []
+    seen: Set[str] = set()
+
+    def add(pcode: Optional[str], baseline: Dict[str, str]) -> None:
+        if pcode and pcode not in seen:
+            seen.add(pcode)
+            watchlist.append((pcode, baseline))
+
+    header = next(csv.reader(lines[:1]))
+    if "pcode" in header or "URL" in header:
+        for row in csv.DictReader(lines):
+            pcode = (row.get("pcode") or "").strip() or extract_pcode(row.get("URL") or "")
+            add(pcode, {field: row[field] for field in PRICE_FIELDS if row.get(field)})
+    else:
+        for line in lines:
+            value = line.strip()
+            add(value if value.isdigit() else extract_pcode(value), {})
+    return watchlist
+
+
+def load_price_state(path: str) -> Dict[str, Dict[str, str]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_price_state(path: str, state: Dict[str, Dict[str, str]]) -> None:
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def fetch_product_prices(context: BrowserContext, pcode: str, price_wait_ms: int = 5000) -> Dict[str, str]:
+    """가격 갱신용: 스크롤, 상세 탭, 가격추이 없이 최저가/최고가/현재가만 읽음
+
+    판매처 가격 목록은 DOM이 만들어진 뒤에 채워지므로 목록이 붙을 때까지(최대 price_wait_ms) 기다렸다가
+    읽는다. 목록이 끝내 나오지 않으면 네트워크가 잠잠해질 때까지만 기다리고 있는 값으로 읽는다.
+    """
+    page = context.new_page()
+    page.set_default_timeout(10000)
+    try:
+        page.goto(DANAWA_PRODUCT_URL.format(pcode=pcode), wait_until="domcontentloaded", timeout=15000)
+        try:
+            page.wait_for_selector(PRICE_LIST_WAIT_SELECTOR, state="attached", timeout=price_wait_ms)
+        except Exception:
+            wait_for_network_idle(page)
+        min_price, max_price = extract_price_range(page)
+        current_price = _parse_price(page.evaluate(CURRENT_PRICE_JS) or "")
+        if current_price is None:
+            current_price = min_price
+        prices = {"최저가": min_price, "최고가": max_price, "현재가": current_price}
+        return {field: str(value) for field, value in prices.items() if value is not None}
+    finally:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def refresh_prices(
+    watchlist_path: str,
+    changes_csv: str,
+    state_path: str,
+    headless: bool,
+    requests_per_sec: float,
+    interval_minutes: float = 60.0,
+    rounds: int = 1,
+    jitter: float = 0.1,
+    launch_profile: str = "default",
+) -> None:
+    """감시 목록의 가격만 주기적으로 다시 읽어, 바뀐 상품만 changes_csv에 덧붙임
+
+    rounds가 0이면 멈출 때까지 반복한다. 라운드마다 순서를 섞고, 다음 라운드까지의 간격에
+    ±jitter 비율의 흔들림을 준다. 요청 속도는 RateLimiter로 다른 모드와 같은 예산을 지킨다.
+    """
+    watchlist = load_watchlist(watchlist_path)
+    state = load_price_state(state_path)
+    for pcode, baseline in watchlist:
+        if baseline and pcode not in state:
+            state[pcode] = baseline
+    log.info(f"\n=== 가격 갱신: {len(watchlist)}개 상품, {interval_minutes:g}분 간격 ===\n")
+
+    rate_limiter = RateLimiter(requests_per_sec)
+    new_file = not os.path.exists(changes_csv) or os.path.getsize(changes_csv) == 0
+    with sync_playwright() as p, open(changes_csv, "a", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=PRICE_CHANGE_FIELDNAMES)
+        if new_file:
+            writer.writeheader()
+        context = open_new_context(p, headless=headless, profile=launch_profile)
+        if not LAUNCH_PROFILES[launch_profile]["block_resources"]:
+            block_heavy_resources(context)
+        try:
+            round_index = 0
+            while not rounds or round_index < rounds:
+                round_index += 1
+                started = time.monotonic()
+                order = [pcode for pcode, _ in watchlist]
+                random.shuffle(order)
+                changed = failed = 0
+                for pcode in order:
+                    rate_limiter.acquire()
+                    try:
+                        with ProductLogContext(pcode):
+                            prices = fetch_product_prices(context, pcode)
+                    except Exception as e:
+                        failed += 1
+                        log.warning(f"  오류: pcode {pcode} 가격 확인 실패 - {e}")
+                        continue
+                    if not prices:
+                        continue
+                    previous = state.get(pcode, {})
+                    state[pcode] = prices
+                    if not previous or any(
+                        prices.get(field) != previous[field] for field in PRICE_FIELDS if field in previous
+                    ):
+                        changed += 1
+                        change = {
+                            "확인시각": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "pcode": pcode,
+                            "URL": DANAWA_PRODUCT_URL.format(pcode=pcode),
+                        }
+                        for field in PRICE_FIELDS:
+                            change[f"이전{field}"] = previous.get(field, "")
+                            change[field] = prices.get(field, "")
+                        writer.writerow(change)
+                        f.flush()
+                save_price_state(state_path, state)
+                elapsed = time.monotonic() - started
+                log.info(f"  [라운드 {round_index}] {len(order)}개 확인, 변경 {changed}개, 실패 {failed}개 ({elapsed:.0f}초)")
+                if rounds and round_index >= rounds:
+                    break
+                wait_s = interval_minutes * 60 * random.uniform(1 - jitter, 1 + jitter) - elapsed
+                if wait_s > 0:
+                    log.info(f"  다음 라운드까지 {wait_s / 60:.1f}분 대기...")
+                    time.sleep(wait_s)
+        finally:
+            context.browser.close()
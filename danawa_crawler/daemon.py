@@ -0,0 +1,395 @@
+"""HTTP 작업 API로 크롤링 작업을 받는 --serve 데몬"""
+import json
+import os
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Deque, Dict, List, Optional, Tuple, Any
+from urllib.parse import urlparse
+
+from playwright.sync_api import sync_playwright
+
+from danawa_crawler.core import log, run_profiler
+from danawa_crawler.extract import DEFAULT_EXTRACT_PLAN, ExtractPlan
+from danawa_crawler.browser import BrowserSession
+from danawa_crawler.normalize import analyze_and_create_mapping
+from danawa_crawler.storage import CsvRowSink, format_detail_info, output_fieldnames
+from danawa_crawler.crawler import crawl_detail_pass, scan_checkmark_items
+
+
+MAX_FINISHED_JOBS = 100
+MAX_JOB_EVENTS = 1000
+
+
+class CrawlJob:
+    """데몬에 제출된 크롤링 작업과 진행 이벤트
+
+    이벤트는 최근 MAX_JOB_EVENTS개만 남기므로(상품마다 하나씩 쌓임) 늦게 붙은 구독자는 앞 이벤트를 놓친다.
+    출력 파일 없이 결과 행을 이벤트로 받는 작업은 events를 처음부터 따라가며 읽어야 한다.
+    """
+
+    def __init__(self, job_id: str, params: Dict[str, Any]) -> None:
+        self.job_id = job_id
+        self.params = params
+        self.status = "queued"
+        self.collected = 0
+        self.error = ""
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=MAX_JOB_EVENTS)
+        self.emitted = 0
+        self._cond = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        with self._cond:
+            self.events.append({"job_id": self.job_id, "ts": round(time.time(), 3), **event})
+            self.emitted += 1
+            self._cond.notify_all()
+
+    def finish(self, status: str, error: str = "") -> None:
+        with self._cond:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self.events.append({
+                "job_id": self.job_id,
+                "ts": round(self.finished_at, 3),
+                "event": status,
+                "collected": self.collected,
+                "error": error,
+            })
+            self.emitted += 1
+            self._cond.notify_all()
+
+    def iter_events(self):
+        """남아 있는 이벤트를 돌려준 뒤, 작업이 끝날 때까지 새 이벤트를 기다리며 스트리밍
+
+        index는 지금까지 나온 이벤트 전체에서의 위치이므로, 읽는 사이 버퍼에서 밀려난 이벤트는 건너뛴다.
+        """
+        index = 0
+        while True:
+            with self._cond:
+                while index >= self.emitted and not self.finished:
+                    self._cond.wait(timeout=1.0)
+                first = self.emitted - len(self.events)
+                batch = list(self.events)[max(0, index - first):]
+                index = self.emitted
+                done = self.finished
+            for event in batch:
+                yield event
+            if done and index >= self.emitted:
+                return
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "collected": self.collected,
+            "error": self.error,
+            "created_at": round(self.created_at, 3),
+            "finished_at": round(self.finished_at, 3) if self.finished_at else None,
+            "params": self.params,
+        }
+
+
+class JobEventSink:
+    """출력 파일 없이 제출된 작업의 결과 행을 이벤트로 흘려보냄"""
+
+    def __init__(self, job: CrawlJob) -> None:
+        self.job = job
+
+    def write(self, row: Dict[str, str], spec_pairs: List[Tuple[str, str]]) -> None:
+        self.job.emit({"event": "row", "row": {**row, "상세정보": format_detail_info(spec_pairs)}})
+
+    def close(self) -> None:
+        pass
+
+
+def resolve_job_output(output: str, output_dir: str) -> str:
+    """작업 요청의 output을 output_dir 아래 경로로 바꿈 — 절대 경로나 '..'로 밖을 가리키면 ValueError"""
+    if os.path.isabs(output) or os.path.splitdrive(output)[0]:
+        raise ValueError("output must be a relative path")
+    if ".." in re.split(r"[\\/]", output):
+        raise ValueError("output must not contain '..'")
+    root = os.path.realpath(output_dir)
+    path = os.path.realpath(os.path.join(root, output))
+    if os.path.commonpath([root, path]) != root:
+        raise ValueError("output must stay inside the daemon output directory")
+    return path
+
+
+def parse_job_params(payload: Any, base_delay_ms: int, output_dir: str = ".") -> Dict[str, Any]:
+    """POST /jobs 본문을 작업 파라미터로 바꿈 — JSON 객체가 아니거나 값이 잘못되면 ValueError"""
+    if not isinstance(payload, dict):
+        raise ValueError("job payload must be a JSON object")
+    category_url = str(payload.get("category_url") or "").strip()
+    if not category_url:
+        raise ValueError("category_url is required")
+    output = str(payload.get("output") or "").strip()
+    return {
+        "category_url": category_url,
+        "pages": max(1, int(payload.get("pages", 1))),
+        "items_per_page": int(payload.get("items_per_page", 0)) or None,
+        "max_total_items": int(payload.get("max_total_items", 0)) or None,
+        "delay_ms": int(payload.get("delay_ms", base_delay_ms)),
+        "output": resolve_job_output(output, output_dir) if output else None,
+        "long_format": bool(payload.get("long_format", False)),
+        "relearn": bool(payload.get("relearn", False)),
+        "product_deadline_s": float(payload.get("product_deadline_s", 0)) or None,
+    }
+
+
+class CrawlerDaemon:
+    """브라우저를 띄워 둔 채 작업 큐를 순서대로 처리하는 상주 크롤러
+
+    Playwright sync API 객체는 만든 스레드에서만 쓸 수 있으므로 브라우저와
+    컨텍스트는 전용 워커 스레드 하나가 소유하고, HTTP 스레드는 큐에 작업만 넣는다.
+    카테고리별 Pass 1 학습 결과는 캐시하여 같은 카테고리의 다음 작업에서는 건너뛴다.
+    작업의 output은 output_dir 아래 상대 경로로만 받는다.
+    """
+
+    def __init__(
+        self,
+        headless: bool,
+        base_delay_ms: int,
+        launch_profile: str = "default",
+        recycle_every: int = 0,
+        max_browser_mb: float = 0.0,
+        extract: Optional[ExtractPlan] = None,
+        output_dir: str = ".",
+        sink_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.headless = headless
+        self.output_dir = output_dir
+        self.sink_options = sink_options or {}
+        self.extract = extract or DEFAULT_EXTRACT_PLAN
+        self.launch_profile = launch_profile
+        self.recycle_every = recycle_every
+        self.max_browser_mb = max_browser_mb
+        self.base_delay_ms = base_delay_ms
+        self.jobs: Dict[str, CrawlJob] = {}
+        self.mapping_cache: Dict[str, Dict[str, str]] = {}
+        self._queue: "queue.Queue[Optional[CrawlJob]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=run_profiler.wrap(self._run), name="crawler-worker", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=30)
+
+    def submit(self, payload: Dict[str, Any]) -> CrawlJob:
+        params = parse_job_params(payload, self.base_delay_ms, self.output_dir)
+        job = CrawlJob(uuid.uuid4().hex[:12], params)
+        with self._lock:
+            self.jobs[job.job_id] = job
+            self._prune_finished_jobs()
+        job.emit({"event": "queued", "position": self._queue.qsize()})
+        self._queue.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[CrawlJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.summary() for job in self.jobs.values()]
+
+    def _prune_finished_jobs(self) -> None:
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in sorted(finished, key=lambda j: j.finished_at or 0)[:-MAX_FINISHED_JOBS]:
+            del self.jobs[job.job_id]
+
+    def _run(self) -> None:
+        with sync_playwright() as p:
+            session = BrowserSession(
+                p,
+                headless=self.headless,
+                profile=self.launch_profile,
+                recycle_every=self.recycle_every,
+                max_browser_mb=self.max_browser_mb,
+            )
+            self._ready.set()
+            while True:
+                job = self._queue.get()
+                if job is None:
+                    break
+                try:
+                    if not session.context.browser.is_connected():
+                        session.recycle("브라우저 연결 끊김")
+                    self._run_job(session, job)
+                except Exception as e:
+                    log.error(f"  [데몬] 작업 {job.job_id} 처리 중 오류 - {e}")
+                    if not job.finished:
+                        job.finish("failed", str(e))
+            session.close()
+
+    def _run_job(self, session: BrowserSession, job: CrawlJob) -> None:
+        params = job.params
+        category_url = params["category_url"]
+        job.status = "running"
+        job.emit({"event": "started"})
+        sink: Any = None
+        error = ""
+        try:
+            if params["output"]:
+                os.makedirs(os.path.dirname(params["output"]), exist_ok=True)
+                sink = CsvRowSink(
+                    params["output"],
+                    long_format=params["long_format"],
+                    fieldnames=output_fieldnames(params["product_deadline_s"], self.extract),
+                    **self.sink_options,
+                )
+            else:
+                sink = JobEventSink(job)
+            learned_mapping = None if params["relearn"] else self.mapping_cache.get(category_url)
+            if "specs" not in self.extract:
+                learned_mapping = {}
+            if learned_mapping is None:
+                job.emit({"event": "learning"})
+                checkmark_items = scan_checkmark_items(
+                    session.context,
+                    category_url=category_url,
+                    max_pages=params["pages"],
+                    max_items_per_page=params["items_per_page"],
+                    max_total_items=params["max_total_items"],
+                    base_delay_ms=params["delay_ms"],
+                )
+                learned_mapping = analyze_and_create_mapping(checkmark_items)
+                self.mapping_cache[category_url] = learned_mapping
+            job.collected = crawl_detail_pass(
+                session.context,
+                category_url=category_url,
+                max_pages=params["pages"],
+                max_items_per_page=params["items_per_page"],
+                max_total_items=params["max_total_items"],
+                base_delay_ms=params["delay_ms"],
+                learned_mapping=learned_mapping,
+                sink=sink,
+                progress=job.emit,
+                product_deadline_s=params["product_deadline_s"],
+                session=session,
+                extract=self.extract,
+            )
+        except Exception as e:
+            log.error(f"  [데몬] 작업 {job.job_id} 실패 - {e}")
+            error = str(e)
+        finally:
+            # 출력 파일(압축 마무리, 분할 매니페스트 포함)을 닫은 뒤에 작업을 끝난 것으로 알림
+            if sink is not None:
+                try:
+                    sink.close()
+                except Exception as e:
+                    log.error(f"  [데몬] 작업 {job.job_id} 출력 닫기 실패 - {e}")
+                    error = error or str(e)
+        job.finish("failed" if error else "done", error)
+
+
+def make_daemon_handler(daemon: CrawlerDaemon):
+    class DaemonRequestHandler(BaseHTTPRequestHandler):
+        """POST /jobs, GET /jobs, GET /jobs/<id>, GET /jobs/<id>/events (NDJSON), GET /health"""
+
+        def _send_json(self, status: int, payload: Any) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _path_parts(self) -> List[str]:
+            return [part for part in urlparse(self.path).path.split("/") if part]
+
+        def do_GET(self) -> None:
+            parts = self._path_parts()
+            if parts == ["health"]:
+                self._send_json(200, {"status": "ok", "jobs": len(daemon.jobs)})
+                return
+            if parts == ["jobs"]:
+                self._send_json(200, daemon.list_jobs())
+                return
+            job = daemon.get(parts[1]) if len(parts) >= 2 and parts[0] == "jobs" else None
+            if job is None:
+                self._send_json(404, {"error": "not found"})
+                return
+            if len(parts) == 2:
+                self._send_json(200, job.summary())
+                return
+            if len(parts) == 3 and parts[2] == "events":
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.end_headers()
+                try:
+                    for event in job.iter_events():
+                        self.wfile.write((json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                return
+            self._send_json(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if self._path_parts() != ["jobs"]:
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                job = daemon.submit(payload)
+            except (ValueError, TypeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            self._send_json(202, job.summary())
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return DaemonRequestHandler
+
+
+def serve_daemon(
+    host: str,
+    port: int,
+    headless: bool,
+    base_delay_ms: int,
+    launch_profile: str = "default",
+    recycle_every: int = 0,
+    max_browser_mb: float = 0.0,
+    extract: Optional[ExtractPlan] = None,
+    output_dir: str = ".",
+    sink_options: Optional[Dict[str, Any]] = None,
+) -> None:
+    daemon = CrawlerDaemon(
+        headless=headless,
+        base_delay_ms=base_delay_ms,
+        launch_profile=launch_profile,
+        recycle_every=recycle_every,
+        max_browser_mb=max_browser_mb,
+        extract=extract,
+        output_dir=output_dir,
+        sink_options=sink_options,
+    )
+    daemon.start()
+    server = ThreadingHTTPServer((host, port), make_daemon_handler(daemon))
+    server.daemon_threads = True
+    log.info(f"크롤러 데몬 대기 중: http://{host}:{port} (POST /jobs, 출력 디렉터리 {os.path.abspath(output_dir)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log.info("\n크롤러 데몬 종료 중...")
+    finally:
+        server.server_close()
+        daemon.stop()
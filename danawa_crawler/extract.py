@@ -0,0 +1,1298 @@
+"""상세 페이지 추출기: 선택자 기억, 스펙/가격/가격추이/판매처 추출, 차단 감지, fetch_product_detail"""
+import functools
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Set, Optional, Tuple, Any
+
+from playwright.sync_api import Page, BrowserContext
+
+from danawa_crawler.core import (
+    BlockedPageError,
+    Deadline,
+    extract_pcode,
+    human_delay,
+    log,
+    run_profiler,
+    slow_scroll,
+    SuspectPageError,
+    wait_for_network_idle,
+)
+
+
+def _parse_price(text: str) -> Optional[int]:
+    digits = re.sub(r"[^\d]", "", text or "")
+    if not digits:
+        return None
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+class SelectorMemory:
+    """레이아웃(카테고리 목록 페이지, 상세 페이지)별로 어떤 선택자 변형이 맞았는지 기억
+
+    맞았던 변형을 먼저 시도하고, 다른 변형이 맞는 동안 DEAD_AFTER번 연달아 빗나간 변형은 건너뛴다.
+    걸러 낸 목록으로 아무것도 못 찾으면 빗나감 기록을 지우고 전체 변형으로 다시 학습한다.
+    path를 주면 JSON 파일로 저장해 다음 실행에서도 쓴다. 워커 스레드들이 함께 쓰므로 잠금으로 보호한다.
+    """
+
+    DEAD_AFTER = 3
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._slots: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path:
+            self.load(path)
+
+    def load(self, path: str) -> None:
+        self.path = path
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self._slots = json.load(f)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._lock:
+            data = json.dumps(self._slots, ensure_ascii=False, indent=2)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def _state(self, layout: str, slot: str) -> Dict[str, Any]:
+        return self._slots.setdefault(f"{layout}/{slot}", {"good": None, "misses": {}})
+
+    def order(self, layout: str, slot: str, variants: List[str]) -> List[str]:
+        """시도할 순서: 맞았던 변형 먼저, 죽은 변형은 뺌"""
+        with self._lock:
+            state = self._state(layout, slot)
+            live = [v for v in variants if state["misses"].get(v, 0) < self.DEAD_AFTER]
+            if state["good"] in live:
+                live.remove(state["good"])
+                live.insert(0, state["good"])
+            return live
+
+    def record_hits(self, layout: str, slot: str, hits: Dict[str, int]) -> None:
+        """시도한 변형마다 찾은 개수를 기록 (하나라도 맞았을 때만 나머지를 빗나감으로 셈)"""
+        if not any(hits.values()):
+            return
+        with self._lock:
+            state = self._state(layout, slot)
+            for variant, count in hits.items():
+                if count:
+                    state["misses"][variant] = 0
+                    if state["good"] is None or hits.get(state["good"], 0) == 0:
+                        state["good"] = variant
+                else:
+                    state["misses"][variant] = state["misses"].get(variant, 0) + 1
+
+    def relearn(self, layout: str, slot: str) -> None:
+        """건너뛰던 변형을 다시 살림 (맞았던 변형은 계속 먼저 시도)"""
+        with self._lock:
+            self._state(layout, slot)["misses"] = {}
+        log.info(f"  [선택자] {layout} {slot}: 기억한 선택자로 찾지 못해 다시 학습합니다.")
+
+    def attempts(self, layout: str, slot: str, variants: List[str]) -> List[List[str]]:
+        """시도할 변형 목록들: 기억한 순서(죽은 변형 제외), 죽은 변형이 있으면 그걸로 못 찾았을 때 쓸 전체 목록"""
+        ordered = self.order(layout, slot, variants)
+        return [ordered] if len(ordered) == len(variants) else [ordered, variants]
+
+    def first_hit(
+        self,
+        layout: str,
+        slot: str,
+        variants: List[str],
+        run: Callable[[List[str]], Tuple[Any, Dict[str, int]]],
+    ) -> Any:
+        """run(변형 목록)이 (결과, {실제로 시도한 변형: 찾은 개수})를 돌려주면, 기억한 순서로 먼저 돌리고 하나도
+        못 찾았을 때만 빗나감 기록을 지우고 전체 변형으로 다시 돌림. 찾았으면 기록하고 그 결과를, 아니면 마지막 결과를 반환"""
+        result = None
+        for index, attempt in enumerate(self.attempts(layout, slot, variants)):
+            if index:
+                self.relearn(layout, slot)
+            result, hits = run(attempt)
+            if any(hits.values()):
+                self.record_hits(layout, slot, hits)
+                return result
+        return result
+
+    def pick(self, layout: str, slot: str, variants: List[str], probe: Callable[[str], bool]) -> Optional[str]:
+        """probe가 True인 첫 변형을 돌려줌 (그 앞에서 시도한 변형만 빗나감으로 셈)"""
+
+        def run(attempt: List[str]) -> Tuple[Optional[str], Dict[str, int]]:
+            hits: Dict[str, int] = {}
+            for variant in attempt:
+                hits[variant] = int(probe(variant))
+                if hits[variant]:
+                    return variant, hits
+            return None, hits
+
+        return self.first_hit(layout, slot, variants, run)
+
+
+selector_memory = SelectorMemory()
+
+PRICE_LIST_SELECTORS = ["ul.list__mall-price li.list-item", "ul.list_mall-price li.list-item"]
+PRICE_NUM_SELECTORS = [".text__num", ".text_num"]
+
+
+# 가격 목록 항목마다 [쇼핑몰, 가격 글자, 맞은 가격 선택자 번호(-1이면 없음)]를 evaluate 한 번에 읽음
+MALL_PRICES_JS = """([listSelector, numSelectors]) => Array.from(document.querySelectorAll(listSelector), (item) => {
+    const numIndex = numSelectors.findIndex((selector) => item.querySelector(selector));
+    const priceText = numIndex >= 0 ? item.querySelector(numSelectors[numIndex]).innerText : '';
+    const logo = item.querySelector('img[alt]');
+    const nameEl = item.querySelector('.text__logo, .logo_over, .box__logo');
+    const mall = (logo && logo.getAttribute('alt')) || (nameEl && nameEl.textContent) || '';
+    return [mall.trim(), priceText, numIndex];
+})"""
+
+
+def _price_num_hits(items: List[List[Any]], num_selectors: List[str]) -> Dict[str, int]:
+    """항목마다 맞은 가격 선택자를 셈 — 스크립트는 앞에서부터 시도하므로 어느 항목에서도 닿지 않은 뒤쪽 선택자는 빼고 셈"""
+    probed = len(num_selectors) if any(num_index < 0 for _, _, num_index in items) else (
+        max((num_index + 1 for _, _, num_index in items), default=0)
+    )
+    hits = {selector: 0 for selector in num_selectors[:probed]}
+    for _, _, num_index in items:
+        if num_index >= 0:
+            hits[num_selectors[num_index]] += 1
+    return hits
+
+
+def read_price_items(page: Page) -> List[Tuple[str, str]]:
+    """가격 목록의 (쇼핑몰, 가격 글자) — 목록과 가격 선택자 모두 selector_memory의 기억 순서로 찾음"""
+    list_selector = selector_memory.pick(
+        "detail", "price_list", PRICE_LIST_SELECTORS, lambda selector: page.locator(selector).count() > 0
+    )
+    if list_selector is None:
+        return []
+
+    def run(num_selectors: List[str]) -> Tuple[List[List[Any]], Dict[str, int]]:
+        items = page.evaluate(MALL_PRICES_JS, [list_selector, num_selectors])
+        return items, _price_num_hits(items, num_selectors)
+
+    items = selector_memory.first_hit("detail", "price_num", PRICE_NUM_SELECTORS, run)
+    return [(mall, price_text) for mall, price_text, _ in items or []]
+
+
+def extract_price_range(page: Page) -> Tuple[Optional[int], Optional[int]]:
+    prices: List[int] = []
+
+    try:
+        for _, price_text in read_price_items(page):
+            price_value = _parse_price(price_text)
+            if price_value is not None:
+                prices.append(price_value)
+    except Exception:
+        pass
+
+                                          
+    if not prices:
+        try:
+            min_input = page.locator("input[id^='min_price']")
+            if min_input.count() > 0:
+                min_value = _parse_price(min_input.first.get_attribute("value") or "")
+                if min_value is not None:
+                    prices.append(min_value)
+            max_input = page.locator("input[id^='max_price']")
+            if max_input.count() > 0:
+                max_value = _parse_price(max_input.first.get_attribute("value") or "")
+                if max_value is not None:
+                    prices.append(max_value)
+        except Exception:
+            pass
+
+    if not prices:
+        return None, None
+
+    return min(prices), max(prices)
+
+
+def _normalize_trend_point(point: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    label = str(point.get("label", "")).strip()
+    value = point.get("value")
+    if isinstance(value, (list, tuple)) and value:
+        value = value[0]
+    if isinstance(value, dict):
+        value = value.get("value")
+    if isinstance(value, str):
+        digits = re.sub(r"[^\d]", "", value)
+        value = int(digits) if digits else None
+    if isinstance(value, (int, float)):
+        value = int(round(value))
+    else:
+        value = None
+    return {"label": label, "price": value}
+
+
+# 가격추이 그래프(echarts)의 현재 옵션에서 [{label, value}, ...]를 읽음 (그래프가 없으면 null)
+TREND_POINTS_JS = """() => {
+    const dom = document.querySelector('#graphAreaSmall');
+    if (!dom || !window.echarts) {
+        return null;
+    }
+    const instance = window.echarts.getInstanceByDom(dom);
+    if (!instance) {
+        return null;
+    }
+    const option = instance.getOption();
+    const xAxis = (option.xAxis && option.xAxis[0] && option.xAxis[0].data) || [];
+    const series = (option.series && option.series[0] && option.series[0].data) || [];
+    const points = [];
+    const length = Math.max(xAxis.length, series.length);
+    for (let i = 0; i < length; i++) {
+        const label = xAxis[i] != null ? xAxis[i] : '';
+        const value = series[i];
+        if (value && typeof value === 'object' && value.value != null) {
+            points.push({ label, value: value.value });
+        } else {
+            points.push({ label, value });
+        }
+    }
+    return points;
+}"""
+
+
+def extract_price_trend(
+    page: Page,
+    deadline: Optional[Deadline] = None,
+    periods: Optional[Set[str]] = None,
+) -> Dict[str, List[Dict[str, Optional[int]]]]:
+    """가격추이 그래프의 기간 탭을 하나씩 눌러 echarts 데이터를 읽음 (periods를 주면 그 기간만 클릭)"""
+    trend_data: Dict[str, List[Dict[str, Optional[int]]]] = {}
+    deadline = deadline or Deadline()
+    try:
+        period_items = page.locator("#selectGraphPeriod li[data-attr]")
+        count = period_items.count()
+        if count == 0:
+            return trend_data
+        for idx in range(count):
+            click_budget_ms = deadline.budget_ms("trend", 1000)
+            if click_budget_ms <= 0:
+                break
+            item = period_items.nth(idx)
+            classes = item.get_attribute("class") or ""
+            if "disabled" in classes:
+                continue
+            period_key = item.get_attribute("data-attr") or str(idx)
+            if periods is not None and period_key not in periods:
+                continue
+            try:
+                item.click(timeout=click_budget_ms)
+            except Exception:
+                pass
+            human_delay(400, deadline=deadline)
+            raw_points = page.evaluate(TREND_POINTS_JS)
+            if not raw_points:
+                continue
+            normalized = [_normalize_trend_point(point) for point in raw_points]
+            trend_data[period_key] = normalized
+    except Exception:
+        return trend_data
+    return trend_data
+
+
+
+TREND_FORMAT_VERSION = 1
+TrendData = Dict[str, List[Dict[str, Optional[int]]]]
+
+
+def _label_shape(label: str) -> Optional[str]:
+    """숫자 자리를 9로 바꾼 라벨 모양 ("24.01.15" -> "99.99.99"); 숫자가 없으면 None"""
+    shape = re.sub(r"\d", "9", label)
+    return shape if "9" in shape and len(shape) <= 18 else None
+
+
+def _delta_encode(values: List[Optional[int]]) -> List[Optional[int]]:
+    """정수 목록을 직전 값과의 차이로 바꿈 (None은 그대로 두고 건너뜀)"""
+    encoded: List[Optional[int]] = []
+    previous = 0
+    for value in values:
+        if value is None:
+            encoded.append(None)
+            continue
+        encoded.append(value - previous)
+        previous = value
+    return encoded
+
+
+def _delta_decode(values: List[Optional[int]]) -> List[Optional[int]]:
+    decoded: List[Optional[int]] = []
+    previous = 0
+    for value in values:
+        if value is None:
+            decoded.append(None)
+            continue
+        previous += value
+        decoded.append(previous)
+    return decoded
+
+
+def _run_length_encode(values: List[Optional[int]]) -> List[Optional[int]]:
+    """[값, 반복 수, 값, 반복 수, ...] 형태로 압축 (연속 구간의 인덱스 차이는 대부분 1)"""
+    encoded: List[Optional[int]] = []
+    for value in values:
+        if encoded and encoded[-2] == value:
+            encoded[-1] += 1
+        else:
+            encoded.extend([value, 1])
+    return encoded
+
+
+def _run_length_decode(values: List[Optional[int]]) -> List[Optional[int]]:
+    decoded: List[Optional[int]] = []
+    for i in range(0, len(values), 2):
+        decoded.extend([values[i]] * values[i + 1])
+    return decoded
+
+
+def encode_price_trend(trend_data: TrendData) -> str:
+    """extract_price_trend 결과를 가격추이 열에 저장할 압축 JSON으로 변환
+
+    기간("1", "3", "6", "12"...)마다 겹치는 (라벨, 가격) 점을 한 번만 저장하고, 각 기간은 그 점 목록의
+    인덱스 차이를 런 길이로 압축해 가리킨다. 라벨이 모두 같은 모양의 숫자("24.01.15")면 숫자만 이어 붙인
+    정수를, 가격은 정수를 직전 값과의 차이로 저장한다. decode_price_trend로 원래 구조를 그대로 되살린다.
+    """
+    if not trend_data:
+        return ""
+    points: List[Tuple[str, Optional[int]]] = []
+    for series in trend_data.values():
+        points.extend((point["label"], point["price"]) for point in series)
+    unique_points = list(dict.fromkeys(points))
+
+    shapes = {_label_shape(label) for label, _ in unique_points}
+    shape = shapes.pop() if len(shapes) == 1 else None
+    if shape is not None:
+        label_keys = {label: int(re.sub(r"\D", "", label)) for label, _ in unique_points}
+        unique_points.sort(key=lambda point: (label_keys[point[0]], point[1] is None, point[1] or 0))
+    index_of = {point: index for index, point in enumerate(unique_points)}
+
+    encoded: Dict[str, Any] = {"v": TREND_FORMAT_VERSION}
+    if shape is not None:
+        encoded["f"] = shape
+        encoded["d"] = _delta_encode([label_keys[label] for label, _ in unique_points])
+    else:
+        encoded["l"] = [label for label, _ in unique_points]
+    encoded["p"] = _delta_encode([price for _, price in unique_points])
+    encoded["s"] = [
+        [period, _run_length_encode(_delta_encode([index_of[(point["label"], point["price"])] for point in series]))]
+        for period, series in trend_data.items()
+    ]
+    return json.dumps(encoded, ensure_ascii=False, separators=(",", ":"))
+
+
+@functools.lru_cache(maxsize=1024)
+def _decode_trend_labels(shape: str, deltas: Tuple[int, ...]) -> List[str]:
+    """라벨 모양과 차분 키에서 라벨 목록 복원 (같은 날 수집한 상품들은 라벨 목록이 같아 캐시가 잘 맞음)"""
+    width = shape.count("9")
+    template = shape.replace("{", "{{").replace("}", "}}").replace("9", "{}")
+    return [template.format(*str(key).zfill(width)) for key in _delta_decode(list(deltas))]
+
+
+def decode_price_trend(value: str) -> TrendData:
+    """가격추이 열 값을 {기간: [{label, price}, ...]} 구조로 되돌림 (이전 형식의 JSON도 그대로 읽음)"""
+    if not value:
+        return {}
+    encoded = json.loads(value)
+    if "v" not in encoded:
+        return encoded
+    if encoded["v"] != TREND_FORMAT_VERSION:
+        raise ValueError(f"지원하지 않는 가격추이 형식 버전: {encoded['v']}")
+
+    if "f" in encoded:
+        labels = _decode_trend_labels(encoded["f"], tuple(encoded["d"]))
+    else:
+        labels = encoded["l"]
+    prices = _delta_decode(encoded["p"])
+
+    trend_data: TrendData = {}
+    for period, runs in encoded["s"]:
+        indexes = _delta_decode(_run_length_decode(runs))
+        trend_data[period] = [{"label": labels[i], "price": prices[i]} for i in indexes]
+    return trend_data
+
+
+# th가 있는 행마다 [th 텍스트들, td 텍스트들] — 예전처럼 행/셀마다 locator로 왕복하지 않고 evaluate 한 번에 읽음
+SPEC_TABLE_ROWS_JS = """() => Array.from(document.querySelectorAll('tr'))
+    .map((tr) => [
+        Array.from(tr.querySelectorAll('th'), (th) => th.innerText),
+        Array.from(tr.querySelectorAll('td'), (td) => td.innerText),
+    ])
+    .filter(([ths]) => ths.length > 0)"""
+
+
+def parse_spec_rows(rows: List[Tuple[List[str], List[str]]]) -> Dict[str, str]:
+    """스펙 표 행들의 (th 텍스트들, td 텍스트들)을 {항목: 값}으로 정리"""
+    specs: Dict[str, str] = {}
+    
+    def add_or_append_spec(key: str, value: str):
+        """같은 키가 이미 있으면 값을 합치고, 없으면 추가"""
+                                            
+        if key == value:
+            return
+            
+        if key in specs:
+                                         
+            if specs[key] == value:
+                return
+                                         
+            if value in specs[key]:
+                return
+                                      
+            if specs[key] in value:
+                return
+                           
+            existing_values = [v.strip() for v in specs[key].split(',')]
+            if value.strip() not in existing_values:
+                specs[key] = f"{specs[key]},{value}"
+        else:
+            specs[key] = value
+    
+    for ths, tds in rows:
+                                                    
+        if len(ths) == 1 and len(tds) > 1:
+            parent_key = ths[0].strip()
+                                             
+            for td in tds:
+                value = td.strip()
+                                        
+                if value and value not in ["○", "O", "o", "●"]:
+                                                 
+                    add_or_append_spec(parent_key, value)
+        
+                     
+        for i in range(min(len(ths), len(tds))):
+            key = ths[i].strip()
+            value = tds[i].strip()
+            
+            if not key:
+                continue
+            
+                  
+            value = value.split("인증번호 확인")[0].strip()
+            value = value.split("바로가기")[0].strip()
+            value = re.sub(r'\s*\([^)]*\)', '', value)
+            
+            if value:
+                add_or_append_spec(key, value)
+
+    return specs
+
+
+def extract_specs_from_detail(page: Page) -> Dict[str, str]:
+    return parse_spec_rows(page.evaluate(SPEC_TABLE_ROWS_JS))
+
+
+DETAIL_TAB_LABELS = ["상세정보", "상세 사양", "상세스펙", "상세 스펙", "스펙", "사양"]
+DETAIL_SPEC_MIN_ROWS = 3
+
+# 스펙 표가 이미 DOM에 있는지: th와 td를 함께 가진 행 수
+SPEC_ROWS_JS = """() => Array.from(document.querySelectorAll('tr'))
+    .filter(tr => tr.querySelector('th') && tr.querySelector('td')).length"""
+
+# 예전의 라벨 x (button, link, text) 탐색을 evaluate 한 번으로: 라벨 순서대로, 클릭 가능한 요소(버튼/링크/탭)에서
+# 텍스트가 라벨과 같은 것 → 라벨을 담은 짧은 텍스트 → 라벨과 같은 글자 요소의 클릭 가능한 조상 순으로 찾아 클릭하고
+# 클릭한 라벨을 돌려줌. 클릭 가능한 조상이 없는 글자(리뷰 문구, 배너 등)는 누르지 않는다
+CLICK_DETAIL_TAB_JS = """(labels) => {
+    const norm = (el) => (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+    const clickableSelector = 'a, button, [role=button], [role=tab]';
+    const clickables = Array.from(document.querySelectorAll(clickableSelector)).filter(visible);
+    const texts = Array.from(document.querySelectorAll('li, span, em, strong')).filter(visible);
+    const clickTarget = (el) => el.closest(clickableSelector) || (el.tagName === 'LI' ? el.querySelector(':scope > a') : null);
+    for (const label of labels) {
+        let match = clickables.find((el) => norm(el) === label);
+        if (!match) {
+            match = clickables.find((el) => {
+                const text = norm(el);
+                return text.length <= label.length + 8 && text.includes(label);
+            });
+        }
+        if (!match) {
+            const inner = texts.find((el) => norm(el) === label && clickTarget(el));
+            match = inner ? clickTarget(inner) : null;
+        }
+        if (match) {
+            match.click();
+            return label;
+        }
+    }
+    return null;
+}"""
+
+INJECT_DETAIL_FRAGMENT_JS = """(html) => {
+    const host = document.createElement('div');
+    host.id = 'crawlerDetailFragment';
+    host.innerHTML = html;
+    document.body.appendChild(host);
+}"""
+
+
+def spec_rows_in_dom(page: Page) -> int:
+    try:
+        return int(page.evaluate(SPEC_ROWS_JS) or 0)
+    except Exception:
+        return 0
+
+
+def click_detail_tab_if_present(page: Page, deadline: Optional[Deadline] = None) -> bool:
+    """상세정보 탭을 evaluate 한 번으로 찾아 클릭하고 네트워크가 잠잠해질 때까지 기다림, 클릭했으면 True"""
+    deadline = deadline or Deadline()
+    if deadline.budget_ms("detail_tab", 2000) <= 0:
+        return False
+
+    def run(labels: List[str]) -> Tuple[Optional[str], Dict[str, int]]:
+        # 스크립트는 라벨을 순서대로 시도하므로 클릭한 라벨 앞의 것만 빗나감
+        clicked = page.evaluate(CLICK_DETAIL_TAB_JS, labels)
+        tried = labels[: labels.index(clicked) + 1] if clicked in labels else labels
+        return clicked, {label: int(label == clicked) for label in tried}
+
+    try:
+        clicked = selector_memory.first_hit("detail", "tab_label", DETAIL_TAB_LABELS, run)
+    except Exception:
+        return False
+    if not clicked:
+        return False
+    idle_budget_ms = deadline.budget_ms("detail_tab", 3000)
+    if idle_budget_ms > 0:
+        wait_for_network_idle(page, timeout_ms=idle_budget_ms)
+    return True
+
+
+class DetailFragmentCache:
+    """상세정보 탭이 불러오는 요청(조각 HTML)을 한 번 관찰해 두고, 다음 상품부터는 그 요청을 직접 보냄
+
+    처음 몇 개 상품에서 탭을 클릭할 때 오가는 XHR/fetch 응답 중 스펙 표(th/td 행)를 담고 pcode를
+    포함한 요청을 찾아 pcode 자리만 바꿔 쓸 수 있는 형태로 기억한다. 직접 요청이 연달아 실패하면 잊고
+    다시 클릭 방식으로 돌아간다. 워커 스레드들이 함께 쓰므로 잠금으로 보호한다.
+    """
+
+    MAX_LEARN_ATTEMPTS = 5
+    MAX_FETCH_FAILURES = 3
+
+    def __init__(self) -> None:
+        self.template: Optional[Dict[str, Any]] = None
+        self.learn_attempts = 0
+        self.fetch_failures = 0
+        self.sources = {"dom": 0, "fragment": 0, "tab": 0, "none": 0}
+        self._lock = threading.Lock()
+
+    def should_learn(self) -> bool:
+        with self._lock:
+            return self.template is None and self.learn_attempts < self.MAX_LEARN_ATTEMPTS
+
+    def learn(self, responses: List[Any], pcode: str) -> None:
+        with self._lock:
+            self.learn_attempts += 1
+        for response in responses:
+            try:
+                body = response.text()
+            except Exception:
+                continue
+            if body.count("<th") < DETAIL_SPEC_MIN_ROWS:
+                continue
+            request = response.request
+            post_data = request.post_data or ""
+            if pcode not in request.url and pcode not in post_data:
+                continue
+            template = {
+                "method": request.method,
+                "url": request.url.replace(pcode, "{pcode}"),
+                "post_data": post_data.replace(pcode, "{pcode}") or None,
+                "content_type": request.headers.get("content-type"),
+            }
+            with self._lock:
+                if self.template is None:
+                    self.template = template
+                    self.fetch_failures = 0
+                    log.debug(f"    [상세정보] 조각 요청 학습: {template['method']} {template['url'][:80]}")
+            return
+
+    def fetch(self, page: Page, pcode: str, referer: str, timeout_ms: int) -> Optional[str]:
+        """학습한 요청으로 조각 HTML을 가져옴. 스펙 표가 없으면 None"""
+        with self._lock:
+            template = self.template
+        if template is None:
+            return None
+        headers = {"Referer": referer, "X-Requested-With": "XMLHttpRequest"}
+        if template["content_type"]:
+            headers["Content-Type"] = template["content_type"]
+        try:
+            response = page.context.request.fetch(
+                template["url"].replace("{pcode}", pcode),
+                method=template["method"],
+                data=template["post_data"].replace("{pcode}", pcode) if template["post_data"] else None,
+                headers=headers,
+                timeout=timeout_ms,
+            )
+            body = response.text() if response.ok else ""
+        except Exception:
+            body = ""
+        with self._lock:
+            if body.count("<th") >= DETAIL_SPEC_MIN_ROWS:
+                self.fetch_failures = 0
+                return body
+            self.fetch_failures += 1
+            if self.fetch_failures >= self.MAX_FETCH_FAILURES and self.template is template:
+                log.warning("    [상세정보] 조각 요청이 연달아 실패하여 탭 클릭 방식으로 돌아갑니다.")
+                self.template = None
+                self.learn_attempts = 0
+        return None
+
+    def count(self, source: str) -> None:
+        with self._lock:
+            self.sources[source] += 1
+
+
+detail_fragment_cache = DetailFragmentCache()
+
+
+def load_detail_specs(
+    page: Page,
+    link: str,
+    deadline: Optional[Deadline] = None,
+    cache: Optional[DetailFragmentCache] = None,
+) -> str:
+    """스펙 표를 DOM에 올림: 이미 있으면 그대로, 학습한 조각 요청이 있으면 직접 받아 붙이고,
+    아니면 상세정보 탭을 클릭(하면서 조각 요청을 학습). 어떤 방법을 썼는지 반환"""
+    deadline = deadline or Deadline()
+    cache = cache or detail_fragment_cache
+    if spec_rows_in_dom(page) >= DETAIL_SPEC_MIN_ROWS:
+        cache.count("dom")
+        return "dom"
+
+    pcode = extract_pcode(link)
+    if pcode:
+        budget_ms = deadline.budget_ms("detail_tab", 5000)
+        if budget_ms > 0:
+            fragment = cache.fetch(page, pcode, link, budget_ms)
+            if fragment is not None:
+                try:
+                    page.evaluate(INJECT_DETAIL_FRAGMENT_JS, fragment)
+                    cache.count("fragment")
+                    return "fragment"
+                except Exception:
+                    pass
+
+    responses: List[Any] = []
+    learning = bool(pcode) and cache.should_learn()
+
+    def on_response(response: Any) -> None:
+        if response.request.resource_type in ("xhr", "fetch", "document"):
+            responses.append(response)
+
+    if learning:
+        page.on("response", on_response)
+    try:
+        clicked = click_detail_tab_if_present(page, deadline=deadline)
+    finally:
+        if learning:
+            page.remove_listener("response", on_response)
+    if clicked and learning:
+        cache.learn(responses, pcode)
+    cache.count("tab" if clicked else "none")
+    return "tab" if clicked else "none"
+
+
+BLOCK_STATUSES = {403, 429, 503}
+# 상품명에 흔한 말("iRobot" 등)은 넣지 않음 — 제목은 정상 상품마다 검사한다
+BLOCK_TITLE_MARKERS = [
+    "captcha", "access denied", "just a moment", "attention required",
+    "접근이 제한", "접근 제한", "비정상적인 접근", "보안 확인", "자동입력 방지", "자동 입력 방지",
+]
+BLOCK_TEXT_MARKERS = [
+    "captcha", "are you a robot", "unusual traffic", "비정상적인 접근", "접근이 제한", "자동입력 방지", "자동 입력 방지",
+]
+
+# 차단/캡차 페이지 표식: 제목, 캡차 요소, 본문 앞부분 — 스펙이나 제목이 비었을 때만 한 번 읽음
+BLOCK_PAGE_JS = """(selectors) => ({
+    title: document.title || '',
+    markers: selectors.filter((selector) => document.querySelector(selector)),
+    text: ((document.body && document.body.innerText) || '').slice(0, 2000),
+})"""
+BLOCK_DOM_SELECTORS = [
+    "iframe[src*='captcha']", "iframe[src*='recaptcha']", "iframe[src*='challenge']",
+    ".g-recaptcha", ".h-captcha", "#captcha", "[id*='captcha']", "[class*='captcha']", "form[action*='captcha']",
+]
+# 차단 페이지로 넘겨질 때 주소에 나타나는 말 (상품 주소 prod.danawa.com/info/?pcode=...에는 없음)
+BLOCK_URL_MARKERS = ["captcha", "challenge", "/block", "blocked", "denied", "abuse", "/sorry"]
+
+
+def classify_block_url(url: str) -> Optional[str]:
+    """차단/캡차 페이지로 넘겨진 주소면 사유를 반환"""
+    lowered = (url or "").lower()
+    for marker in BLOCK_URL_MARKERS:
+        if marker in lowered:
+            return f"차단 주소로 이동 {url[:80]}"
+    return None
+
+
+def classify_block_page(title: str, markers: List[str], text: str = "") -> Optional[str]:
+    """제목, 캡차 요소, 본문 앞부분으로 차단 페이지인지 판단해 사유를 반환 (정상 페이지면 None)"""
+    if markers:
+        return f"캡차 요소 {markers[0]}"
+    lowered_title = title.lower()
+    for marker in BLOCK_TITLE_MARKERS:
+        if marker in lowered_title:
+            return f"제목 '{title[:40]}'"
+    lowered_text = text.lower()
+    for marker in BLOCK_TEXT_MARKERS:
+        if marker in lowered_text:
+            return f"본문 '{marker}'"
+    return None
+
+
+class BlockMonitor:
+    """상세 페이지 응답마다 차단/캡차 여부를 판단하고, 감지하면 모든 워커를 멈췄다가 느리게 다시 돌림
+
+    멈추는 건 확실한 신호가 있을 때뿐이다: 상태 코드(403/429/503), 차단 주소로의 이동, 그리고 스펙이나
+    제목이 비었을 때 읽는 제목/캡차 요소/본문 문구. 신호 없이 스펙만 빈 상품은 조용한 차단일 수도, 원래
+    스펙이 없는 상품일 수도 있으므로 SuspectPageError로 한 번 재시도 큐에 미뤄 행을 쓰지 않고, 다시 왔을 때
+    그 사이 차단이 확인되지 않았으면 그대로 받아들인다(차단이 확인됐으면 또 미룸). 빈 스펙을 연달아
+    min_samples번 받아들였으면 스펙이 없는 카테고리로 보고 더 미루지 않는다. 최근 window개 상품 중 스펙이 빈
+    비율이 empty_ratio 이상이면 경고만 남긴다(0이면 빈 스펙 처리 전체를 끔).
+    감지할 때마다 pause_s부터 두 배씩(최대 max_pause_s) 멈추고 상품 사이 추가 대기를 늘리며,
+    recover_after개 연속 정상이면 추가 대기를 절반씩 줄인다. 차단된 상품은 BlockedPageError로 실패해
+    각 모드의 재시도 큐로 돌아간다. 워커 스레드들이 함께 쓰므로 잠금으로 보호한다.
+    """
+
+    MAX_THROTTLE_S = 30.0
+
+    def __init__(
+        self,
+        window: int = 20,
+        empty_ratio: float = 0.8,
+        min_samples: int = 8,
+        pause_s: float = 120.0,
+        max_pause_s: float = 1800.0,
+        recover_after: int = 20,
+        defer_empty: bool = True,
+    ) -> None:
+        self.configure(window, empty_ratio, min_samples, pause_s, max_pause_s, recover_after, defer_empty)
+        self._lock = threading.Lock()
+
+    def configure(
+        self,
+        window: int = 20,
+        empty_ratio: float = 0.8,
+        min_samples: int = 8,
+        pause_s: float = 120.0,
+        max_pause_s: float = 1800.0,
+        recover_after: int = 20,
+        defer_empty: bool = True,
+    ) -> None:
+        """defer_empty=False면 빈 스펙 상품을 미루지 않음 (재시도가 없는 실행에서 행을 잃지 않도록)"""
+        self.empty_ratio = empty_ratio
+        self.min_samples = min(min_samples, window)
+        self.pause_s = pause_s
+        self.max_pause_s = max_pause_s
+        self.recover_after = recover_after
+        self.defer_empty = defer_empty and empty_ratio > 0
+        self.paused_until = 0.0
+        self.throttle_s = 0.0
+        self.blocks = 0
+        self.trips = 0
+        self.deferred = 0
+        self._streak_trips = 0
+        self._clean_streak = 0
+        self._accepted_empty = 0
+        self._spiking = False
+        self._held: Dict[str, int] = {}
+        self._empty: Deque[bool] = deque(maxlen=max(1, window))
+
+    def wait(self) -> None:
+        """멈춘 동안 기다리고, 감속 중이면 상품마다 추가로 쉼"""
+        remaining = self.paused_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        if self.throttle_s > 0:
+            time.sleep(self.throttle_s * random.uniform(0.8, 1.2))
+
+    def check_response(self, response: Any) -> None:
+        status = getattr(response, "status", None)
+        if status in BLOCK_STATUSES:
+            self._blocked(f"HTTP {status}")
+        reason = classify_block_url(getattr(response, "url", ""))
+        if reason is not None:
+            self._blocked(reason)
+
+    def check_detail(self, page: Page, detail: Dict[str, Any], extract: "ExtractPlan") -> None:
+        """주소는 늘, 페이지 표식은 추출 결과가 비었을 때만 읽어 차단 신호를 찾고, 빈 스펙 상품을 미룰지 정함
+        (시간 예산에 잘린 상품의 빈 스펙은 세지도 미루지도 않음)"""
+        reason = classify_block_url(page.url)
+        if reason is not None:
+            self._blocked(reason)
+        empty_specs = "specs" in extract and not detail["specs"] and not detail["partial"]
+        if empty_specs or ("title" in extract and not detail["title"]):
+            try:
+                state = page.evaluate(BLOCK_PAGE_JS, BLOCK_DOM_SELECTORS)
+            except Exception:
+                state = None
+            if state is not None:
+                reason = classify_block_page(state["title"], state["markers"], state["text"])
+                if reason is not None:
+                    self._blocked(reason)
+        elif "title" in extract:
+            reason = classify_block_page(detail["title"], [])
+            if reason is not None:
+                self._blocked(reason)
+        if "specs" not in extract or detail["partial"]:
+            self._clean()
+            return
+        self._observe_specs(detail["url"], empty_specs)
+
+    def _observe_specs(self, link: str, empty_specs: bool) -> None:
+        with self._lock:
+            self._empty.append(empty_specs)
+            ratio = self._empty.count(True) / len(self._empty)
+            spiking = self.empty_ratio > 0 and len(self._empty) >= self.min_samples and ratio >= self.empty_ratio
+            warn = spiking and not self._spiking
+            self._spiking = spiking
+            hold = False
+            if not empty_specs:
+                self._accepted_empty = 0
+            elif self.defer_empty:
+                held_at = self._held.pop(link, None)
+                if held_at is None:
+                    hold = self._accepted_empty < self.min_samples
+                else:
+                    hold = held_at != self.blocks
+                if hold:
+                    self._held[link] = self.blocks
+                    self.deferred += 1
+                else:
+                    self._accepted_empty += 1
+        if warn:
+            log.warning(
+                f"  [차단 의심] 최근 {len(self._empty)}개 중 빈 스펙 {ratio:.0%} — 차단 신호가 없어 멈추지는 않습니다.",
+                extra={"data": {"event": "empty_specs_spike", "ratio": ratio, "window": len(self._empty)}},
+            )
+        if hold:
+            raise SuspectPageError("차단 신호 없이 스펙이 비어 행을 쓰지 않고 다시 시도합니다")
+        if not empty_specs:
+            self._clean()
+
+    def _clean(self) -> None:
+        with self._lock:
+            self._clean_streak += 1
+            if self._clean_streak < self.recover_after:
+                return
+            self._clean_streak = 0
+            self._streak_trips = 0
+            if self.throttle_s > 0:
+                self.throttle_s = self.throttle_s / 2 if self.throttle_s >= 1.0 else 0.0
+                log.info(f"  [차단 감지] 정상 응답이 이어져 상품 간 추가 대기를 {self.throttle_s:.1f}초로 줄입니다.")
+
+    def _blocked(self, reason: str) -> None:
+        with self._lock:
+            # 미뤄 둔 빈 스펙 상품은 held_at != blocks가 되어 다시 왔을 때 또 미뤄짐
+            self.blocks += 1
+            self._clean_streak = 0
+            self._accepted_empty = 0
+            self._spiking = False
+            self._empty.clear()
+            if time.monotonic() >= self.paused_until:
+                self.trips += 1
+                self._streak_trips += 1
+                pause_s = min(self.max_pause_s, self.pause_s * (2 ** (self._streak_trips - 1)))
+                self.paused_until = time.monotonic() + pause_s
+                self.throttle_s = min(self.MAX_THROTTLE_S, max(1.0, self.throttle_s * 2))
+                log.warning(
+                    f"  [차단 감지] {reason} — {pause_s:.0f}초 동안 멈추고 상품 간 {self.throttle_s:.1f}초씩 더 쉽니다.",
+                    extra={"data": {"event": "blocked", "reason": reason, "pause_s": pause_s, "throttle_s": self.throttle_s}},
+                )
+        raise BlockedPageError(f"차단 페이지 감지: {reason}")
+
+
+block_monitor = BlockMonitor()
+
+
+def extract_mall_prices(page: Page) -> List[Tuple[str, int]]:
+    """판매처별 가격 목록 [(쇼핑몰, 가격), ...] — 가격 목록 선택자는 extract_price_range와 같은 기억을 씀"""
+    malls: List[Tuple[str, int]] = []
+    for mall, price_text in read_price_items(page):
+        price = _parse_price(price_text)
+        if price is not None:
+            malls.append((mall, price))
+    return malls
+
+
+# 컨텍스트마다 add_init_script로 한 번 심어 두는 상품 추출 함수. 켠 추출기에 해당하는 제목, 스펙 행,
+# 판매처 가격, 가격추이(기간 탭 클릭과 그래프 갱신 대기까지 페이지 안에서)를 JSON 하나로 돌려줘서 상품 하나의
+# 추출이 evaluate 한 번(스펙 표를 불러오는 단계를 빼면)으로 끝난다
+FUSED_EXTRACT_JS = """(() => {
+    const specRows = """ + SPEC_TABLE_ROWS_JS + """;
+    const chartPoints = """ + TREND_POINTS_JS + """;
+    const mallItems = """ + MALL_PRICES_JS + """;
+    const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+    const inputValue = (selector) => {
+        const input = document.querySelector(selector);
+        return input ? input.getAttribute('value') : null;
+    };
+    const mallPrices = (listAttempts, numAttempts) => {
+        for (let attempt = 0; attempt < listAttempts.length; attempt++) {
+            for (let index = 0; index < listAttempts[attempt].length; index++) {
+                const listSelector = listAttempts[attempt][index];
+                if (!document.querySelector(listSelector)) {
+                    continue;
+                }
+                let items = [];
+                for (let numAttempt = 0; numAttempt < numAttempts.length; numAttempt++) {
+                    items = mallItems([listSelector, numAttempts[numAttempt]]);
+                    if (items.some((item) => item[2] >= 0) || numAttempt === numAttempts.length - 1) {
+                        return { match: [attempt, index], numAttempt, items };
+                    }
+                }
+            }
+        }
+        return { match: null, numAttempt: 0, items: [] };
+    };
+    const readTrend = async ({ periods, budgetMs, settleMs }) => {
+        const started = performance.now();
+        const left = () => budgetMs - (performance.now() - started);
+        const points = [];
+        let cut = false;
+        const items = document.querySelectorAll('#selectGraphPeriod li[data-attr]');
+        for (let idx = 0; idx < items.length; idx++) {
+            if (left() <= 0) {
+                cut = true;
+                break;
+            }
+            const item = items[idx];
+            if ((item.getAttribute('class') || '').includes('disabled')) {
+                continue;
+            }
+            const key = item.getAttribute('data-attr') || String(idx);
+            if (periods && !periods.includes(key)) {
+                continue;
+            }
+            const before = JSON.stringify(chartPoints());
+            try {
+                (item.querySelector('a, button') || item).click();
+            } catch (e) {}
+            const waitMs = Math.min(settleMs + Math.random() * settleMs, Math.max(0, left()));
+            const waitStarted = performance.now();
+            while (performance.now() - waitStarted < waitMs) {
+                await sleep(50);
+                if (JSON.stringify(chartPoints()) !== before) {
+                    await sleep(50);
+                    break;
+                }
+            }
+            const current = chartPoints();
+            if (current && current.length) {
+                points.push([key, current]);
+            }
+        }
+        return { points, cut };
+    };
+    const extract = async (options) => {
+        const payload = {};
+        if (options.title) {
+            payload.title = document.title;
+        }
+        if (options.specs) {
+            payload.specRows = specRows();
+        }
+        if (options.prices) {
+            payload.prices = mallPrices(options.prices.listAttempts, options.prices.numAttempts);
+            payload.priceInputs = [inputValue("input[id^='min_price']"), inputValue("input[id^='max_price']")];
+        }
+        if (options.trend) {
+            payload.trend = await readTrend(options.trend);
+        }
+        return payload;
+    };
+    Object.defineProperty(window, '__danawaExtract', { value: extract, configurable: true });
+})();"""
+
+# 주입 스크립트가 없는 페이지(JS를 끈 프로필, 스크립트를 심기 전에 연 컨텍스트)에서는 null → 추출기별 방식으로
+FUSED_EXTRACT_CALL_JS = "(options) => window.__danawaExtract ? window.__danawaExtract(options) : null"
+TREND_SETTLE_MS = 400
+
+
+def install_fused_extract(context: BrowserContext) -> None:
+    """이 컨텍스트에서 새로 여는 페이지마다 상품 추출 함수를 미리 심어 둠"""
+    try:
+        context.add_init_script(FUSED_EXTRACT_JS)
+    except Exception as e:
+        log.debug(f"    추출 스크립트 주입 실패 - 추출기별 방식 사용: {e}")
+
+
+def _fused_price_options() -> Dict[str, List[List[str]]]:
+    """가격 목록/가격 선택자의 시도 순서 — read_price_items와 같은 selector_memory.attempts를 페이지 안에서 따름"""
+    return {
+        "listAttempts": selector_memory.attempts("detail", "price_list", PRICE_LIST_SELECTORS),
+        "numAttempts": selector_memory.attempts("detail", "price_num", PRICE_NUM_SELECTORS),
+    }
+
+
+def _record_fused_price_hits(prices: Dict[str, Any], options: Dict[str, List[List[str]]]) -> None:
+    """페이지 안에서 고른 가격 선택자를 selector_memory.first_hit과 같은 방식으로 기록 (시도한 변형만 셈)"""
+    if prices.get("match") is None:
+        return
+    attempt, index = prices["match"]
+    if attempt > 0:
+        selector_memory.relearn("detail", "price_list")
+    tried = options["listAttempts"][attempt][: index + 1]
+    selector_memory.record_hits("detail", "price_list", {variant: int(variant == tried[-1]) for variant in tried})
+    if prices["numAttempt"] > 0:
+        selector_memory.relearn("detail", "price_num")
+    num_selectors = options["numAttempts"][prices["numAttempt"]]
+    selector_memory.record_hits("detail", "price_num", _price_num_hits(prices["items"], num_selectors))
+
+
+class Extractor:
+    """상세 페이지 추출기 하나
+
+    run(page, link, deadline, plan)은 상세 결과에 합칠 필드를 돌려주고, empty()는 이 추출기를 끈 실행에서
+    같은 필드를 채울 빈 값이다. needs_scroll이 False인 추출기만 켜면 네트워크 대기와 스크롤도 건너뛴다.
+    fused(payload, deadline, plan)가 있으면 주입 스크립트 결과에서 같은 필드를 만들고 run은 스크립트가 없을 때만 쓴다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Page, str, "Deadline", "ExtractPlan"], Dict[str, Any]],
+        empty: Callable[[], Dict[str, Any]],
+        needs_scroll: bool,
+        help: str,
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.empty = empty
+        self.needs_scroll = needs_scroll
+        self.help = help
+        self.fused: Optional[Callable[[Dict[str, Any], "Deadline", "ExtractPlan"], Dict[str, Any]]] = None
+
+
+EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(
+    name: str,
+    empty: Callable[[], Dict[str, Any]],
+    needs_scroll: bool = True,
+    help: str = "",
+) -> Callable[[Callable[..., Dict[str, Any]]], Callable[..., Dict[str, Any]]]:
+    """추출기 등록 데코레이터 — 등록 순서가 실행 순서이므로 클릭이 필요한 추출기는 나중에 등록한다"""
+
+    def decorator(run: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        EXTRACTORS[name] = Extractor(name, run, empty, needs_scroll, help)
+        return run
+
+    return decorator
+
+
+def fused_extractor(name: str) -> Callable[[Callable[..., Dict[str, Any]]], Callable[..., Dict[str, Any]]]:
+    """등록한 추출기에 주입 스크립트 결과(payload)를 필드로 바꾸는 함수를 붙이는 데코레이터"""
+
+    def decorator(convert: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+        EXTRACTORS[name].fused = convert
+        return convert
+
+    return decorator
+
+
+@register_extractor("specs", lambda: {"specs": {}}, help="상세 스펙 (상세정보 탭/조각 로드 포함)")
+def _extract_specs(page: Page, link: str, deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    load_detail_specs(page, link, deadline=deadline)
+    return {"specs": extract_specs_from_detail(page)}
+
+
+@fused_extractor("specs")
+def _fused_specs(payload: Dict[str, Any], deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    return {"specs": parse_spec_rows(payload["specRows"])}
+
+
+@register_extractor("price", lambda: {"min_price": None, "max_price": None}, help="최저가/최고가")
+def _extract_price(page: Page, link: str, deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    min_price, max_price = extract_price_range(page)
+    return {"min_price": min_price, "max_price": max_price}
+
+
+@fused_extractor("price")
+def _fused_price(payload: Dict[str, Any], deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    prices = [price for price in (_parse_price(text) for _, text, _ in payload["prices"]["items"]) if price is not None]
+    if not prices:
+        prices = [price for price in (_parse_price(value or "") for value in payload["priceInputs"]) if price is not None]
+    if not prices:
+        return {"min_price": None, "max_price": None}
+    return {"min_price": min(prices), "max_price": max(prices)}
+
+
+@register_extractor("malls", lambda: {"malls": []}, help="판매처별 가격 목록")
+def _extract_malls(page: Page, link: str, deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    try:
+        return {"malls": extract_mall_prices(page)}
+    except Exception as e:
+        log.warning(f"    경고: 판매처 추출 실패 - {e}")
+        return {"malls": []}
+
+
+@fused_extractor("malls")
+def _fused_malls(payload: Dict[str, Any], deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    malls = [(mall, _parse_price(text)) for mall, text, _ in payload["prices"]["items"]]
+    return {"malls": [(mall, price) for mall, price in malls if price is not None]}
+
+
+@register_extractor("title", lambda: {"title": ""}, needs_scroll=False, help="상품명")
+def _extract_title(page: Page, link: str, deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    try:
+        return {"title": page.title() or ""}
+    except Exception as e:
+        log.warning(f"    경고: 제목 추출 실패 - {e}")
+        return {"title": ""}
+
+
+@fused_extractor("title")
+def _fused_title(payload: Dict[str, Any], deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    return {"title": payload["title"] or ""}
+
+
+@register_extractor("trend", lambda: {"price_trend": {}}, help="가격추이 그래프 (기간마다 클릭)")
+def _extract_trend(page: Page, link: str, deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    return {"price_trend": extract_price_trend(page, deadline=deadline, periods=plan.trend_periods)}
+
+
+@fused_extractor("trend")
+def _fused_trend(payload: Dict[str, Any], deadline: "Deadline", plan: "ExtractPlan") -> Dict[str, Any]:
+    trend = payload["trend"]
+    if trend["cut"]:
+        deadline.cut("trend")
+    return {"price_trend": {key: [_normalize_trend_point(point) for point in points] for key, points in trend["points"]}}
+
+
+class ExtractPlan:
+    """이번 실행에서 켤 추출기들과 가격추이 기간 — 끈 추출기는 클릭, 대기, 왕복을 하나도 하지 않는다
+
+    names가 None이면 등록된 추출기 전부이고, trend_periods가 None이면 가격추이의 모든 기간을 읽는다.
+    fused가 True면 페이지에 심어 둔 추출 함수를 evaluate 한 번으로 불러 fused 변환이 있는 추출기를 모두 채운다.
+    """
+
+    def __init__(
+        self,
+        names: Optional[List[str]] = None,
+        trend_periods: Optional[List[str]] = None,
+        fused: bool = True,
+    ) -> None:
+        names = list(EXTRACTORS) if names is None else names
+        unknown = [name for name in names if name not in EXTRACTORS]
+        if unknown:
+            raise ValueError(f"알 수 없는 추출기: {', '.join(unknown)} (사용 가능: {', '.join(EXTRACTORS)})")
+        self.names = [name for name in EXTRACTORS if name in names]
+        self.trend_periods = set(trend_periods) if trend_periods else None
+        self.needs_scroll = any(EXTRACTORS[name].needs_scroll for name in self.names)
+        self.fused = fused and any(EXTRACTORS[name].fused is not None for name in self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names
+
+    @classmethod
+    def parse(cls, value: str, trend_periods: Optional[str] = None, fused: bool = True) -> "ExtractPlan":
+        """'specs,price' 같은 쉼표 목록 (또는 'all')"""
+        names = None if value == "all" else [name.strip() for name in value.split(",") if name.strip()]
+        periods = [period.strip() for period in trend_periods.split(",")] if trend_periods else None
+        return cls(names, periods, fused)
+
+    def run(self, page: Page, link: str, deadline: "Deadline") -> Dict[str, Any]:
+        detail: Dict[str, Any] = {"url": link}
+        payload = self._run_fused(page, link, deadline) if self.fused else None
+        for extractor in EXTRACTORS.values():
+            if extractor.name not in self.names:
+                detail.update(extractor.empty())
+            elif payload is not None and extractor.fused is not None:
+                detail.update(extractor.fused(payload, deadline, self))
+            else:
+                detail.update(extractor.run(page, link, deadline, self))
+        return detail
+
+    def _run_fused(self, page: Page, link: str, deadline: "Deadline") -> Optional[Dict[str, Any]]:
+        """주입 스크립트를 한 번 불러 켠 추출기의 원본 데이터를 받음. 스크립트가 없거나 실패하면 None"""
+        options: Dict[str, Any] = {"title": "title" in self, "specs": "specs" in self}
+        if "specs" in self:
+            load_detail_specs(page, link, deadline=deadline)
+        if "price" in self or "malls" in self:
+            options["prices"] = _fused_price_options()
+        if "trend" in self:
+            periods = sorted(self.trend_periods) if self.trend_periods is not None else None
+            options["trend"] = {
+                "periods": periods,
+                "budgetMs": deadline.remaining_ms(10 * 60 * 1000),
+                "settleMs": TREND_SETTLE_MS,
+            }
+        try:
+            payload = page.evaluate(FUSED_EXTRACT_CALL_JS, options)
+        except Exception as e:
+            log.debug(f"    추출 스크립트 실패 - 추출기별 방식으로 재시도: {e}")
+            return None
+        if payload is None:
+            return None
+        if "prices" in options:
+            _record_fused_price_hits(payload["prices"], options["prices"])
+        return payload
+
+
+DEFAULT_EXTRACTORS = "specs,price,title,trend"
+DEFAULT_EXTRACT_PLAN = ExtractPlan.parse(DEFAULT_EXTRACTORS)
+
+
+def fetch_product_detail(
+    context: BrowserContext,
+    link: str,
+    base_delay_ms: int,
+    deadline_s: Optional[float] = None,
+    extract: Optional[ExtractPlan] = None,
+) -> Dict[str, Any]:
+    """상품 상세 페이지를 열어 정규화 전의 원본 데이터(제목, 스펙, 가격, 가격추이)를 추출
+
+    deadline_s가 있으면 모든 단계가 상품 하나의 남은 시간 예산을 나눠 쓴다. 페이지 로드
+    자체가 예산 안에 끝나지 않으면 실패지만, 그 뒤 단계가 잘리면 추출한 만큼을 partial로 돌려준다.
+    extract에 켠 추출기만 등록 순서대로 돌린다(기본값은 판매처를 뺀 전부). DOM만 읽는 스펙/가격/제목을 먼저 추출하고
+    클릭이 필요한 가격추이는 마지막에 한다.
+    프로파일링을 켜면 run_profiler가 상품 전체 시간을 재고 느린 상품의 트레이스를 남긴다.
+    차단/캡차 페이지면 block_monitor가 BlockedPageError를 올리고, 감지 뒤에는 여기서 멈추거나 느리게 간다.
+    """
+    block_monitor.wait()
+    with run_profiler.product(context, link):
+        return _fetch_product_detail(context, link, base_delay_ms, deadline_s, extract or DEFAULT_EXTRACT_PLAN)
+
+
+def _fetch_product_detail(
+    context: BrowserContext,
+    link: str,
+    base_delay_ms: int,
+    deadline_s: Optional[float],
+    extract: ExtractPlan,
+) -> Dict[str, Any]:
+    deadline = Deadline(deadline_s)
+    detail_page = context.new_page()
+    detail_page.set_default_timeout(15000)
+    try:
+        goto_budget_ms = max(1, deadline.remaining_ms(15000))
+        response = detail_page.goto(link, wait_until="domcontentloaded", timeout=goto_budget_ms)
+        block_monitor.check_response(response)
+        if extract.needs_scroll:
+            idle_budget_ms = deadline.budget_ms("network_idle", 3000)
+            if idle_budget_ms > 0:
+                wait_for_network_idle(detail_page, timeout_ms=idle_budget_ms)
+            slow_scroll(detail_page, steps=4, step_px=900, base_delay_ms=base_delay_ms, deadline=deadline)
+        detail = extract.run(detail_page, link, deadline)
+        detail["partial"] = deadline.cut_stages
+        block_monitor.check_detail(detail_page, detail, extract)
+        if deadline.partial:
+            log.warning(f"    [시간 예산 초과] 일부만 수집: {', '.join(deadline.cut_stages)}")
+        return detail
+    finally:
+        try:
+            detail_page.close()
+        except Exception:
+            pass
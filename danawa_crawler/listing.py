@@ -0,0 +1,363 @@
+"""카테고리 목록 페이지 수집과 페이지 이동, 목록 페이지 병렬 수집"""
+import queue
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Set, Optional, Tuple, Any
+from urllib.parse import parse_qs, parse_qsl, urlencode, urlparse, urlunparse
+
+from playwright.sync_api import sync_playwright, Page, BrowserContext
+
+from danawa_crawler.core import (
+    canonical_product_url,
+    DANAWA_PRODUCT_URL,
+    extract_pcode,
+    log,
+    RateLimiter,
+    run_profiler,
+    slow_scroll,
+    wait_for_network_idle,
+)
+from danawa_crawler.extract import _parse_price, selector_memory
+from danawa_crawler.browser import open_new_context, profile_runs_scripts
+from danawa_crawler.storage import SeenProducts
+
+
+LIST_ITEM_SELECTORS = [
+    "li.prod_item div.prod_info a.prod_link",
+    "li.prod_item .prod_name a",
+    "div.prod_info a.prod_link",
+    "a[href*='/product/']",
+    "a[href*='product/view.html']",
+]
+LIST_ITEM_ID_PATTERN = re.compile(r"^productItem(\d+)$")
+LIST_ONLY_FIELDNAMES = ["pcode", "상품명", "URL", "목록가", "스펙요약"]
+LIST_PAGE_PARAM = "page"
+CURRENT_LIST_PAGE_SELECTOR = ".number_wrap .num.now_on, a.num.now_on"
+
+LIST_PAGE_HARVEST_JS = """(selectors) => {
+    const clean = (el) => el ? (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim() : '';
+    const out = [];
+    const hits = {};
+    for (const selector of selectors) {
+        const anchors = document.querySelectorAll(selector);
+        hits[selector] = anchors.length;
+        for (const a of anchors) {
+            const li = a.closest('li.prod_item');
+            out.push({
+                href: a.getAttribute('href') || '',
+                text: (a.innerText || '').trim(),
+                item_id: li ? (li.id || '') : '',
+                name: li ? clean(li.querySelector('.prod_name a') || li.querySelector('.prod_name')) : '',
+                price: li ? clean(li.querySelector('.price_sect strong')) : '',
+                spec: li ? clean(li.querySelector('.spec_list')) : '',
+            });
+        }
+    }
+    return { anchors: out, hits };
+}"""
+
+
+def list_page_layout(url: str) -> str:
+    """목록 페이지의 선택자 기억 단위: 카테고리(cate) 코드, 없으면 경로"""
+    parsed = urlparse(url)
+    cate = parse_qs(parsed.query).get("cate", [""])[0]
+    return f"list:{cate or parsed.path}"
+
+
+def collect_list_items_from_category(
+    page: Page,
+    max_per_page: Optional[int],
+    seen: Optional[SeenProducts] = None,
+) -> List[Dict[str, str]]:
+    """목록 페이지의 상품을 page.evaluate 한 번으로 수집: pcode, 상품명, URL, 목록가, 스펙요약
+
+    예전처럼 선택자 순서대로 앵커를 훑고 같은 기준(가격/비교/옵션/구성 링크 제외, pcode 중복 제외)으로
+    거르지만, 앵커마다 속성/텍스트를 따로 묻지 않고 li.prod_item 단위 정보까지 한 번에 받아 온다.
+    카테고리마다 계속 빗나가는 선택자는 selector_memory에 따라 건너뛴다.
+    """
+    layout = list_page_layout(page.url)
+
+    def run(live: List[str]) -> Tuple[Dict[str, Any], Dict[str, int]]:
+        # 스크립트는 넘긴 선택자를 모두 훑으므로 원래 순서를 지켜 넘기고 받은 hits를 그대로 기록
+        selectors = [selector for selector in LIST_ITEM_SELECTORS if selector in live]
+        harvested = page.evaluate(LIST_PAGE_HARVEST_JS, selectors) or {}
+        return harvested, harvested.get("hits") or {}
+
+    try:
+        harvested = selector_memory.first_hit(layout, "list_links", LIST_ITEM_SELECTORS, run) or {}
+    except Exception as e:
+        log.warning(f"  경고: 목록 페이지 수집 실패 - {e}")
+        return []
+    anchors = harvested.get("anchors") or []
+
+    items: List[Dict[str, str]] = []
+    page_keys: Set[str] = set()
+    for anchor in anchors:
+        href = anchor.get("href") or ""
+        if not href:
+            continue
+        if href.startswith("javascript:"):
+            continue
+        if "danawa" not in href and not href.startswith("/"):
+            continue
+        lowered = (anchor.get("text") or "").lower()
+        if any(x in lowered for x in ["가격", "비교", "옵션", "구성"]):
+            continue
+        key, url = canonical_product_url(href)
+        pcode = extract_pcode(url)
+        if not pcode:
+            id_match = LIST_ITEM_ID_PATTERN.match(anchor.get("item_id") or "")
+            if id_match:
+                pcode = id_match.group(1)
+                key, url = pcode, DANAWA_PRODUCT_URL.format(pcode=pcode)
+        if key in page_keys:
+            continue
+        page_keys.add(key)
+        if seen is not None and not seen.add(key):
+            continue
+        list_price = _parse_price(anchor.get("price") or "")
+        items.append({
+            "pcode": pcode or "",
+            "상품명": anchor.get("name") or anchor.get("text") or "",
+            "URL": url,
+            "목록가": str(list_price) if list_price is not None else "",
+            "스펙요약": anchor.get("spec") or "",
+        })
+        if max_per_page and len(items) >= max_per_page:
+            break
+    return items
+
+
+def collect_product_links_from_category(
+    page: Page,
+    max_per_page: Optional[int],
+    seen: Optional[SeenProducts] = None,
+) -> List[str]:
+    """목록 페이지의 상품 링크를 pcode 기준 정규 URL로 수집 (seen이 있으면 실행 중 이미 본 상품은 제외)"""
+    return [item["URL"] for item in collect_list_items_from_category(page, max_per_page, seen=seen)]
+
+
+def paginate_category(page: Page, current_url: str, page_num: int) -> bool:
+                       
+                             
+              
+    
+    try:
+                      
+        page_buttons = page.locator(f"a.num[onclick*='movePage({page_num})']")
+        if page_buttons.count() > 0:
+            log.debug(f"  movePage({page_num}) 버튼 클릭 시도...")
+            page_buttons.first.click()
+            wait_for_network_idle(page)
+            return True
+
+                                     
+        if page.evaluate("typeof movePage === 'function'"):
+            log.debug(f"  movePage({page_num}) 직접 실행...")
+            page.evaluate(f"movePage({page_num})")
+            wait_for_network_idle(page)
+            return True
+
+                                     
+        next_group = page.locator("a.edge_nav.nav_next, a[class*='nav_next'], a[onclick*='movePage']").last
+        if next_group.count() > 0:
+            log.debug(f"  다음 페이지 그룹으로 이동 시도...")
+            next_group.click()
+            wait_for_network_idle(page)
+
+                            
+            page_buttons = page.locator(f"a.num[onclick*='movePage({page_num})']")
+            if page_buttons.count() > 0:
+                page_buttons.first.click()
+                wait_for_network_idle(page)
+                return True
+
+        log.warning(f"  movePage({page_num}) 실패 — 페이지 버튼 또는 함수 호출 불가.")
+        return False
+
+    except Exception as e:
+        log.warning(f"  페이지네이션 중 오류 발생: {e}")
+        return False
+
+
+def list_page_url(category_url: str, page_number: int) -> str:
+    """목록 page_number페이지를 바로 여는 URL (page 쿼리 파라미터만 바꾸고, 1페이지는 원래 URL 그대로)"""
+    if page_number <= 1:
+        return category_url
+    parsed = urlparse(category_url)
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True) if key != LIST_PAGE_PARAM]
+    query.append((LIST_PAGE_PARAM, str(page_number)))
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def current_list_page(page: Page) -> Optional[int]:
+    """페이지 번호 목록에서 현재 페이지로 표시된 번호, 표시를 찾지 못하면 None"""
+    try:
+        marker = page.locator(CURRENT_LIST_PAGE_SELECTOR).first
+        if marker.count() == 0:
+            return None
+        text = marker.inner_text().strip()
+    except Exception:
+        return None
+    return int(text) if text.isdigit() else None
+
+
+def harvest_list_page(
+    context: BrowserContext,
+    category_url: str,
+    page_number: int,
+    items_per_page: Optional[int],
+    rate_limiter: Optional[RateLimiter] = None,
+    harvest: Optional[Callable[[Page], List[Any]]] = None,
+    move_page: bool = True,
+) -> List[Any]:
+    """카테고리의 목록 페이지 하나만 열어 상품 링크를 모음 (페이지 번호로 바로 열므로 페이지끼리 독립)
+
+    harvest를 주면 링크 대신 그 함수의 결과를 돌려준다. N페이지는 list_page_url로 한 번에 열고,
+    페이지 번호 표시가 N이 아닐 때(page 파라미터를 무시하는 목록)만 movePage로 한 번 더 이동한다.
+    rate_limiter가 있으면 실제로 보내는 요청(페이지 로드, movePage 이동)마다 한 번씩 기다린다.
+    이동한 뒤에도 다른 페이지 번호가 표시되면 같은 페이지를 다시 모으지 않도록 오류를 낸다.
+    JS를 끈 프로필처럼 movePage를 쓸 수 없으면 move_page=False로 부르며, 이때는 주소로 연 페이지가
+    N페이지로 확인되지 않으면 오류를 낸다(1페이지를 N페이지로 다시 모으거나 빈 페이지로 끝내지 않음).
+    """
+    if harvest is None:
+        def harvest(page: Page) -> List[Any]:
+            return collect_product_links_from_category(page, items_per_page)
+
+    page = context.new_page()
+    page.set_default_timeout(10000)
+    try:
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        page.goto(list_page_url(category_url, page_number))
+        wait_for_network_idle(page)
+        if page_number > 1 and current_list_page(page) != page_number:
+            if not move_page:
+                raise RuntimeError(f"목록 {page_number}페이지를 주소로 열지 못함 (JS가 꺼져 있어 movePage를 쓸 수 없음)")
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            if not paginate_category(page, category_url, page_number):
+                return []
+            shown = current_list_page(page)
+            if shown is not None and shown != page_number:
+                raise RuntimeError(f"목록 {page_number}페이지로 이동하지 못함 (현재 {shown}페이지)")
+        slow_scroll(page)
+        return harvest(page)
+    finally:
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def fan_out_list_pages(
+    category_url: str,
+    pages: int,
+    harvest: Callable[[Page], List[Any]],
+    headless: bool,
+    workers: int,
+    rate_limiter: RateLimiter,
+    launch_profile: str = "default",
+    stop: Optional[threading.Event] = None,
+    max_attempts: int = 3,
+    retry_backoff_s: float = 2.0,
+):
+    """목록 페이지 1..pages를 워커마다 브라우저 하나씩 띄워 동시에 열고, (페이지 번호, 결과)를 페이지 순서대로 내보냄
+
+    페이지는 harvest_list_page로 번호마다 바로 열므로 서로 기다리지 않고, 요청 속도는 rate_limiter 하나를 함께 쓴다.
+    실제로 빈 페이지가 나오면 그보다 뒤 페이지는 열지 않고 빈 결과로 돌려준다. 수집 중 오류는 백오프 뒤
+    max_attempts번까지 다시 시도하고, 그래도 실패한 페이지는 결과 자리에 None을 내보낸다(뒤 페이지는 계속 연다).
+    브라우저를 못 띄우거나 브라우저가 죽은 워커는 자기가 들고 있던 페이지만 실패로 내고 빠지며, 남은 페이지는
+    다른 워커가 가져간다. 모든 워커가 빠졌을 때만 남은 페이지를 실패로 채운다. stop이 설정되면 남은 페이지를 건너뛴다.
+    """
+    stop = stop or threading.Event()
+    move_page = profile_runs_scripts(launch_profile)
+    page_numbers: "queue.Queue[int]" = queue.Queue()
+    for page_number in range(1, pages + 1):
+        page_numbers.put(page_number)
+    results: "queue.Queue[Tuple[int, Optional[List[Any]]]]" = queue.Queue()
+    empty_from = [pages + 1]
+    attempts: Dict[int, int] = {}
+    worker_count = max(1, min(workers, pages))
+    alive = [worker_count]
+    lock = threading.Lock()
+
+    def worker() -> None:
+        context = None
+        try:
+            with sync_playwright() as p:
+                context = open_new_context(p, headless=headless, profile=launch_profile)
+                while True:
+                    try:
+                        page_number = page_numbers.get_nowait()
+                    except queue.Empty:
+                        return
+                    if stop.is_set() or page_number > empty_from[0]:
+                        results.put((page_number, []))
+                        continue
+                    try:
+                        items = harvest_list_page(
+                            context,
+                            category_url,
+                            page_number,
+                            None,
+                            rate_limiter=rate_limiter,
+                            harvest=harvest,
+                            move_page=move_page,
+                        )
+                    except Exception as e:
+                        with lock:
+                            attempts[page_number] = attempts.get(page_number, 0) + 1
+                            attempt = attempts[page_number]
+                        if not context.browser.is_connected():
+                            log.error(f"  페이지 {page_number} 목록 수집 중 브라우저 종료 - {e}")
+                            results.put((page_number, None))
+                            return
+                        if attempt >= max_attempts:
+                            log.error(f"  페이지 {page_number} 목록 최종 실패 ({attempt}회) - {e}")
+                            results.put((page_number, None))
+                            continue
+                        delay = retry_backoff_s * (2 ** (attempt - 1))
+                        log.warning(f"  페이지 {page_number} 목록 수집 실패 - {e} ({delay:.0f}초 뒤 다시 시도)")
+                        time.sleep(delay)
+                        page_numbers.put(page_number)
+                        continue
+                    if not items:
+                        with lock:
+                            empty_from[0] = min(empty_from[0], page_number)
+                    results.put((page_number, items))
+        except Exception as e:
+            log.error(f"  목록 워커 브라우저 오류 - {e}")
+        finally:
+            if context is not None:
+                try:
+                    context.browser.close()
+                except Exception:
+                    pass
+            with lock:
+                alive[0] -= 1
+                last = alive[0] == 0
+            # 마지막 워커가 빠질 때만 아무도 가져가지 않은 페이지를 실패로 채워 결과 수를 맞춤
+            while last:
+                try:
+                    results.put((page_numbers.get_nowait(), None))
+                except queue.Empty:
+                    break
+
+    threads = [
+        threading.Thread(target=run_profiler.wrap(worker), name=f"list-worker-{i + 1}", daemon=True)
+        for i in range(worker_count)
+    ]
+    for thread in threads:
+        thread.start()
+    finished: Dict[int, Optional[List[Any]]] = {}
+    next_page = 1
+    for _ in range(pages):
+        page_number, items = results.get()
+        finished[page_number] = items
+        while next_page in finished:
+            yield next_page, finished.pop(next_page)
+            next_page += 1
+    for thread in threads:
+        thread.join()
@@ -0,0 +1,201 @@
+"""체크마크 스펙 학습과 스펙 정규화"""
+import re
+from typing import Dict, List, Tuple, Any
+
+from danawa_crawler.core import log
+
+
+def collect_checkmark_items(specs: Dict[str, str], checkmark_items: List[str]) -> None:
+    for key, value in specs.items():
+        if value.strip() in ["○", "O", "o", "●"]:
+            if key not in checkmark_items:
+                checkmark_items.append(key)
+
+
+def analyze_and_create_mapping(checkmark_items: List[str]) -> Dict[str, str]:
+    """수집된 체크마크 항목들을 분석하여 자동 매핑 생성"""
+    log.info("\n=== 패턴 분석 중 ===")
+    auto_mapping = {}
+    
+    for item in checkmark_items:
+        category = None
+        
+                       
+        if "단계" in item or item == "프레":
+            category = "단계"
+        elif item == "분유":
+            category = "품목"
+        elif item in ["일반분유", "특수분유", "산양분유", "조제분유"]:
+            category = "종류"
+        elif "분유" in item:
+            category = "종류"              
+        elif item.endswith("개월~") or item.endswith("개월"):
+            category = "최소연령"
+        elif item in ["분말", "액상", "미음", "죽", "진밥", "아기밥"]:
+            category = "형태"
+        elif item in ["상온", "냉장", "냉동"]:
+            category = "보관방식"
+        elif item in ["파우치", "플라스틱병", "병", "캔"]:
+            category = "포장용기"
+        elif "이유식" in item or item in ["양념", "반찬", "아기국", "수제이유식"]:
+            category = "품목"
+        elif item in ["국내산", "수입산"]:
+            category = "원산지"
+        elif "인증" in item:
+            category = "인증"
+        
+        if category:
+            auto_mapping[item] = category
+    
+                     
+    category_groups = {}
+    for item, cat in auto_mapping.items():
+        if cat not in category_groups:
+            category_groups[cat] = []
+        category_groups[cat].append(item)
+    
+    log.info("  발견된 데이터 구조:")
+    for cat, items in sorted(category_groups.items()):
+        log.info(f"    - {cat}: {', '.join(items[:5])}" + (f" 외 {len(items)-5}개" if len(items) > 5 else ""))
+    
+    return auto_mapping
+
+
+CHECK_MARKS = ["○", "O", "o", "●"]
+
+
+def _merge_category_pair(spec_pairs: List[Tuple[str, str]], category: str, item: str) -> None:
+    """같은 카테고리 항목이 있으면 값을 이어 붙여 맨 뒤로 옮기고, 없으면 추가"""
+    for idx, (key, value) in enumerate(spec_pairs):
+        if key == category:
+            del spec_pairs[idx]
+            spec_pairs.append((category, f"{value},{item}"))
+            return
+    spec_pairs.append((category, item))
+
+
+def normalize_spec_pairs(specs: Dict[str, str], learned_mapping: Dict[str, str]) -> List[Tuple[str, str]]:
+    """추출된 스펙을 정규화된 (key, value) 쌍 목록으로 변환"""
+    spec_pairs: List[Tuple[str, str]] = []
+    certification_items: List[str] = []
+    certification_info_items: List[str] = []
+    registration_date = ""
+
+    key_simplification = {
+        "재료 종류": "재료",
+        "반찬종류": "종류",
+    }
+
+    base_mapping = {
+        "국내산": "원산지",
+        "수입산": "원산지",
+        "국물조림용": "용도",
+        "비빔무침용": "용도",
+    }
+    category_mapping = {**base_mapping, **learned_mapping}
+
+    for key, value in specs.items():
+        if not value or not value.strip():
+            continue
+
+        original_key = key
+        key = key_simplification.get(key, key)
+        key = key.replace('[', '').replace(']', '')
+
+        if key == value or original_key == value:
+            continue
+
+        clean_value = value.strip()
+        clean_value = clean_value.split("인증번호 확인")[0].strip()
+        clean_value = re.sub(r'\s*\([^)]*\)', '', clean_value)
+        clean_value = re.sub(r'\s*\([^)]*$', '', clean_value)
+        clean_value = re.sub(r'\s*\([^)]*', '', clean_value)
+        clean_value = clean_value.replace("제조사 웹사이트", "").strip()
+        clean_value = clean_value.replace("웹사이트", "").strip()
+        clean_value = clean_value.split("바로가기")[0].strip()
+        clean_value = re.sub(r'\s+', ' ', clean_value).strip()
+
+        if not clean_value:
+            continue
+
+        if "등록년월" in key or "등록일" in key:
+            registration_date = clean_value
+            continue
+
+        if key == "인증정보" or ("인증" in key and clean_value in CHECK_MARKS):
+            if "HACCP" in key or key == "HACCP인증":
+                if key not in certification_info_items:
+                    certification_info_items.append(key)
+                continue
+
+        if "인증번호" in key:
+            if clean_value not in certification_info_items:
+                certification_info_items.append(clean_value)
+            continue
+
+        additive_keys = ["합성보존료", "합성착색료", "합성감미료", "보존료", "착색료", "감미료"]
+        if key in additive_keys:
+            if clean_value not in ["○", "O", "o", "●", "무첨가", "없음"]:
+                key = "無첨가"
+
+        meaningless_values = [
+            "상세설명 / 판매 사이트 문의",
+            "상세설명",
+            "판매 사이트 문의",
+            "인증번호 확인"
+        ]
+        is_meaningless = clean_value in meaningless_values or any(mv in clean_value for mv in ["상세설명 / 판매 사이트 문의"])
+
+        if clean_value in CHECK_MARKS:
+            if "HACCP" in key or key == "HACCP인증":
+                if key not in certification_info_items:
+                    certification_info_items.append(key)
+            elif "인증" in key:
+                if key not in certification_items:
+                    certification_items.append(key)
+            else:
+                category = None
+                if key in category_mapping:
+                    category = category_mapping[key]
+                else:
+                    if "단계" in key or key == "프레":
+                        category = "단계"
+                    elif "분유" in key:
+                        category = "품목"
+                    elif key.endswith("개월~") or key.endswith("개월"):
+                        category = "최소연령"
+                    elif key in ["분말", "액상", "미음", "죽", "진밥", "아기밥"]:
+                        category = "형태"
+                    elif key in ["상온", "냉장", "냉동"]:
+                        category = "보관방식"
+                    elif key in ["파우치", "플라스틱병"]:
+                        category = "포장용기"
+
+                if category:
+                    _merge_category_pair(spec_pairs, category, key)
+        elif "인증" in key and "HACCP" not in key:
+            if key not in certification_items:
+                certification_items.append(key)
+        else:
+            if not is_meaningless:
+                if key == clean_value and key in category_mapping:
+                    _merge_category_pair(spec_pairs, category_mapping[key], key)
+                else:
+                    spec_pairs.append((key, clean_value))
+
+    if certification_items:
+        spec_pairs.append(("인증", ",".join(certification_items)))
+
+    if certification_info_items:
+        spec_pairs.append(("인증정보", ",".join(certification_info_items)))
+
+    if registration_date:
+        spec_pairs.append(("등록년월일", registration_date))
+
+    return spec_pairs
+
+
+def write_long_format_rows(writer: Any, title: str, link: str, spec_pairs: List[Tuple[str, str]]) -> None:
+    """상품 하나의 정규화된 스펙을 상품명,URL,key,value 행으로 바로 기록"""
+    for key, value in spec_pairs:
+        writer.writerow([title, link, key, value])
@@ -0,0 +1,1062 @@
+"""여러 카테고리를 한 브라우저 풀로 도는 배치 스케줄러와 SQLite 작업 큐 기반 분산 크롤링"""
+import csv
+import json
+import os
+import queue
+import random
+import socket
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Set, Optional, Tuple, Any
+from urllib.parse import parse_qs, urlparse
+
+from playwright.sync_api import sync_playwright, BrowserContext
+
+from danawa_crawler.core import (
+    canonical_product_url,
+    CircuitBreaker,
+    extract_pcode,
+    log,
+    MemoryMonitor,
+    ProductLogContext,
+    RateLimiter,
+    RetryQueue,
+    run_profiler,
+)
+from danawa_crawler.extract import DEFAULT_EXTRACT_PLAN, ExtractPlan, fetch_product_detail
+from danawa_crawler.browser import BrowserSession, profile_runs_scripts
+from danawa_crawler.listing import harvest_list_page
+from danawa_crawler.normalize import analyze_and_create_mapping, collect_checkmark_items, normalize_spec_pairs
+from danawa_crawler.storage import (
+    build_output_row,
+    CsvRowSink,
+    delta_output_path,
+    DeltaSink,
+    DeltaTracker,
+    failure_report_path,
+    output_fieldnames,
+    PcodeStore,
+    SnapshotArchive,
+    write_failure_report,
+)
+
+
+class BatchCategory:
+    """배치 파일의 카테고리 한 줄과 진행 상태"""
+
+    def __init__(
+        self,
+        index: int,
+        category_url: str,
+        pages: int,
+        items_per_page: Optional[int],
+        max_total_items: Optional[int],
+        output: Optional[str] = None,
+    ) -> None:
+        self.index = index
+        self.category_url = category_url
+        self.pages = pages
+        self.items_per_page = items_per_page
+        self.max_total_items = max_total_items
+        self.output = output
+        self.links: List[str] = []
+        self.link_set: Set[str] = set()
+        self.link_order: Dict[str, Tuple[int, int]] = {}
+        self.pending: Set[str] = set()
+        self.pages_pending = 0
+        self.empty_from: Optional[int] = None
+        self.listed = False
+        self.finalized = False
+        self.collected = 0
+
+    @property
+    def label(self) -> str:
+        cate = parse_qs(urlparse(self.category_url).query).get("cate", [""])[0]
+        return cate or str(self.index)
+
+    def is_full(self) -> bool:
+        return bool(self.max_total_items) and len(self.links) >= self.max_total_items
+
+
+def load_batch_file(
+    path: str,
+    default_pages: int,
+    default_items_per_page: Optional[int],
+    default_max_total_items: Optional[int],
+) -> List[BatchCategory]:
+    """배치 CSV 읽기: category_url 헤더 필수, pages/items_per_page/max_total_items/output은 선택"""
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        lines = [line for line in f if line.strip() and not line.lstrip().startswith("#")]
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or "category_url" not in reader.fieldnames:
+        raise ValueError(f"{path}: 'category_url' 헤더가 필요합니다")
+
+    categories: List[BatchCategory] = []
+    for row in reader:
+        category_url = (row.get("category_url") or "").strip()
+        if not category_url:
+            continue
+
+        def int_field(name: str, default: Optional[int]) -> Optional[int]:
+            raw = (row.get(name) or "").strip()
+            return int(raw) if raw else default
+
+        categories.append(BatchCategory(
+            index=len(categories) + 1,
+            category_url=category_url,
+            pages=int_field("pages", default_pages) or 1,
+            items_per_page=int_field("items_per_page", default_items_per_page) or None,
+            max_total_items=int_field("max_total_items", default_max_total_items) or None,
+            output=(row.get("output") or "").strip() or None,
+        ))
+    return categories
+
+
+def write_category_details(
+    details: List[Dict[str, Any]],
+    sink: Any,
+    category_url: Optional[str] = None,
+) -> int:
+    """한 카테고리 상품들의 스펙으로 체크마크 매핑을 학습한 뒤(Pass 1과 같은 역할) 정규화해 sink에 기록
+
+    category_url을 주면 여러 카테고리를 합친 출력용으로 카테고리 열을 채운다. 기록한 행 수를 반환한다.
+    """
+    checkmark_items: List[str] = []
+    for detail in details:
+        collect_checkmark_items(detail["specs"], checkmark_items)
+    learned_mapping = analyze_and_create_mapping(checkmark_items)
+
+    for detail in details:
+        row = build_output_row(detail)
+        if category_url is not None:
+            row["카테고리"] = category_url
+        sink.write(row, normalize_spec_pairs(detail["specs"], learned_mapping))
+    return len(details)
+
+
+class BatchScheduler:
+    """여러 카테고리의 목록/상세 작업을 하나의 워커 풀과 요청 제한기로 처리
+
+    상세 페이지는 URL 단위로 한 번만 가져오고, 여러 카테고리에 속한 상품은 결과를 공유한다.
+    카테고리의 목록 수집과 상세 수집이 모두 끝나면 그 카테고리 상품들의 스펙으로 체크마크
+    매핑을 학습한 뒤(기존 Pass 1과 같은 역할) 정규화하여 기록한다.
+    """
+
+    def __init__(
+        self,
+        categories: List[BatchCategory],
+        workers: int,
+        headless: bool,
+        base_delay_ms: int,
+        rate_limiter: RateLimiter,
+        output_dir: Optional[str],
+        combined_output: str,
+        long_format: bool = False,
+        store: Optional[PcodeStore] = None,
+        retry_queue: Optional[RetryQueue] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        product_deadline_s: Optional[float] = None,
+        delta: Optional[DeltaTracker] = None,
+        launch_profile: str = "default",
+        recycle_every: int = 0,
+        max_browser_mb: float = 0.0,
+        archive: Optional[SnapshotArchive] = None,
+        sink_options: Optional[Dict[str, Any]] = None,
+        extract: Optional[ExtractPlan] = None,
+    ) -> None:
+        self.categories = categories
+        self.extract = extract or DEFAULT_EXTRACT_PLAN
+        self.sink_options = sink_options or {}
+        self.delta = delta
+        self.archive = archive
+        self.launch_profile = launch_profile
+        self.recycle_every = recycle_every
+        self.max_browser_mb = max_browser_mb
+        self.monitor = MemoryMonitor()
+        self.product_deadline_s = product_deadline_s
+        self.store = store
+        self.retry_queue = retry_queue if retry_queue is not None else RetryQueue()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.workers = max(1, workers)
+        self.headless = headless
+        self.base_delay_ms = base_delay_ms
+        self.rate_limiter = rate_limiter
+        self.output_dir = output_dir
+        self.long_format = long_format
+        self.details: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.stats = {
+            "links": 0,
+            "fetched": 0,
+            "failed": 0,
+            "retried": 0,
+            "shared": 0,
+            "duplicates": 0,
+            "known": 0,
+            "rows": 0,
+            "recycles": 0,
+            "list_failed": 0,
+        }
+        self._waiting: Dict[str, List[BatchCategory]] = {}
+        self._tasks: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._sink_lock = threading.Lock()
+        self._outstanding = 0
+        self._alive = self.workers
+        self._outstanding_cond = threading.Condition()
+        self._combined_sink: Optional[CsvRowSink] = None
+        if output_dir is None:
+            self._combined_sink = CsvRowSink(
+                combined_output,
+                long_format=long_format,
+                fieldnames=["카테고리"] + output_fieldnames(product_deadline_s, self.extract),
+                **self.sink_options,
+            )
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+
+    def run(self) -> Dict[str, int]:
+        for category in self.categories:
+            category.pages_pending = category.pages
+            for page_number in range(1, category.pages + 1):
+                self._submit(("list", (category, page_number)))
+        threads = [
+            threading.Thread(target=run_profiler.wrap(self._worker), name=f"batch-worker-{i + 1}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        with self._outstanding_cond:
+            while self._outstanding:
+                self._outstanding_cond.wait()
+        for _ in threads:
+            self._tasks.put(None)
+        for thread in threads:
+            thread.join()
+
+        for category in self.categories:
+            with self._lock:
+                details = self._claim_finalize(category, force=True)
+            if details is not None:
+                self._write_category(category, details)
+        if self._combined_sink is not None:
+            self._combined_sink.close()
+        if self.delta is not None:
+            for reason in self.incomplete_reasons():
+                self.delta.mark_partial(reason)
+        self.monitor.sample()
+        self.stats.update(self.monitor.summary())
+        return self.stats
+
+    def incomplete_reasons(self) -> List[str]:
+        """카테고리를 다 돌지 못한 이유 — 비어 있어야 변경 추적이 이전 상품을 삭제로 낼 수 있다"""
+        reasons: List[str] = []
+        for category in self.categories:
+            if category.items_per_page and "items_per_page" not in reasons:
+                reasons.append("items_per_page")
+            if category.is_full():
+                if "max_total_items" not in reasons:
+                    reasons.append("max_total_items")
+            elif category.empty_from is None and "pages" not in reasons:
+                reasons.append("pages")
+        for stat, reason in (("list_failed", "list_failures"), ("failed", "failures"), ("known", "seen_store")):
+            if self.stats[stat]:
+                reasons.append(reason)
+        return reasons
+
+    def _submit(self, task: Tuple[str, Any], delay_s: float = 0.0) -> None:
+        """작업을 큐에 넣음. delay_s가 있으면 타이머가 나중에 넣으므로 워커는 기다리지 않는다"""
+        with self._outstanding_cond:
+            self._outstanding += 1
+        if delay_s > 0:
+            timer = threading.Timer(delay_s, self._tasks.put, args=(task,))
+            timer.daemon = True
+            timer.start()
+        else:
+            self._tasks.put(task)
+
+    def _task_done(self) -> None:
+        with self._outstanding_cond:
+            self._outstanding -= 1
+            if not self._outstanding:
+                self._outstanding_cond.notify_all()
+
+    def _worker(self) -> None:
+        """브라우저 하나로 작업을 처리. 브라우저를 못 띄웠거나 브라우저가 죽은 워커는 들고 있던 작업만 큐에
+        돌려놓고 빠지므로, 남은 작업은 살아 있는 워커가 가져간다. 마지막 워커가 빠질 때만 남은 작업을 실패로 채운다."""
+        stopped = False
+        try:
+            with sync_playwright() as p:
+                session = BrowserSession(
+                    p,
+                    headless=self.headless,
+                    profile=self.launch_profile,
+                    recycle_every=self.recycle_every,
+                    max_browser_mb=self.max_browser_mb,
+                    monitor=self.monitor,
+                )
+                try:
+                    stopped = self._consume(session)
+                finally:
+                    session.close()
+        except Exception as e:
+            log.error(f"  [배치] 워커 브라우저 오류 - {e}")
+        if stopped:
+            return
+        with self._lock:
+            self._alive -= 1
+            last = not self._alive
+        if last:
+            log.error("  [배치] 남은 워커가 없어 남은 작업을 실패로 처리합니다.")
+            self._consume(None)
+
+    def _consume(self, session: Optional[BrowserSession]) -> bool:
+        """종료 신호를 받을 때까지 작업을 처리하고 True를 돌려줌. session이 None이면 모든 작업을 재시도 없이
+        실패로 처리한다. 처리 중 브라우저가 죽으면 그 작업을 큐에 돌려놓고 False를 돌려줌"""
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return True
+            kind, payload = task
+            context = session.context if session is not None else None
+            try:
+                if kind == "list":
+                    self._run_listing(context, payload)
+                else:
+                    with ProductLogContext(payload):
+                        self._run_detail(context, payload)
+            except Exception as e:
+                if context is not None and not context.browser.is_connected():
+                    log.error(f"  [배치] 워커 브라우저 종료 - {e} (처리 중이던 작업은 다른 워커에게 넘깁니다)")
+                    self._tasks.put(task)
+                    return False
+                log.error(f"  [배치] 작업 처리 중 오류 - {e}")
+            try:
+                if kind == "detail" and session is not None and session.product_done():
+                    with self._lock:
+                        self.stats["recycles"] += 1
+            except Exception as e:
+                log.error(f"  [배치] 브라우저 재시작 실패 - {e}")
+            finally:
+                self._task_done()
+
+    def _run_listing(self, context: Optional[BrowserContext], task: Tuple[BatchCategory, int]) -> None:
+        """목록 페이지 하나를 페이지 번호로 바로 열어 링크를 모음 — 카테고리의 페이지들은 서로 다른 워커가 동시에 처리
+
+        찾은 링크는 곧바로 상세 작업으로 넘어가므로 상세 수집이 목록 수집이 끝나기를 기다리지 않는다.
+        빈 페이지가 나오면 그 뒤 페이지는 요청 없이 끝낸다. 재시도를 다 쓰고 실패한 페이지는 실패로만 세고
+        뒤 페이지는 계속 수집한다. 카테고리 안의 순서는 (페이지, 페이지 안 순서)로 기록해 출력할 때 맞춘다.
+        """
+        category, page_number = task
+        skip = category.is_full() or (category.empty_from is not None and page_number > category.empty_from)
+        product_links: List[str] = []
+        failed = False
+        if not skip and context is None:
+            failed = True
+            log.error(f"  [배치 {category.label}] 페이지 {page_number} 목록 실패 — 남은 브라우저가 없습니다.")
+            self.retry_queue.give_up(f"{category.category_url}#page={page_number}", "브라우저 없음")
+            with self._lock:
+                self.stats["list_failed"] += 1
+        elif not skip:
+            try:
+                self.breaker.wait_if_open()
+                product_links = harvest_list_page(
+                    context,
+                    category.category_url,
+                    page_number,
+                    category.items_per_page,
+                    rate_limiter=self.rate_limiter,
+                    move_page=profile_runs_scripts(self.launch_profile),
+                )
+                self.breaker.record(True)
+                log.info(f"  [배치 {category.label}] 페이지 {page_number}/{category.pages}: {len(product_links)}개 링크 발견")
+            except Exception as e:
+                if not context.browser.is_connected():
+                    raise
+                self.breaker.record(False)
+                key = f"{category.category_url}#page={page_number}"
+                log.warning(f"  [배치 {category.label}] 페이지 {page_number} 목록 수집 실패 - {e}")
+                retry_in = self.retry_queue.record_failure(key, str(e))
+                if retry_in is not None:
+                    with self._lock:
+                        self.stats["retried"] += 1
+                    self._submit(("list", task), delay_s=retry_in)
+                    return
+                failed = True
+                log.error(f"  [배치 {category.label}] 페이지 {page_number} 목록 최종 실패 — 다음 페이지는 계속 수집합니다.")
+                with self._lock:
+                    self.stats["list_failed"] += 1
+        if not product_links and not skip and not failed:
+            with self._lock:
+                if category.empty_from is None or page_number < category.empty_from:
+                    category.empty_from = page_number
+        for rank, link in enumerate(product_links):
+            if category.is_full():
+                break
+            self._add_link(category, link, order=(page_number, rank))
+        details = None
+        with self._lock:
+            category.pages_pending -= 1
+            if not category.pages_pending:
+                category.listed = True
+                details = self._claim_finalize(category)
+        if details is not None:
+            self._write_category(category, details)
+
+    def _add_link(self, category: BatchCategory, link: str, order: Tuple[int, int] = (0, 0)) -> None:
+        with self._lock:
+            if link in category.link_set:
+                self.stats["duplicates"] += 1
+                return
+            if self.store is not None and canonical_product_url(link)[0] in self.store:
+                self.stats["known"] += 1
+                return
+            category.link_set.add(link)
+            category.links.append(link)
+            category.link_order[link] = order
+            self.stats["links"] += 1
+            if link in self.details:
+                self.stats["shared"] += 1
+                return
+            category.pending.add(link)
+            if link in self._waiting:
+                self._waiting[link].append(category)
+                self.stats["shared"] += 1
+                return
+            self._waiting[link] = [category]
+        self._submit(("detail", link))
+
+    def _run_detail(self, context: Optional[BrowserContext], link: str) -> None:
+        detail = None
+        if context is None:
+            log.error(f"    오류: {link} 크롤링 실패 — 남은 브라우저가 없습니다.")
+            self.retry_queue.give_up(link, "브라우저 없음")
+        else:
+            try:
+                self.breaker.wait_if_open()
+                self.rate_limiter.acquire()
+                detail = fetch_product_detail(
+                    context, link, self.base_delay_ms, deadline_s=self.product_deadline_s, extract=self.extract
+                )
+                self.breaker.record(True)
+                if self.store is not None:
+                    self.store.add(canonical_product_url(link)[0])
+            except Exception as e:
+                if not context.browser.is_connected():
+                    raise
+                self.breaker.record_error(e)
+                log.warning(
+                    f"    오류: {link} 크롤링 실패 - {e}", extra={"data": {"event": "error", "url": link, "error": str(e)}}
+                )
+                retry_in = self.retry_queue.record_failure(link, str(e))
+                if retry_in is not None:
+                    log.info(f"    [재시도 예약] {retry_in:.1f}초 뒤 다시 시도합니다.")
+                    with self._lock:
+                        self.stats["retried"] += 1
+                    self._submit(("detail", link), delay_s=retry_in)
+                    return
+        with self._lock:
+            self.details[link] = detail
+            self.stats["fetched" if detail else "failed"] += 1
+            waiting = self._waiting.pop(link, [])
+            if detail and self.archive is not None:
+                self.archive.append(detail, waiting[0].category_url if waiting else "")
+            ready = []
+            for category in waiting:
+                category.pending.discard(link)
+                details = self._claim_finalize(category)
+                if details is not None:
+                    ready.append((category, details))
+        for category, details in ready:
+            self._write_category(category, details)
+
+    def _claim_finalize(self, category: BatchCategory, force: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """self._lock을 쥔 채로 부름: 카테고리가 끝났으면(force면 남은 작업과 상관없이) 기록할 상세 결과를
+        카테고리 순서로 떼어 돌려줌. 이미 기록했거나 아직이면 None"""
+        if category.finalized or (not force and (not category.listed or category.pending)):
+            return None
+        category.finalized = True
+        details = [self.details.get(link) for link in sorted(category.links, key=category.link_order.__getitem__)]
+        return [detail for detail in details if detail]
+
+    def _category_output(self, category: BatchCategory) -> str:
+        filename = category.output or f"danawa_{category.label}.csv"
+        return os.path.join(self.output_dir or ".", filename)
+
+    def _write_category(self, category: BatchCategory, details: List[Dict[str, Any]]) -> None:
+        """_claim_finalize로 떼어 낸 결과를 기록 — 워커들이 다음 작업을 가져갈 수 있게 스케줄러 잠금 밖에서
+        쓰고, 함께 쓰는 합친 출력과 변경 추적만 _sink_lock으로 보호한다"""
+        with self._sink_lock:
+            sink: Any = self._combined_sink
+            if sink is None:
+                sink = CsvRowSink(
+                    self._category_output(category),
+                    long_format=self.long_format,
+                    fieldnames=output_fieldnames(self.product_deadline_s, self.extract),
+                    **self.sink_options,
+                )
+            target = DeltaSink(sink, self.delta) if self.delta is not None else sink
+            collected = write_category_details(
+                details,
+                target,
+                category_url=category.category_url if self._combined_sink is not None else None,
+            )
+            if sink is not self._combined_sink:
+                sink.close()
+        with self._lock:
+            category.collected += collected
+            self.stats["rows"] += collected
+            self._release_details()
+        log.info(f"  [배치 {category.label}] 완료: {category.collected}/{len(category.links)}개 수집")
+
+    def _release_details(self) -> None:
+        """모든 카테고리의 목록 수집이 끝났다면, 아직 기록 전인 카테고리가 쓰지 않는 상세 결과는 버림"""
+        if not all(category.listed for category in self.categories):
+            return
+        needed: Set[str] = set()
+        for category in self.categories:
+            if not category.finalized:
+                needed.update(category.link_set)
+        for link in [link for link in self.details if link not in needed]:
+            del self.details[link]
+
+
+def crawl_batch(
+    batch_file: str,
+    output_csv: str,
+    output_dir: Optional[str],
+    default_pages: int,
+    default_items_per_page: Optional[int],
+    default_max_total_items: Optional[int],
+    headless: bool,
+    workers: int,
+    requests_per_sec: float,
+    base_delay_ms: int = 500,
+    long_format: bool = False,
+    seen_store: Optional[str] = None,
+    seen_bloom: bool = False,
+    max_attempts: int = 3,
+    retry_backoff_s: float = 5.0,
+    breaker_threshold: float = 0.5,
+    breaker_cooldown_s: float = 60.0,
+    product_deadline_s: Optional[float] = None,
+    delta_state: Optional[str] = None,
+    delta_output: Optional[str] = None,
+    launch_profile: str = "default",
+    recycle_every: int = 0,
+    max_browser_mb: float = 0.0,
+    archive_dir: Optional[str] = None,
+    sink_options: Optional[Dict[str, Any]] = None,
+    extract: Optional[ExtractPlan] = None,
+) -> Dict[str, int]:
+    categories = load_batch_file(batch_file, default_pages, default_items_per_page, default_max_total_items)
+    log.info(f"\n=== 배치 크롤링: {len(categories)}개 카테고리, 워커 {workers}개, 초당 {requests_per_sec}회 요청 ===\n")
+    store = PcodeStore(seen_store, use_bloom=seen_bloom) if seen_store else None
+    retry_queue = RetryQueue(max_attempts=max_attempts, base_delay_s=retry_backoff_s)
+    if delta_state and not delta_output:
+        delta_output = os.path.join(output_dir, "danawa_delta.csv") if output_dir else delta_output_path(output_csv)
+    delta = DeltaTracker(delta_state, delta_output) if delta_state else None
+    archive = SnapshotArchive(archive_dir) if archive_dir else None
+    scheduler = BatchScheduler(
+        categories,
+        workers=workers,
+        headless=headless,
+        base_delay_ms=base_delay_ms,
+        rate_limiter=RateLimiter(requests_per_sec),
+        output_dir=output_dir,
+        combined_output=output_csv,
+        long_format=long_format,
+        store=store,
+        retry_queue=retry_queue,
+        breaker=CircuitBreaker(threshold=breaker_threshold, cooldown_s=breaker_cooldown_s),
+        product_deadline_s=product_deadline_s,
+        delta=delta,
+        launch_profile=launch_profile,
+        recycle_every=recycle_every,
+        max_browser_mb=max_browser_mb,
+        archive=archive,
+        sink_options=sink_options,
+        extract=extract,
+    )
+    try:
+        stats = scheduler.run()
+    except BaseException:
+        if delta is not None:
+            delta.abort()
+        raise
+    else:
+        if delta is not None:
+            delta.close()
+    finally:
+        if store is not None:
+            store.compact()
+            store.close()
+        if archive is not None:
+            archive.close()
+    log.info(
+        f"\n[배치 완료] 링크 {stats['links']}개, 상세 요청 {stats['fetched'] + stats['failed'] + stats['retried']}회 "
+        f"(재시도 {stats['retried']}, 최종 실패 {stats['failed']}), 카테고리 간 공유 {stats['shared']}개, "
+        f"중복 {stats['duplicates']}개, 이미 수집 {stats['known']}개, 기록 {stats['rows']}행, "
+        f"목록 페이지 최종 실패 {stats['list_failed']}개"
+    )
+    log.info(
+        f"  최대 메모리: 파이썬 {stats['peak_python_mb']}MB, 브라우저 {stats['peak_browser_mb']}MB "
+        f"(브라우저 재시작 {stats['recycles']}회)"
+    )
+    if retry_queue.permanent_failures:
+        report_path = (
+            os.path.join(output_dir, "danawa_failed.csv") if output_dir else failure_report_path(output_csv)
+        )
+        write_failure_report(report_path, retry_queue)
+    return stats
+
+
+DISTRIBUTED_SCHEMA = """
+CREATE TABLE IF NOT EXISTS categories (
+    url TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    pages INTEGER NOT NULL,
+    items_per_page INTEGER,
+    max_total_items INTEGER,
+    output TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    page INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    UNIQUE (kind, url, page)
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, not_before);
+CREATE TABLE IF NOT EXISTS category_links (
+    category TEXT NOT NULL,
+    url TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (category, url)
+);
+CREATE TABLE IF NOT EXISTS results (
+    url TEXT PRIMARY KEY,
+    detail TEXT NOT NULL,
+    node TEXT,
+    finished_at REAL
+);
+"""
+
+
+class WorkQueue:
+    """여러 크롤러 노드가 공유하는 SQLite 작업 큐 (공유 저장소의 파일 하나)
+
+    작업은 목록 페이지(kind="list", 카테고리 URL + 페이지 번호)와 상품 상세(kind="detail", pcode URL)
+    두 종류다. 노드는 lease()로 작업 하나를 lease_s초 동안 빌리고, 처리하는 동안 heartbeat()로
+    임대를 연장한다. 노드가 죽어 임대가 만료되면 다음 lease() 호출에서 자동으로 다시 대기 상태가 된다.
+    완료 기록은 멱등이라 만료 후 두 노드가 같은 작업을 끝내도 결과는 하나만 남는다.
+    네트워크 파일시스템에서는 WAL이 동작하지 않으므로 기본 롤백 저널을 쓴다. 연결은 스레드마다 따로 연다.
+    """
+
+    def __init__(self, path: str, timeout_s: float = 30.0) -> None:
+        self.path = path
+        self.timeout_s = timeout_s
+        self._local = threading.local()
+        self._conn().executescript(DISTRIBUTED_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def _write(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡고 fn을 한 트랜잭션으로 실행"""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return result
+
+    def seed(self, categories: List[BatchCategory]) -> int:
+        """카테고리와 목록 페이지 작업을 넣음 (이미 있는 작업은 그대로 두므로 다시 실행해도 안전)"""
+        def insert(conn: sqlite3.Connection) -> int:
+            added = 0
+            for category in categories:
+                conn.execute(
+                    "INSERT OR IGNORE INTO categories (url, position, pages, items_per_page, max_total_items, output) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        category.category_url,
+                        category.index,
+                        category.pages,
+                        category.items_per_page,
+                        category.max_total_items,
+                        category.output,
+                    ),
+                )
+                for page_number in range(1, category.pages + 1):
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO tasks (kind, url, page) VALUES ('list', ?, ?)",
+                        (category.category_url, page_number),
+                    )
+                    added += cursor.rowcount
+            return added
+
+        return self._write(insert)
+
+    def lease(self, owner: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        """만료된 임대를 되돌린 뒤 준비된 작업 하나를 빌림 (목록 작업 우선). 없으면 None"""
+        def claim(conn: sqlite3.Connection) -> Optional[Dict[str, Any]]:
+            now = time.time()
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', owner = NULL WHERE status = 'leased' AND lease_expires < ?",
+                (now,),
+            )
+            row = conn.execute(
+                "SELECT t.id, t.kind, t.url, t.page, t.attempts, c.items_per_page FROM tasks t "
+                "LEFT JOIN categories c ON t.kind = 'list' AND c.url = t.url "
+                "WHERE t.status = 'pending' AND t.not_before <= ? ORDER BY t.kind = 'detail', t.id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ? WHERE id = ?",
+                (owner, now + lease_s, row["id"]),
+            )
+            return dict(row)
+
+        return self._write(claim)
+
+    def heartbeat(self, task_id: int, owner: str, lease_s: float) -> bool:
+        """아직 이 노드가 임대 중이면 만료 시각을 늦추고 True"""
+        def extend(conn: sqlite3.Connection) -> bool:
+            cursor = conn.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (time.time() + lease_s, task_id, owner),
+            )
+            return cursor.rowcount > 0
+
+        return self._write(extend)
+
+    def complete_listing(self, task_id: int, category_url: str, page_number: int, links: List[str]) -> int:
+        """목록 페이지에서 찾은 링크를 카테고리에 붙이고 새 pcode만 상세 작업으로 넣음, 새로 붙인 링크 수 반환"""
+        def insert(conn: sqlite3.Connection) -> int:
+            limit = conn.execute(
+                "SELECT max_total_items FROM categories WHERE url = ?", (category_url,)
+            ).fetchone()["max_total_items"]
+            count = conn.execute(
+                "SELECT COUNT(*) FROM category_links WHERE category = ?", (category_url,)
+            ).fetchone()[0]
+            added = 0
+            for rank, link in enumerate(links):
+                if limit and count >= limit:
+                    break
+                _, url = canonical_product_url(link)
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO category_links (category, url, page, rank) VALUES (?, ?, ?, ?)",
+                    (category_url, url, page_number, rank),
+                )
+                if cursor.rowcount:
+                    count += 1
+                    added += 1
+                    conn.execute("INSERT OR IGNORE INTO tasks (kind, url) VALUES ('detail', ?)", (url,))
+            conn.execute("UPDATE tasks SET status = 'done', owner = NULL WHERE id = ?", (task_id,))
+            return added
+
+        return self._write(insert)
+
+    def complete_detail(self, task_id: int, url: str, detail: Dict[str, Any], owner: str) -> None:
+        def store(conn: sqlite3.Connection) -> None:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (url, detail, node, finished_at) VALUES (?, ?, ?, ?)",
+                (url, json.dumps(detail, ensure_ascii=False), owner, time.time()),
+            )
+            conn.execute("UPDATE tasks SET status = 'done', owner = NULL WHERE id = ?", (task_id,))
+
+        self._write(store)
+
+    def fail(self, task_id: int, owner: str, error: str, max_attempts: int, base_delay_s: float) -> Optional[float]:
+        """실패 기록: 시도 횟수가 남았으면 백오프 뒤 다시 대기시키고 그 지연(초)을, 아니면 None
+
+        임대가 만료되어 다른 노드가 가져간 작업이면 그 노드의 결과를 기다리도록 아무것도 바꾸지 않는다.
+        """
+        def record(conn: sqlite3.Connection) -> Optional[float]:
+            row = conn.execute(
+                "SELECT attempts FROM tasks WHERE id = ? AND owner = ? AND status = 'leased'", (task_id, owner)
+            ).fetchone()
+            if row is None:
+                return None
+            attempts = row[0] + 1
+            if attempts >= max_attempts:
+                conn.execute(
+                    "UPDATE tasks SET status = 'failed', owner = NULL, attempts = ?, error = ? WHERE id = ?",
+                    (attempts, error, task_id),
+                )
+                return None
+            delay = base_delay_s * (2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+            conn.execute(
+                "UPDATE tasks SET status = 'pending', owner = NULL, attempts = ?, error = ?, not_before = ? "
+                "WHERE id = ?",
+                (attempts, error, time.time() + delay, task_id),
+            )
+            return delay
+
+        return self._write(record)
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        for row in self._conn().execute("SELECT status, COUNT(*) FROM tasks GROUP BY status"):
+            counts[row[0]] = row[1]
+        return counts
+
+    def is_drained(self) -> bool:
+        """작업이 하나 이상 들어왔고 대기/임대 중인 작업이 없으면 True"""
+        counts = self.counts()
+        return sum(counts.values()) > 0 and not counts["pending"] and not counts["leased"]
+
+    def categories(self) -> List[BatchCategory]:
+        rows = self._conn().execute("SELECT * FROM categories ORDER BY position")
+        return [
+            BatchCategory(
+                index=row["position"],
+                category_url=row["url"],
+                pages=row["pages"],
+                items_per_page=row["items_per_page"],
+                max_total_items=row["max_total_items"],
+                output=row["output"],
+            )
+            for row in rows
+        ]
+
+    def category_details(self, category: BatchCategory) -> List[Dict[str, Any]]:
+        """카테고리 목록 순서(페이지, 페이지 안 순서)대로 수집된 상세 결과"""
+        rows = self._conn().execute(
+            "SELECT r.detail FROM category_links l JOIN results r ON r.url = l.url "
+            "WHERE l.category = ? ORDER BY l.page, l.rank LIMIT ?",
+            (category.category_url, category.max_total_items or -1),
+        )
+        return [json.loads(row[0]) for row in rows]
+
+    def failed_tasks(self) -> List[sqlite3.Row]:
+        return self._conn().execute(
+            "SELECT kind, url, page, attempts, error FROM tasks WHERE status = 'failed' ORDER BY id"
+        ).fetchall()
+
+
+class LeaseHeartbeat:
+    """작업을 처리하는 동안 별도 스레드에서 lease_s/3마다 임대를 연장"""
+
+    def __init__(self, work_queue: WorkQueue, task_id: int, owner: str, lease_s: float) -> None:
+        self.work_queue = work_queue
+        self.task_id = task_id
+        self.owner = owner
+        self.lease_s = lease_s
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"heartbeat-{task_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.lease_s / 3):
+            try:
+                if not self.work_queue.heartbeat(self.task_id, self.owner, self.lease_s):
+                    self.lost = True
+                    return
+            except sqlite3.Error as e:
+                log.warning(f"  [분산] 임대 연장 실패 - {e}")
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def run_crawl_node(
+    queue_path: str,
+    headless: bool,
+    requests_per_sec: float,
+    base_delay_ms: int = 500,
+    node_id: Optional[str] = None,
+    lease_s: float = 120.0,
+    poll_s: float = 5.0,
+    max_attempts: int = 3,
+    retry_backoff_s: float = 5.0,
+    breaker_threshold: float = 0.5,
+    breaker_cooldown_s: float = 60.0,
+    product_deadline_s: Optional[float] = None,
+    launch_profile: str = "default",
+    recycle_every: int = 0,
+    max_browser_mb: float = 0.0,
+    extract: Optional[ExtractPlan] = None,
+) -> Dict[str, int]:
+    """공유 작업 큐에서 작업을 빌려 처리하는 크롤러 노드 — 큐가 빌 때까지 돌고 처리 통계를 반환
+
+    요청 속도 제한과 차단기는 노드(= IP)마다 따로 둔다. 아직 다른 노드가 목록 작업을 처리 중이면
+    새 상세 작업이 생길 수 있으므로, 대기 작업이 없어도 임대 중인 작업이 남아 있는 동안은 기다린다.
+    """
+    work_queue = WorkQueue(queue_path)
+    node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+    rate_limiter = RateLimiter(requests_per_sec)
+    breaker = CircuitBreaker(threshold=breaker_threshold, cooldown_s=breaker_cooldown_s)
+    stats = {"lists": 0, "details": 0, "failed": 0, "lost_leases": 0}
+    log.info(f"\n=== 분산 노드 {node_id}: {queue_path} ===\n")
+
+    with sync_playwright() as p:
+        session = BrowserSession(
+            p,
+            headless=headless,
+            profile=launch_profile,
+            recycle_every=recycle_every,
+            max_browser_mb=max_browser_mb,
+        )
+        try:
+            while True:
+                task = work_queue.lease(node_id, lease_s)
+                if task is None:
+                    if work_queue.is_drained():
+                        break
+                    time.sleep(poll_s)
+                    continue
+
+                product_context = ProductLogContext(task["url"] if task["kind"] == "detail" else None)
+                with LeaseHeartbeat(work_queue, task["id"], node_id, lease_s) as heartbeat, product_context:
+                    try:
+                        breaker.wait_if_open()
+                        if task["kind"] == "list":
+                            links = harvest_list_page(
+                                session.context,
+                                task["url"],
+                                task["page"],
+                                task["items_per_page"],
+                                rate_limiter=rate_limiter,
+                                move_page=profile_runs_scripts(launch_profile),
+                            )
+                            added = work_queue.complete_listing(task["id"], task["url"], task["page"], links)
+                            log.info(f"  [분산] 목록 {task['url'][:60]} p{task['page']}: 링크 {len(links)}개, 새 링크 {added}개")
+                            stats["lists"] += 1
+                        else:
+                            rate_limiter.acquire()
+                            detail = fetch_product_detail(
+                                session.context,
+                                task["url"],
+                                base_delay_ms,
+                                deadline_s=product_deadline_s,
+                                extract=extract,
+                            )
+                            work_queue.complete_detail(task["id"], task["url"], detail, node_id)
+                            log.debug(f"  [분산] 상세 {extract_pcode(task['url'])} 완료")
+                            stats["details"] += 1
+                        breaker.record(True)
+                    except Exception as e:
+                        breaker.record_error(e)
+                        retry_in = work_queue.fail(task["id"], node_id, str(e), max_attempts, retry_backoff_s)
+                        stats["failed"] += 1
+                        if retry_in is None:
+                            log.error(f"    오류: {task['url']} 최종 실패 - {e}")
+                        else:
+                            log.warning(f"    오류: {task['url']} 실패 - {e} ({retry_in:.1f}초 뒤 다시 대기열로)")
+                if heartbeat.lost:
+                    stats["lost_leases"] += 1
+                if task["kind"] == "detail":
+                    session.product_done()
+        finally:
+            session.close()
+
+    log.info(
+        f"\n[노드 완료] 목록 {stats['lists']}개, 상세 {stats['details']}개, 실패 {stats['failed']}회, "
+        f"만료된 임대 {stats['lost_leases']}개"
+    )
+    return stats
+
+
+def coordinate_distributed(
+    queue_path: str,
+    categories: List[BatchCategory],
+    output_csv: str,
+    output_dir: Optional[str],
+    long_format: bool = False,
+    product_deadline_s: Optional[float] = None,
+    poll_s: float = 10.0,
+    seed_only: bool = False,
+    sink_options: Optional[Dict[str, Any]] = None,
+    extract: Optional[ExtractPlan] = None,
+) -> Dict[str, int]:
+    """코디네이터: 카테고리 목록 페이지를 큐에 넣고, 노드들이 큐를 비울 때까지 진행 상황을 보여 준 뒤
+    카테고리마다 매핑을 학습해 결과를 CSV로 내보냄 (배치 모드와 같은 출력 형식)"""
+    work_queue = WorkQueue(queue_path)
+    added = work_queue.seed(categories)
+    log.info(f"\n=== 분산 코디네이터: {len(categories)}개 카테고리, 목록 작업 {added}개 추가: {queue_path} ===\n")
+    if seed_only:
+        return work_queue.counts()
+
+    while not work_queue.is_drained():
+        counts = work_queue.counts()
+        log.info(
+            f"  [분산] 대기 {counts['pending']}, 처리 중 {counts['leased']}, "
+            f"완료 {counts['done']}, 실패 {counts['failed']}"
+        )
+        time.sleep(poll_s)
+    return export_distributed_results(
+        work_queue, output_csv, output_dir, long_format, product_deadline_s, sink_options=sink_options, extract=extract
+    )
+
+
+def export_distributed_results(
+    work_queue: WorkQueue,
+    output_csv: str,
+    output_dir: Optional[str],
+    long_format: bool = False,
+    product_deadline_s: Optional[float] = None,
+    sink_options: Optional[Dict[str, Any]] = None,
+    extract: Optional[ExtractPlan] = None,
+) -> Dict[str, int]:
+    fieldnames = output_fieldnames(product_deadline_s, extract)
+    sink_options = sink_options or {}
+    combined = None
+    if output_dir is None:
+        combined = CsvRowSink(output_csv, long_format=long_format, fieldnames=["카테고리"] + fieldnames, **sink_options)
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+
+    rows = 0
+    try:
+        for category in work_queue.categories():
+            details = work_queue.category_details(category)
+            if combined is not None:
+                rows += write_category_details(details, combined, category_url=category.category_url)
+                continue
+            filename = category.output or f"danawa_{category.label}.csv"
+            sink = CsvRowSink(
+                os.path.join(output_dir, filename), long_format=long_format, fieldnames=fieldnames, **sink_options
+            )
+            try:
+                rows += write_category_details(details, sink)
+            finally:
+                sink.close()
+    finally:
+        if combined is not None:
+            combined.close()
+
+    counts = work_queue.counts()
+    failed = work_queue.failed_tasks()
+    log.info(f"\n[분산 완료] 기록 {rows}행, 완료 작업 {counts['done']}개, 최종 실패 {counts['failed']}개")
+    if failed:
+        retry_queue = RetryQueue()
+        for task in failed:
+            retry_queue.attempts[task["url"]] = task["attempts"]
+            retry_queue.permanent_failures[task["url"]] = task["error"] or ""
+        report_path = os.path.join(output_dir, "danawa_failed.csv") if output_dir else failure_report_path(output_csv)
+        write_failure_report(report_path, retry_queue)
+    return {"rows": rows, **counts}
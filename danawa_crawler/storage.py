@@ -0,0 +1,843 @@
+"""출력 열과 CSV 싱크, 압축/매니페스트, 변경분(델타), pcode 저장소, 스냅샷 아카이브"""
+import array
+import bisect
+import csv
+import gzip
+import hashlib
+import heapq
+import io
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List, Set, Optional, Tuple, Any
+
+from danawa_crawler.core import DANAWA_PRODUCT_URL, extract_pcode, log, RetryQueue
+from danawa_crawler.extract import encode_price_trend, ExtractPlan
+from danawa_crawler.normalize import (
+    analyze_and_create_mapping,
+    collect_checkmark_items,
+    normalize_spec_pairs,
+    write_long_format_rows,
+)
+
+
+PCODE_STORE_MAGIC = b"PCSET\x00\x01\x00"
+BLOOM_MAGIC = b"PCBLM\x00\x01\x00"
+BLOOM_HEADER = struct.Struct("<QI")
+
+
+class BloomFilter:
+    """pcode용 Bloom 필터 — might_contain이 False면 확실히 처음 보는 상품"""
+
+    def __init__(self, bits: Any, num_bits: int, num_hashes: int) -> None:
+        self.bits = bits
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+
+    @classmethod
+    def for_capacity(cls, capacity: int, false_positive_rate: float = 0.01) -> "BloomFilter":
+        capacity = max(capacity, 1)
+        num_bits = max(64, int(-capacity * math.log(false_positive_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(bytearray((num_bits + 7) // 8), num_bits, num_hashes)
+
+    def _positions(self, value: int):
+        digest = hashlib.blake2b(value.to_bytes(8, "little"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, value: int) -> None:
+        for pos in self._positions(value):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, value: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(value))
+
+    def save(self, path: str) -> None:
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(BLOOM_MAGIC)
+            f.write(BLOOM_HEADER.pack(self.num_bits, self.num_hashes))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if data[:len(BLOOM_MAGIC)] != BLOOM_MAGIC:
+            data.close()
+            raise ValueError(f"{path}: Bloom 필터 파일 형식이 아닙니다")
+        offset = len(BLOOM_MAGIC)
+        num_bits, num_hashes = BLOOM_HEADER.unpack_from(data, offset)
+        bits = memoryview(data)[offset + BLOOM_HEADER.size:]
+        return cls(bits, num_bits, num_hashes)
+
+
+class PcodeStore:
+    """이미 크롤링한 pcode의 영구 집합
+
+    본체는 정렬된 uint64 배열 파일이며 mmap(읽기 전용)으로 열어 이진 탐색하므로 수백만 개여도
+    시작 시 파일을 읽지 않고, 여러 워커 프로세스가 같은 파일을 열면 OS 페이지 캐시를 공유한다.
+    실행 중 새로 크롤링한 pcode는 <path>.log에 한 줄씩 덧붙였다가 compact()에서 본체에 병합한다.
+    use_bloom이면 <path>.bloom의 Bloom 필터로 "새 상품" 여부를 탐색 전에 먼저 거른다.
+    """
+
+    def __init__(self, path: str, use_bloom: bool = False) -> None:
+        self.path = path
+        self.log_path = path + ".log"
+        self.bloom_path = path + ".bloom"
+        self.use_bloom = use_bloom
+        self.bloom: Optional[BloomFilter] = None
+        self._lock = threading.Lock()
+        self._file = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._values: Any = ()
+        self._added: Set[int] = set()
+        self._log = None
+        self._open()
+
+    def _open(self) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) > len(PCODE_STORE_MAGIC):
+            self._file = open(self.path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(PCODE_STORE_MAGIC)] != PCODE_STORE_MAGIC:
+                self._close_base()
+                raise ValueError(f"{self.path}: pcode 저장소 파일 형식이 아닙니다")
+            self._values = memoryview(self._mmap)[len(PCODE_STORE_MAGIC):].cast("Q")
+        if os.path.exists(self.log_path):
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line.isdigit():
+                        self._added.add(int(line))
+        if self.use_bloom and os.path.exists(self.bloom_path):
+            self.bloom = BloomFilter.load(self.bloom_path)
+
+    def _close_base(self) -> None:
+        if isinstance(self._values, memoryview):
+            self._values.release()
+        self._values = ()
+        if self.bloom is not None and isinstance(self.bloom.bits, memoryview):
+            bloom_mmap = self.bloom.bits.obj
+            self.bloom.bits.release()
+            bloom_mmap.close()
+        self.bloom = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return len(self._values) + len(self._added)
+
+    def __contains__(self, key: Any) -> bool:
+        if isinstance(key, str):
+            if not key.isdigit():
+                return False
+            key = int(key)
+        if key in self._added:
+            return True
+        if self.bloom is not None and not self.bloom.might_contain(key):
+            return False
+        values = self._values
+        index = bisect.bisect_left(values, key)
+        return index < len(values) and values[index] == key
+
+    def add(self, key: Any) -> None:
+        if isinstance(key, str):
+            if not key.isdigit():
+                return
+            key = int(key)
+        with self._lock:
+            if key in self:
+                return
+            self._added.add(key)
+            if self._log is None:
+                self._log = open(self.log_path, "a", encoding="utf-8")
+            self._log.write(f"{key}\n")
+            self._log.flush()
+
+    def compact(self) -> None:
+        """로그에 쌓인 pcode를 정렬 배열 파일에 병합하고 (use_bloom이면) Bloom 필터를 다시 만듦"""
+        with self._lock:
+            if not self._added and (not self.use_bloom or self.bloom is not None):
+                return
+            tmp_path = self.path + ".tmp"
+            bloom = BloomFilter.for_capacity(len(self)) if self.use_bloom else None
+            count = 0
+            with open(tmp_path, "wb") as f:
+                f.write(PCODE_STORE_MAGIC)
+                chunk = array.array("Q")
+                previous = None
+                for value in heapq.merge(self._values, sorted(self._added)):
+                    if value == previous:
+                        continue
+                    previous = value
+                    chunk.append(value)
+                    if bloom is not None:
+                        bloom.add(value)
+                    if len(chunk) >= 65536:
+                        chunk.tofile(f)
+                        count += len(chunk)
+                        chunk = array.array("Q")
+                chunk.tofile(f)
+                count += len(chunk)
+            self._close_base()
+            os.replace(tmp_path, self.path)
+            if bloom is not None:
+                bloom.save(self.bloom_path)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._added = set()
+            self._open()
+            log.info(f"  [pcode 저장소] {count}개 pcode 저장: {self.path}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self._close_base()
+
+
+class SeenProducts:
+    """실행 전체에서 공유하는 상품 중복 확인 집합 (목록 수집과 상세 수집이 함께 사용)
+
+    store가 있으면 이전 실행에서 이미 크롤링한 pcode도 건너뛰고(known), mark_done으로
+    이번 실행에서 수집을 마친 pcode를 저장소에 기록한다.
+    """
+
+    def __init__(self, store: Optional[PcodeStore] = None) -> None:
+        self._keys: Set[str] = set()
+        self._lock = threading.Lock()
+        self.store = store
+        self.duplicates = 0
+        self.known = 0
+
+    def add(self, key: str) -> bool:
+        """처음 보는 키면 등록하고 True, 이미 본 키면 중복으로 세고 False"""
+        with self._lock:
+            if key in self._keys:
+                self.duplicates += 1
+                return False
+            self._keys.add(key)
+            if self.store is not None and key in self.store:
+                self.known += 1
+                return False
+            return True
+
+    def mark_done(self, key: str) -> None:
+        if self.store is not None:
+            self.store.add(key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+WIDE_FORMAT_FIELDNAMES = ["상품명", "URL", "최저가", "최고가", "가격추이", "상세정보"]
+LONG_FORMAT_FIELDNAMES = ["상품명", "URL", "key", "value"]
+
+
+def failure_report_path(output_csv: str) -> str:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}_failed.csv"
+
+
+def write_failure_report(path: str, retry_queue: RetryQueue) -> None:
+    """최종 실패한 상품(pcode, URL, 시도 횟수, 마지막 오류)을 CSV로 기록"""
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pcode", "URL", "시도횟수", "오류"])
+        for link, error in retry_queue.permanent_failures.items():
+            writer.writerow([extract_pcode(link) or "", link, retry_queue.attempts.get(link, 0), error])
+    log.info(f"  최종 실패 목록: {path}")
+
+
+def build_output_row(detail: Dict[str, Any]) -> Dict[str, str]:
+    min_price = detail.get("min_price")
+    max_price = detail.get("max_price")
+    price_trend = detail.get("price_trend")
+    return {
+        "상품명": detail.get("title", ""),
+        "URL": detail["url"],
+        "최저가": str(min_price) if min_price is not None else "",
+        "최고가": str(max_price) if max_price is not None else "",
+        "가격추이": encode_price_trend(price_trend) if price_trend else "",
+        "판매처": "/".join(f"{mall}:{price}" for mall, price in detail.get("malls") or []),
+        "부분수집": ",".join(detail.get("partial") or []),
+    }
+
+
+# 추출기를 끄면 빠지는 넓은 형식 열 (상품명/URL/상세정보는 늘 씀)
+EXTRACTOR_COLUMNS = {"price": ["최저가", "최고가"], "trend": ["가격추이"]}
+
+
+def output_fieldnames(product_deadline_s: Optional[float], extract: Optional[ExtractPlan] = None) -> List[str]:
+    """켠 추출기의 열만 씀 (title,specs면 예전 merged_crawler.py와 같은 상품명/URL/상세정보).
+    판매처 추출기를 켜면 판매처 열을, 상품별 시간 예산을 쓰면 잘린 단계를 알리는 부분수집 열을 덧붙임"""
+    fieldnames = list(WIDE_FORMAT_FIELDNAMES)
+    if extract is not None:
+        for name, columns in EXTRACTOR_COLUMNS.items():
+            if name not in extract:
+                fieldnames = [field for field in fieldnames if field not in columns]
+        if "malls" in extract:
+            fieldnames.append("판매처")
+    if product_deadline_s:
+        fieldnames.append("부분수집")
+    return fieldnames
+
+
+def format_detail_info(spec_pairs: List[Tuple[str, str]]) -> str:
+    return "/".join(f"{key}:{value}" for key, value in spec_pairs)
+
+
+OUTPUT_COMPRESSIONS = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def output_manifest_path(output_csv: str) -> str:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}.manifest.json"
+
+
+class _ChecksumFile(io.RawIOBase):
+    """압축기 아래에서 실제로 디스크에 쓰인 바이트 수와 sha256을 세는 파일 래퍼"""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        self._file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.bytes_written = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self.sha256.update(data)
+        self.bytes_written += len(data)
+        return self._file.write(data)
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self.closed:
+            super().close()
+            self._file.close()
+
+
+def _open_compressed_text(raw: _ChecksumFile, compression: str) -> Tuple[Any, Any]:
+    """(텍스트 파일, 닫아야 할 압축 스트림) — 압축하지 않으면 스트림은 None"""
+    if compression == "gzip":
+        stream: Any = gzip.GzipFile(fileobj=raw, mode="wb")
+    elif compression == "zstd":
+        import zstandard
+
+        stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    else:
+        stream = None
+    text = io.TextIOWrapper(stream if stream is not None else io.BufferedWriter(raw), encoding="utf-8-sig", newline="")
+    return text, stream
+
+
+def open_output_text(path: str) -> Any:
+    """확장자(.gz, .zst)에 맞게 압축을 풀어 읽는 텍스트 파일"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8-sig", newline="")
+    if path.endswith(".zst"):
+        import zstandard
+
+        return zstandard.open(path, "rt", encoding="utf-8-sig", newline="")
+    return open(path, encoding="utf-8-sig", newline="")
+
+
+def output_chunk_paths(output_csv: str) -> List[str]:
+    """결과 파일 경로 — 매니페스트가 있으면(압축/분할 출력) 거기 적힌 조각 파일들"""
+    manifest_path = output_manifest_path(output_csv)
+    if not os.path.exists(manifest_path):
+        return [output_csv]
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(manifest_path)
+    return [os.path.join(directory, chunk["file"]) for chunk in manifest["chunks"]]
+
+
+class CsvRowSink:
+    """크롤링 결과를 상품이 끝날 때마다 바로 CSV에 기록 (행을 메모리에 모아 두지 않음)
+
+    compression(gzip/zstd)을 주면 스트리밍으로 압축하고, rotate_rows(상품 수)나 rotate_mb(압축 후 크기)를
+    주면 그 크기마다 헤더가 있는 조각 파일(<이름>.part0001.csv.gz ...)로 나눈다. 둘 중 하나라도 쓰면
+    조각별 행 수, 바이트 수, sha256을 적은 <이름>.manifest.json을 조각이 닫힐 때마다 갱신한다.
+    압축 스트림은 행마다 flush하지 않으므로 크기 기준 분할은 압축기 버퍼만큼 늦을 수 있다.
+    """
+
+    def __init__(
+        self,
+        output_csv: str,
+        long_format: bool = False,
+        fieldnames: Optional[List[str]] = None,
+        compression: str = "none",
+        rotate_rows: int = 0,
+        rotate_mb: float = 0.0,
+    ) -> None:
+        if compression not in OUTPUT_COMPRESSIONS:
+            raise ValueError(f"지원하지 않는 압축 형식: {compression}")
+        self.output_csv = output_csv
+        self.long_format = long_format
+        self.fieldnames = fieldnames or WIDE_FORMAT_FIELDNAMES
+        self.compression = compression
+        self.rotate_rows = rotate_rows
+        self.rotate_bytes = int(rotate_mb * 1024 * 1024)
+        self.rows_written = 0
+        self.closed = False
+        self.chunks: List[Dict[str, Any]] = []
+        self._manifest = compression != "none" or bool(rotate_rows or self.rotate_bytes)
+        self._open_chunk()
+
+    def _chunk_path(self) -> str:
+        root, ext = os.path.splitext(self.output_csv)
+        suffix = OUTPUT_COMPRESSIONS[self.compression]
+        if self.rotate_rows or self.rotate_bytes:
+            return f"{root}.part{len(self.chunks) + 1:04d}{ext}{suffix}"
+        return f"{self.output_csv}{suffix}"
+
+    def _open_chunk(self) -> None:
+        self._path = self._chunk_path()
+        self._raw = _ChecksumFile(self._path)
+        self._file, self._stream = _open_compressed_text(self._raw, self.compression)
+        self._chunk_rows = 0
+        if self.long_format:
+            self._writer: Any = csv.writer(self._file)
+            self._writer.writerow(LONG_FORMAT_FIELDNAMES)
+        else:
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+
+    def _close_chunk(self) -> None:
+        self._file.close()
+        if self._stream is not None:
+            self._raw.close()
+        if not self._manifest:
+            return
+        self.chunks.append({
+            "file": os.path.basename(self._path),
+            "rows": self._chunk_rows,
+            "bytes": self._raw.bytes_written,
+            "sha256": self._raw.sha256.hexdigest(),
+        })
+        self._write_manifest()
+
+    def _write_manifest(self) -> None:
+        manifest = {
+            "format": "long" if self.long_format else "wide",
+            "compression": self.compression,
+            "fieldnames": LONG_FORMAT_FIELDNAMES if self.long_format else self.fieldnames,
+            "rows": sum(chunk["rows"] for chunk in self.chunks),
+            "chunks": self.chunks,
+        }
+        path = output_manifest_path(self.output_csv)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def write(self, row: Dict[str, str], spec_pairs: List[Tuple[str, str]]) -> None:
+        if self._chunk_rows and (
+            (self.rotate_rows and self._chunk_rows >= self.rotate_rows)
+            or (self.rotate_bytes and self._raw.bytes_written >= self.rotate_bytes)
+        ):
+            self._close_chunk()
+            self._open_chunk()
+        if self.long_format:
+            write_long_format_rows(self._writer, row["상품명"], row["URL"], spec_pairs)
+            if row.get("부분수집"):
+                self._writer.writerow([row["상품명"], row["URL"], "부분수집", row["부분수집"]])
+        else:
+            self._writer.writerow({**row, "상세정보": format_detail_info(spec_pairs)})
+        self.rows_written += 1
+        self._chunk_rows += 1
+        if self._stream is None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._close_chunk()
+
+
+DELTA_FIELD_GROUPS = ["상품명", "가격", "상세정보", "가격추이"]
+DELTA_FIELDNAMES = ["변경구분", "변경필드"] + WIDE_FORMAT_FIELDNAMES
+DELTA_STATE_MAGIC = b"DLTST\x00\x01\x00"
+DELTA_RECORD_WIDTH = 1 + len(DELTA_FIELD_GROUPS)
+
+
+def _field_hash(*parts: str) -> int:
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return int.from_bytes(digest.digest(), "little")
+
+
+def row_field_hashes(row: Dict[str, str], spec_pairs: List[Tuple[str, str]]) -> List[int]:
+    """상품 한 행의 비교용 해시: 상품명, 가격(최저/최고), 상세정보, 가격추이 순서"""
+    spec_digest = hashlib.blake2b(digest_size=8)
+    for key, value in spec_pairs:
+        spec_digest.update(f"{key}:{value}\x1f".encode("utf-8"))
+    return [
+        _field_hash(row.get("상품명", "")),
+        _field_hash(row.get("최저가", ""), row.get("최고가", "")),
+        int.from_bytes(spec_digest.digest(), "little"),
+        _field_hash(row.get("가격추이", "")),
+    ]
+
+
+class _RecordKeys:
+    """평탄한 레코드 배열에서 pcode 열만 보여 주는 bisect용 시퀀스"""
+
+    def __init__(self, values: Any) -> None:
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.values) // DELTA_RECORD_WIDTH
+
+    def __getitem__(self, index: int) -> int:
+        return self.values[index * DELTA_RECORD_WIDTH]
+
+
+class DeltaTracker:
+    """이전 실행 상태와 비교해 추가/삭제/변경 상품을 델타 CSV로 기록
+
+    상태 파일은 pcode로 정렬된 (pcode, 필드 해시 4개) uint64 레코드 배열이다. 이전 상태는 mmap으로
+    열어 행이 들어올 때마다 이진 탐색하므로 추가/변경은 크롤링 중에 바로 기록되고, 이번 실행의
+    레코드만 작은 정수 배열로 모았다가 close()에서 정렬해 삭제 목록과 새 상태 파일을 만든다.
+    두 결과 파일을 pandas로 통째로 읽지 않는다. 카테고리를 다 돌지 못한 실행은 mark_partial로 알리며,
+    그러면 close()는 삭제를 내지 않고 이번에 보지 못한 이전 레코드를 새 상태 파일에 그대로 이어 쓴다.
+    """
+
+    def __init__(self, state_path: str, delta_csv: str) -> None:
+        self.state_path = state_path
+        self.delta_csv = delta_csv
+        self.stats = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0, "unkeyed": 0, "carried": 0}
+        self.partial_reasons: List[str] = []
+        self._records = array.array("Q")
+        self._lock = threading.Lock()
+        self._prev_file = None
+        self._prev_mmap: Optional[mmap.mmap] = None
+        self._prev_values: Any = ()
+        if os.path.exists(state_path) and os.path.getsize(state_path) > len(DELTA_STATE_MAGIC):
+            self._prev_file = open(state_path, "rb")
+            self._prev_mmap = mmap.mmap(self._prev_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._prev_mmap[:len(DELTA_STATE_MAGIC)] != DELTA_STATE_MAGIC:
+                raise ValueError(f"{state_path}: 델타 상태 파일 형식이 아닙니다")
+            self._prev_values = memoryview(self._prev_mmap)[len(DELTA_STATE_MAGIC):].cast("Q")
+        self._prev_keys = _RecordKeys(self._prev_values)
+        self._file = open(delta_csv, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=DELTA_FIELDNAMES)
+        self._writer.writeheader()
+
+    def _previous_hashes(self, pcode: int) -> Optional[List[int]]:
+        index = bisect.bisect_left(self._prev_keys, pcode)
+        if index < len(self._prev_keys) and self._prev_keys[index] == pcode:
+            start = index * DELTA_RECORD_WIDTH + 1
+            return list(self._prev_values[start:start + len(DELTA_FIELD_GROUPS)])
+        return None
+
+    def observe(self, row: Dict[str, str], spec_pairs: List[Tuple[str, str]]) -> None:
+        pcode = extract_pcode(row.get("URL", ""))
+        if not pcode:
+            self.stats["unkeyed"] += 1
+            return
+        key = int(pcode)
+        hashes = row_field_hashes(row, spec_pairs)
+        with self._lock:
+            self._records.append(key)
+            self._records.extend(hashes)
+            previous = self._previous_hashes(key)
+            if previous is None:
+                kind, changed_fields = "added", []
+            else:
+                changed_fields = [
+                    name for name, old, new in zip(DELTA_FIELD_GROUPS, previous, hashes) if old != new
+                ]
+                if not changed_fields:
+                    self.stats["unchanged"] += 1
+                    return
+                kind = "changed"
+            self.stats[kind] += 1
+            self._writer.writerow({
+                **{name: row.get(name, "") for name in WIDE_FORMAT_FIELDNAMES},
+                "상세정보": format_detail_info(spec_pairs),
+                "변경구분": kind,
+                "변경필드": ",".join(changed_fields),
+            })
+            self._file.flush()
+
+    def _release_previous(self) -> None:
+        if isinstance(self._prev_values, memoryview):
+            self._prev_values.release()
+        self._prev_values = ()
+        self._prev_keys = _RecordKeys(())
+        if self._prev_mmap is not None:
+            self._prev_mmap.close()
+            self._prev_mmap = None
+        if self._prev_file is not None:
+            self._prev_file.close()
+            self._prev_file = None
+
+    def mark_partial(self, reason: str) -> None:
+        """이번 실행이 카테고리 전체를 돌지 않았음(개수 제한, 페이지 제한, 실패, 건너뛴 상품 등)을 기록"""
+        with self._lock:
+            if reason not in self.partial_reasons:
+                self.partial_reasons.append(reason)
+
+    def observe_progress(self, event: Dict[str, Any]) -> None:
+        """crawl_detail_pass의 progress로 넘기면 summary 이벤트의 incomplete 사유를 mark_partial로 옮김"""
+        if event["event"] == "summary":
+            for reason in event["incomplete"]:
+                self.mark_partial(reason)
+
+    def abort(self) -> None:
+        """실행이 중간에 끝났을 때: 지금까지의 델타만 남기고 이전 상태 파일은 그대로 둠"""
+        with self._lock:
+            self._file.close()
+            self._release_previous()
+
+    def close(self) -> Dict[str, int]:
+        with self._lock:
+            count = len(self._records) // DELTA_RECORD_WIDTH
+            order = sorted(range(count), key=lambda i: self._records[i * DELTA_RECORD_WIDTH])
+            current_keys: List[int] = []
+            for i in order:
+                key = self._records[i * DELTA_RECORD_WIDTH]
+                if not current_keys or current_keys[-1] != key:
+                    current_keys.append(key)
+
+            complete = not self.partial_reasons
+            unseen = array.array("Q")
+            cursor = 0
+            for index in range(len(self._prev_keys)):
+                key = self._prev_keys[index]
+                while cursor < len(current_keys) and current_keys[cursor] < key:
+                    cursor += 1
+                if cursor < len(current_keys) and current_keys[cursor] == key:
+                    continue
+                if not complete:
+                    unseen.append(index)
+                    continue
+                self.stats["removed"] += 1
+                self._writer.writerow({
+                    "변경구분": "removed",
+                    "URL": DANAWA_PRODUCT_URL.format(pcode=key),
+                })
+            self._file.close()
+            self.stats["carried"] = len(unseen)
+
+            tmp_path = self.state_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(DELTA_STATE_MAGIC)
+                chunk = array.array("Q")
+                previous_key = None
+                carried = 0
+                for i in order:
+                    start = i * DELTA_RECORD_WIDTH
+                    key = self._records[start]
+                    if key == previous_key:
+                        continue
+                    previous_key = key
+                    while carried < len(unseen) and self._prev_keys[unseen[carried]] < key:
+                        prev_start = unseen[carried] * DELTA_RECORD_WIDTH
+                        chunk.extend(self._prev_values[prev_start:prev_start + DELTA_RECORD_WIDTH])
+                        carried += 1
+                    chunk.extend(self._records[start:start + DELTA_RECORD_WIDTH])
+                for index in unseen[carried:]:
+                    prev_start = index * DELTA_RECORD_WIDTH
+                    chunk.extend(self._prev_values[prev_start:prev_start + DELTA_RECORD_WIDTH])
+                chunk.tofile(f)
+            self._release_previous()
+            os.replace(tmp_path, self.state_path)
+        if complete:
+            log.info(
+                f"  [델타] 추가 {self.stats['added']}, 변경 {self.stats['changed']}, "
+                f"삭제 {self.stats['removed']}, 동일 {self.stats['unchanged']}: {self.delta_csv}"
+            )
+        else:
+            log.info(
+                f"  [델타] 추가 {self.stats['added']}, 변경 {self.stats['changed']}, 동일 {self.stats['unchanged']}: "
+                f"{self.delta_csv} (부분 실행: {', '.join(self.partial_reasons)} — 삭제는 내지 않고 "
+                f"이번에 못 본 이전 상품 {self.stats['carried']}개를 상태에 유지)"
+            )
+        return self.stats
+
+
+class DeltaSink:
+    """다른 sink 앞에서 각 행을 DeltaTracker에 넘겨 주는 래퍼"""
+
+    def __init__(self, inner: Any, tracker: DeltaTracker) -> None:
+        self.inner = inner
+        self.tracker = tracker
+
+    def write(self, row: Dict[str, str], spec_pairs: List[Tuple[str, str]]) -> None:
+        self.tracker.observe(row, spec_pairs)
+        self.inner.write(row, spec_pairs)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def delta_output_path(output_csv: str) -> str:
+    root, _ = os.path.splitext(output_csv)
+    return f"{root}_delta.csv"
+
+
+SNAPSHOT_DATA_FILE = "snapshots.dat"
+SNAPSHOT_INDEX_FILE = "snapshots.idx"
+SNAPSHOT_INDEX_RECORD = struct.Struct("<QQId")  # pcode, offset, length, fetched_at
+
+
+class SnapshotArchive:
+    """상품별 원본 추출 결과(제목, 정규화 전 스펙, 가격, 가격추이)를 쌓아 두는 추가 전용 보관소
+
+    snapshots.dat에는 zlib으로 압축한 JSON 레코드를 이어 붙이고, snapshots.idx에는 (pcode, 위치, 길이,
+    수집 시각) 고정 길이 레코드를 붙인다. 같은 pcode가 여러 번 들어오면 나중 것이 최신이다.
+    정규화 규칙이 바뀌면 reparse_archive로 네트워크 없이 다시 만든다.
+    """
+
+    def __init__(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._data = open(os.path.join(directory, SNAPSHOT_DATA_FILE), "ab")
+        self._index = open(os.path.join(directory, SNAPSHOT_INDEX_FILE), "ab")
+        self._lock = threading.Lock()
+        self.appended = 0
+
+    def append(self, detail: Dict[str, Any], category_url: str = "") -> None:
+        pcode = extract_pcode(detail.get("url", ""))
+        if not pcode:
+            return
+        record = {**detail, "category": category_url}
+        payload = zlib.compress(json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            offset = self._data.seek(0, os.SEEK_END)
+            self._data.write(payload)
+            self._data.flush()
+            self._index.write(SNAPSHOT_INDEX_RECORD.pack(int(pcode), offset, len(payload), time.time()))
+            self._index.flush()
+            self.appended += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+
+def read_snapshot_index(directory: str) -> Dict[int, Tuple[int, int]]:
+    """pcode -> 최신 레코드의 (위치, 길이)"""
+    with open(os.path.join(directory, SNAPSHOT_INDEX_FILE), "rb") as f:
+        raw = f.read()
+    usable = len(raw) - len(raw) % SNAPSHOT_INDEX_RECORD.size
+    latest: Dict[int, Tuple[int, int]] = {}
+    for pcode, offset, length, _ in SNAPSHOT_INDEX_RECORD.iter_unpack(raw[:usable]):
+        latest[pcode] = (offset, length)
+    return latest
+
+
+def _read_snapshots(data_path: str, entries: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+    with open(data_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return [json.loads(zlib.decompress(data[offset:offset + length])) for offset, length in entries]
+
+
+def _reparse_scan(task: Tuple[str, List[Tuple[int, int]]]) -> Tuple[Dict[str, List[str]], bool, bool]:
+    """reparse 1단계(워커): 카테고리별 체크마크 항목, 부분수집 여부, 판매처 목록 여부"""
+    data_path, entries = task
+    checkmarks: Dict[str, List[str]] = {}
+    has_partial = has_malls = False
+    for snapshot in _read_snapshots(data_path, entries):
+        collect_checkmark_items(snapshot["specs"], checkmarks.setdefault(snapshot.get("category", ""), []))
+        has_partial = has_partial or bool(snapshot.get("partial"))
+        has_malls = has_malls or bool(snapshot.get("malls"))
+    return checkmarks, has_partial, has_malls
+
+
+def _reparse_rows(
+    task: Tuple[str, List[Tuple[int, int]], Dict[str, Dict[str, str]]],
+) -> List[Tuple[str, Dict[str, str], List[Tuple[str, str]]]]:
+    """reparse 2단계(워커): 학습한 매핑으로 정규화한 (카테고리, 행, 스펙 쌍)"""
+    data_path, entries, mappings = task
+    rows = []
+    for snapshot in _read_snapshots(data_path, entries):
+        category_url = snapshot.get("category", "")
+        spec_pairs = normalize_spec_pairs(snapshot["specs"], mappings.get(category_url, {}))
+        rows.append((category_url, build_output_row(snapshot), spec_pairs))
+    return rows
+
+
+def reparse_archive(
+    directory: str,
+    output_csv: str,
+    long_format: bool = False,
+    workers: int = 0,
+    chunk_size: int = 2000,
+    sink_options: Optional[Dict[str, Any]] = None,
+) -> int:
+    """보관소의 최신 스냅샷 전부를 다시 정규화해 CSV로 기록 (네트워크 없음), 기록한 행 수 반환
+
+    1단계에서 워커들이 카테고리별 체크마크 항목을 모아 부모가 카테고리마다 매핑을 학습하고, 2단계에서
+    워커들이 정규화한 행을 보관소 순서대로 돌려주면 부모가 기록한다. 카테고리가 둘 이상이면 배치 모드처럼
+    카테고리 열을 붙인다.
+    """
+    latest = read_snapshot_index(directory)
+    entries = sorted(latest.values())
+    data_path = os.path.join(directory, SNAPSHOT_DATA_FILE)
+    chunks = [entries[i:i + chunk_size] for i in range(0, len(entries), chunk_size)]
+    workers = workers or os.cpu_count() or 1
+    log.info(f"\n=== 재파싱: 상품 {len(entries)}개, 워커 {workers}개: {directory} ===\n")
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        checkmarks: Dict[str, List[str]] = {}
+        has_partial = has_malls = False
+        for chunk_checkmarks, chunk_partial, chunk_malls in pool.imap(
+            _reparse_scan, [(data_path, chunk) for chunk in chunks]
+        ):
+            has_partial = has_partial or chunk_partial
+            has_malls = has_malls or chunk_malls
+            for category_url, items in chunk_checkmarks.items():
+                merged = checkmarks.setdefault(category_url, [])
+                merged.extend(item for item in items if item not in merged)
+        mappings = {category_url: analyze_and_create_mapping(items) for category_url, items in checkmarks.items()}
+
+        combined = len(checkmarks) > 1
+        fieldnames = WIDE_FORMAT_FIELDNAMES + (["판매처"] if has_malls else []) + (["부분수집"] if has_partial else [])
+        if combined:
+            fieldnames = ["카테고리"] + fieldnames
+        sink = CsvRowSink(output_csv, long_format=long_format, fieldnames=fieldnames, **(sink_options or {}))
+        written = 0
+        try:
+            for rows in pool.imap(_reparse_rows, [(data_path, chunk, mappings) for chunk in chunks]):
+                for category_url, row, spec_pairs in rows:
+                    if combined:
+                        row["카테고리"] = category_url
+                    sink.write(row, spec_pairs)
+                    written += 1
+        finally:
+            sink.close()
+    log.info(f"\n[재파싱 완료] {written}행, {time.perf_counter() - started:.1f}초: {output_csv}")
+    return written
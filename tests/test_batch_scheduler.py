@@ -0,0 +1,117 @@
+import contextlib
+import threading
+import types
+
+import pytest
+
+from danawa_crawler import scheduler
+from danawa_crawler.core import CircuitBreaker, RateLimiter, RetryQueue
+from danawa_crawler.scheduler import BatchCategory, BatchScheduler
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=112758"
+
+
+def product_url(page_number, rank):
+    return f"https://prod.danawa.com/info/?pcode={page_number}{rank}"
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+
+class FakeSession:
+    def __init__(self):
+        self.context = types.SimpleNamespace(browser=FakeBrowser())
+
+    def product_done(self):
+        return False
+
+    def close(self):
+        self.context.browser.connected = False
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    state = types.SimpleNamespace(launches=0, launch_failures=0, crash_on=set(), fetched=[], lock=threading.Lock())
+
+    def browser_session(playwright, **kwargs):
+        with state.lock:
+            state.launches += 1
+            if state.launches <= state.launch_failures:
+                raise RuntimeError("launch failed")
+        return FakeSession()
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, move_page=True):
+        return [product_url(page_number, rank) for rank in range(3)]
+
+    def fetch_product_detail(context, link, base_delay_ms, deadline_s=None, extract=None):
+        with state.lock:
+            if link in state.crash_on:
+                # 이 상품을 여는 중에 브라우저가 죽음 — 한 번만
+                state.crash_on.discard(link)
+                context.browser.connected = False
+                raise RuntimeError("Target closed")
+            state.fetched.append(link)
+        return {"url": link, "title": link[-2:], "specs": {}, "min_price": 1, "max_price": 2, "price_trend": {}, "partial": []}
+
+    monkeypatch.setattr(scheduler, "sync_playwright", lambda: contextlib.nullcontext())
+    monkeypatch.setattr(scheduler, "BrowserSession", browser_session)
+    monkeypatch.setattr(scheduler, "harvest_list_page", harvest_list_page)
+    monkeypatch.setattr(scheduler, "fetch_product_detail", fetch_product_detail)
+    return state
+
+
+def run_batch(tmp_path, workers):
+    breaker = CircuitBreaker()
+    retry_queue = RetryQueue(max_attempts=3, base_delay_s=0.01)
+    category = BatchCategory(0, CATEGORY_URL, 2, None, None, "out.csv")
+    batch = BatchScheduler(
+        [category], workers, True, 0, RateLimiter(0), str(tmp_path), "unused.csv",
+        retry_queue=retry_queue, breaker=breaker,
+    )
+    thread = threading.Thread(target=batch.run, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    return batch, category
+
+
+def test_worker_without_browser_leaves_the_work_to_the_others(tmp_path, browsers):
+    browsers.launch_failures = 1
+    batch, category = run_batch(tmp_path, workers=2)
+    assert browsers.launches == 2
+    assert (batch.stats["fetched"], batch.stats["failed"], batch.stats["list_failed"]) == (6, 0, 0)
+    assert category.collected == 6
+
+
+def test_crashed_worker_hands_back_only_its_task(tmp_path, browsers):
+    browsers.crash_on = {product_url(1, 1)}
+    batch, category = run_batch(tmp_path, workers=2)
+    assert sorted(browsers.fetched) == sorted(product_url(page, rank) for page in (1, 2) for rank in range(3))
+    assert (batch.stats["fetched"], batch.stats["failed"], batch.stats["retried"]) == (6, 0, 0)
+    # 죽은 브라우저의 실패는 재시도 횟수나 차단기 실패로 세지 않음
+    assert batch.retry_queue.attempts == {}
+    assert False not in batch.breaker._results
+
+
+def test_last_worker_fails_the_remaining_tasks_without_retries(tmp_path, browsers):
+    browsers.crash_on = {product_url(1, 0), product_url(1, 1)}
+    batch, category = run_batch(tmp_path, workers=2)
+    assert batch.stats["fetched"] + batch.stats["failed"] == 6
+    assert batch.stats["failed"] >= 1 and batch.stats["retried"] == 0
+    assert batch.retry_queue.attempts == {}
+    every = {product_url(page, rank) for page in (1, 2) for rank in range(3)}
+    assert set(batch.retry_queue.permanent_failures) == every - set(browsers.fetched)
+    assert category.finalized and category.collected == batch.stats["fetched"]
+
+
+def test_remaining_list_pages_fail_when_no_browser_starts(tmp_path, browsers):
+    browsers.launch_failures = 2
+    batch, category = run_batch(tmp_path, workers=2)
+    assert (batch.stats["list_failed"], batch.stats["links"], batch.stats["retried"]) == (2, 0, 0)
+    assert sorted(batch.retry_queue.permanent_failures) == [f"{CATEGORY_URL}#page=1", f"{CATEGORY_URL}#page=2"]
+    assert "list_failures" in batch.incomplete_reasons()
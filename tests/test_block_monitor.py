@@ -0,0 +1,120 @@
+import types
+
+import pytest
+
+from danawa_crawler import crawler, extract
+from danawa_crawler.core import BlockedPageError, CircuitBreaker, RetryQueue, SuspectPageError
+from danawa_crawler.extract import BlockMonitor, ExtractPlan
+
+PLAN = ExtractPlan.parse("specs,title")
+PRODUCT_URL = "https://prod.danawa.com/info/?pcode={}"
+
+
+class FakePage:
+    def __init__(self, url=PRODUCT_URL.format(1), title="상품", markers=(), text=""):
+        self.url = url
+        self.state = {"title": title, "markers": list(markers), "text": text}
+
+    def evaluate(self, script, arg=None):
+        return self.state
+
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0, slept=[])
+    fake.monotonic = lambda: fake.now
+    fake.sleep = fake.slept.append
+    monkeypatch.setattr(extract, "time", fake)
+    return fake
+
+
+def detail(number, specs=True):
+    return {"url": PRODUCT_URL.format(number), "specs": {"CPU": "i5"} if specs else {}, "title": "상품", "partial": []}
+
+
+def check(monitor, item, page=None):
+    try:
+        monitor.check_detail(page or FakePage(), item, PLAN)
+        return "ok"
+    except SuspectPageError:
+        return "held"
+    except BlockedPageError:
+        return "blocked"
+
+
+def test_empty_specs_are_held_once_then_accepted_without_pausing():
+    monitor = BlockMonitor(window=10, empty_ratio=0.6, min_samples=4)
+    assert [check(monitor, detail(number, specs=False)) for number in range(3)] == ["held"] * 3
+    assert [check(monitor, detail(number, specs=False)) for number in range(3)] == ["ok"] * 3
+    assert (monitor.deferred, monitor.trips, monitor.paused_until) == (3, 0, 0.0)
+
+
+def test_block_between_hold_and_retry_holds_again(clock):
+    monitor = BlockMonitor(pause_s=60.0)
+    assert check(monitor, detail(1, specs=False)) == "held"
+    assert check(monitor, detail(2), FakePage(url="https://www.danawa.com/captcha/?return=x")) == "blocked"
+    assert (monitor.trips, monitor.paused_until) == (1, clock.now + 60.0)
+    assert check(monitor, detail(1, specs=False)) == "held"
+    assert check(monitor, detail(1, specs=False)) == "ok"
+
+
+def test_positive_signals_pause(clock):
+    monitor = BlockMonitor(pause_s=10.0)
+    with pytest.raises(BlockedPageError):
+        monitor.check_response(types.SimpleNamespace(status=429, url=PRODUCT_URL.format(1)))
+    # 멈춘 동안의 두 번째 신호는 멈춤을 늘리지 않음
+    assert check(monitor, detail(1, specs=False), FakePage(title="접근이 제한되었습니다")) == "blocked"
+    assert monitor.trips == 1 and monitor.blocks == 2
+    clock.now += 11
+    with pytest.raises(BlockedPageError):
+        monitor.check_response(types.SimpleNamespace(status=200, url="https://x.danawa.com/blocked.html"))
+    assert monitor.trips == 2 and monitor.paused_until == clock.now + 20.0
+    monitor.wait()
+    assert clock.slept[0] == 20.0
+
+
+def test_category_without_specs_stops_holding():
+    monitor = BlockMonitor(window=10, empty_ratio=0.6, min_samples=3)
+    for number in range(3):
+        check(monitor, detail(number, specs=False))
+    assert [check(monitor, detail(number, specs=False)) for number in range(3)] == ["ok"] * 3
+    assert [check(monitor, detail(number, specs=False)) for number in range(10, 13)] == ["ok"] * 3
+
+
+def test_no_hold_without_retries():
+    monitor = BlockMonitor(defer_empty=False)
+    assert check(monitor, detail(1, specs=False)) == "ok"
+
+
+def test_held_product_spends_one_attempt_but_no_breaker_failure(monkeypatch):
+    monitor = BlockMonitor()
+    link = PRODUCT_URL.format(7)
+
+    def fetch_product_detail(context, url, base_delay_ms, deadline_s=None, extract=None):
+        item = detail(7, specs=False)
+        monitor.check_detail(FakePage(url), item, PLAN)
+        return item
+
+    def fan_out_list_pages(category_url, pages, harvest, **kwargs):
+        yield 1, [link]
+        yield 2, []
+
+    rows = []
+    sink = types.SimpleNamespace(write=lambda row, spec_pairs: rows.append(row["URL"]))
+    monkeypatch.setattr(crawler, "fetch_product_detail", fetch_product_detail)
+    monkeypatch.setattr(crawler, "fan_out_list_pages", fan_out_list_pages)
+    monkeypatch.setattr(crawler, "human_delay", lambda ms: None)
+    retry_queue = RetryQueue(max_attempts=2, base_delay_s=0.0)
+    breaker = CircuitBreaker()
+    events = []
+
+    collected = crawler.crawl_detail_pass(
+        None, "https://prod.danawa.com/list/?cate=1", 2, None, None, 0, {}, sink,
+        progress=events.append, retry_queue=retry_queue, breaker=breaker,
+    )
+
+    assert (collected, rows) == (1, [link])
+    assert (retry_queue.attempts, retry_queue.permanent_failures) == ({link: 1}, {})
+    assert list(breaker._results) == [True]
+    assert [event["attempt"] for event in events if event["event"] == "error"] == [1]
+    assert events[-1]["incomplete"] == []
@@ -0,0 +1,104 @@
+import types
+
+import pytest
+
+from danawa_crawler import browser, crawler
+from danawa_crawler.browser import BrowserSession
+
+MB = 1024 * 1024
+PRODUCT_URL = "https://prod.danawa.com/info/?pcode={}"
+
+
+class FakeBrowser:
+    def __init__(self, fail_close=False):
+        self.closed = False
+        self.fail_close = fail_close
+
+    def close(self):
+        if self.fail_close:
+            raise RuntimeError("browser already gone")
+        self.closed = True
+
+
+class FakeMonitor:
+    def __init__(self, browser_mb=None):
+        self.browser_mb = browser_mb
+
+    def sample(self):
+        return 10 * MB, self.browser_mb * MB if self.browser_mb is not None else None
+
+    def summary(self):
+        return {"peak_python_mb": 10.0, "peak_browser_mb": float(self.browser_mb or 0)}
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    contexts = []
+
+    def open_new_context(playwright, headless, profile="default"):
+        contexts.append(types.SimpleNamespace(browser=FakeBrowser(), headless=headless, profile=profile))
+        return contexts[-1]
+
+    monkeypatch.setattr(browser, "open_new_context", open_new_context)
+    return contexts
+
+
+def test_recycles_after_every_n_products(opened):
+    session = BrowserSession(None, headless=True, profile="nojs", recycle_every=2, monitor=FakeMonitor())
+    assert [session.product_done() for _ in range(5)] == [False, True, False, True, False]
+    assert (session.recycles, session.products, len(opened)) == (2, 1, 3)
+    assert opened[0].browser.closed and opened[1].browser.closed and not opened[2].browser.closed
+    # 새 브라우저도 같은 프로필로 띄움
+    assert session.context is opened[2] and opened[2].profile == "nojs"
+
+
+def test_recycles_when_browser_memory_grows(opened):
+    monitor = FakeMonitor(browser_mb=300)
+    session = BrowserSession(None, headless=True, max_browser_mb=500, monitor=monitor)
+    assert not session.product_done()
+    monitor.browser_mb = 700
+    assert session.product_done() and session.recycles == 1
+    # RSS를 못 재는 환경에서는 메모리 기준으로 재시작하지 않음
+    monitor.browser_mb = None
+    assert not session.product_done()
+
+
+def test_no_limits_never_recycle(opened):
+    session = BrowserSession(None, headless=True, monitor=FakeMonitor(browser_mb=10_000))
+    assert not any(session.product_done() for _ in range(50))
+    assert len(opened) == 1
+
+
+def test_dead_browser_is_still_replaced(opened):
+    session = BrowserSession(None, headless=True, recycle_every=1, monitor=FakeMonitor())
+    opened[0].browser.fail_close = True
+    assert session.product_done() and session.context is opened[1]
+
+
+def test_detail_pass_continues_on_the_new_context(opened, monkeypatch):
+    links = [PRODUCT_URL.format(number) for number in range(3)]
+    used = []
+
+    def fetch_product_detail(context, url, base_delay_ms, deadline_s=None, extract=None):
+        used.append(context)
+        return {"url": url, "specs": {}, "title": "상품", "partial": []}
+
+    def fan_out_list_pages(category_url, pages, harvest, **kwargs):
+        yield 1, links
+        yield 2, []
+
+    monkeypatch.setattr(crawler, "fetch_product_detail", fetch_product_detail)
+    monkeypatch.setattr(crawler, "fan_out_list_pages", fan_out_list_pages)
+    monkeypatch.setattr(crawler, "human_delay", lambda ms: None)
+    session = BrowserSession(None, headless=True, recycle_every=2, monitor=FakeMonitor())
+    sink = types.SimpleNamespace(write=lambda row, spec_pairs: None)
+    events = []
+
+    collected = crawler.crawl_detail_pass(
+        session.context, "https://prod.danawa.com/list/?cate=1", 2, None, None, 0, {}, sink,
+        progress=events.append, session=session,
+    )
+
+    assert collected == 3
+    assert used == [opened[0], opened[0], opened[1]]
+    assert [event["recycles"] for event in events if event["event"] == "recycle"] == [1]
@@ -0,0 +1,89 @@
+import os
+import types
+
+import pytest
+
+from danawa_crawler import daemon
+from danawa_crawler.daemon import CrawlerDaemon, CrawlJob, parse_job_params, resolve_job_output
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=112758"
+
+
+def test_output_is_resolved_inside_the_output_dir(tmp_path):
+    root = os.path.realpath(str(tmp_path))
+    assert resolve_job_output("jobs/out.csv", str(tmp_path)) == os.path.join(root, "jobs", "out.csv")
+
+
+@pytest.mark.parametrize("output", ["/etc/out.csv", "../out.csv", "jobs/../../out.csv", "jobs\\..\\out.csv"])
+def test_output_outside_the_output_dir_is_rejected(tmp_path, output):
+    with pytest.raises(ValueError):
+        resolve_job_output(output, str(tmp_path))
+
+
+def test_output_through_a_symlink_out_of_the_dir_is_rejected(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    root = tmp_path / "root"
+    root.mkdir()
+    os.symlink(str(outside), str(root / "link"))
+    with pytest.raises(ValueError):
+        resolve_job_output("link/out.csv", str(root))
+
+
+@pytest.mark.parametrize("payload", [[1], "x", 3, None])
+def test_non_object_payload_is_rejected(payload):
+    with pytest.raises(ValueError):
+        parse_job_params(payload, 500)
+
+
+def test_numbers_are_coerced_with_defaults(tmp_path):
+    payload = {"category_url": f" {CATEGORY_URL} ", "pages": "0", "items_per_page": "20", "product_deadline_s": "2.5"}
+    params = parse_job_params({**payload, "output": "a.csv"}, 500, str(tmp_path))
+    assert (params["category_url"], params["pages"], params["items_per_page"]) == (CATEGORY_URL, 1, 20)
+    assert (params["max_total_items"], params["delay_ms"], params["product_deadline_s"]) == (None, 500, 2.5)
+    assert params["output"] == os.path.join(os.path.realpath(str(tmp_path)), "a.csv")
+    assert parse_job_params({"category_url": CATEGORY_URL}, 500)["output"] is None
+
+
+@pytest.mark.parametrize("payload", [{}, {"category_url": "  "}, {"category_url": CATEGORY_URL, "pages": "many"}])
+def test_invalid_params_are_rejected(payload):
+    with pytest.raises(ValueError):
+        parse_job_params(payload, 500)
+
+
+def test_job_events_keep_only_the_latest(monkeypatch):
+    monkeypatch.setattr(daemon, "MAX_JOB_EVENTS", 5)
+    job = CrawlJob("job", {})
+    for count in range(8):
+        job.emit({"event": "product", "count": count})
+    job.finish("done")
+    events = list(job.iter_events())
+    assert len(job.events) == 5 and job.emitted == 9
+    assert [event.get("count") for event in events] == [4, 5, 6, 7, None]
+    assert events[-1]["event"] == "done"
+
+
+def test_job_output_is_closed_once_with_the_sink_options(monkeypatch, tmp_path):
+    sinks = []
+
+    class FakeSink:
+        def __init__(self, path, **kwargs):
+            self.kwargs = kwargs
+            self.closed = 0
+            sinks.append(self)
+
+        def close(self):
+            self.closed += 1
+
+    monkeypatch.setattr(daemon, "CsvRowSink", FakeSink)
+    monkeypatch.setattr(daemon, "crawl_detail_pass", lambda context, **kwargs: 3)
+    crawler = CrawlerDaemon(
+        headless=True, base_delay_ms=0, output_dir=str(tmp_path), sink_options={"compression": "gzip", "rotate_rows": 10}
+    )
+    crawler.mapping_cache[CATEGORY_URL] = {}
+    job = CrawlJob("job", parse_job_params({"category_url": CATEGORY_URL, "output": "out/a.csv"}, 0, str(tmp_path)))
+    crawler._run_job(types.SimpleNamespace(context=None), job)
+
+    assert (job.status, job.collected) == ("done", 3)
+    assert sinks[0].closed == 1
+    assert (sinks[0].kwargs["compression"], sinks[0].kwargs["rotate_rows"]) == ("gzip", 10)
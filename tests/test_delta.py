@@ -0,0 +1,83 @@
+import csv
+
+import pytest
+
+from danawa_crawler.storage import DeltaTracker
+
+
+def product(pcode, title="상품", min_price="1000", specs=(("CPU", "i5"),)):
+    row = {
+        "상품명": title,
+        "URL": f"https://prod.danawa.com/info/?pcode={pcode}",
+        "최저가": min_price,
+        "최고가": min_price,
+        "가격추이": "",
+    }
+    return row, list(specs)
+
+
+def run(tmp_path, name, products, partial_reason=None):
+    tracker = DeltaTracker(str(tmp_path / "delta.state"), str(tmp_path / f"{name}.csv"))
+    for row, spec_pairs in products:
+        tracker.observe(row, spec_pairs)
+    if partial_reason:
+        tracker.mark_partial(partial_reason)
+    stats = tracker.close()
+    with open(tmp_path / f"{name}.csv", encoding="utf-8-sig", newline="") as f:
+        rows = {(row["변경구분"], row["URL"].rsplit("=", 1)[-1]): row for row in csv.DictReader(f)}
+    return stats, rows
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    stats, rows = run(tmp_path, "first", [product(3), product(1), product(2)])
+    assert stats["added"] == 3 and set(rows) == {("added", "1"), ("added", "2"), ("added", "3")}
+    return tmp_path
+
+
+def test_delta_reports_added_changed_and_removed(baseline):
+    stats, rows = run(baseline, "second", [
+        product(1),
+        product(2, min_price="900"),
+        product(4),
+        product(5, title="새 상품", specs=(("색상", "블랙"),)),
+    ])
+    assert {key: stats[key] for key in ("added", "changed", "removed", "unchanged")} == {
+        "added": 2, "changed": 1, "removed": 1, "unchanged": 1,
+    }
+    assert set(rows) == {("changed", "2"), ("added", "4"), ("added", "5"), ("removed", "3")}
+    assert rows[("changed", "2")]["변경필드"] == "가격"
+    assert rows[("added", "5")]["상세정보"] == "색상:블랙"
+
+
+def test_delta_detects_spec_and_title_changes(baseline):
+    _, rows = run(baseline, "second", [product(1, title="바뀐 이름"), product(2, specs=(("CPU", "i7"),)), product(3)])
+    assert rows[("changed", "1")]["변경필드"] == "상품명"
+    assert rows[("changed", "2")]["변경필드"] == "상세정보"
+
+
+def test_partial_run_keeps_unseen_products_in_state(baseline):
+    stats, rows = run(baseline, "partial", [product(2, min_price="900"), product(4)], partial_reason="max_total_items")
+    assert (stats["removed"], stats["carried"]) == (0, 2)
+    assert set(rows) == {("changed", "2"), ("added", "4")}
+
+    # 다음 전체 실행은 부분 실행에서 못 본 1, 3도 이전 상태로 알고 있어야 함
+    stats, rows = run(baseline, "full", [product(1), product(2, min_price="900"), product(4)])
+    assert (stats["unchanged"], stats["added"], stats["removed"]) == (3, 0, 1)
+    assert set(rows) == {("removed", "3")}
+
+
+def test_progress_summary_marks_the_run_partial(tmp_path):
+    tracker = DeltaTracker(str(tmp_path / "delta.state"), str(tmp_path / "delta.csv"))
+    tracker.observe_progress({"event": "product", "count": 1})
+    tracker.observe_progress({"event": "summary", "incomplete": ["pages", "failures"]})
+    tracker.observe_progress({"event": "summary", "incomplete": ["pages"]})
+    assert tracker.partial_reasons == ["pages", "failures"]
+    tracker.close()
+
+
+def test_rows_without_pcode_are_counted_not_tracked(tmp_path):
+    tracker = DeltaTracker(str(tmp_path / "delta.state"), str(tmp_path / "delta.csv"))
+    tracker.observe({"URL": "https://example.com/no-pcode"}, [])
+    stats = tracker.close()
+    assert (stats["unkeyed"], stats["added"]) == (1, 0)
@@ -0,0 +1,112 @@
+import types
+
+import pytest
+
+from danawa_crawler import extract
+from danawa_crawler.extract import DETAIL_TAB_LABELS, DetailFragmentCache, load_detail_specs, SelectorMemory
+
+PRODUCT_URL = "https://prod.danawa.com/info/?pcode={}"
+SPEC_HTML = "<table>" + "<tr><th>항목</th><td>값</td></tr>" * 3 + "</table>"
+
+
+class FakeResponse:
+    def __init__(self, pcode, body=SPEC_HTML, ok=True):
+        self.request = types.SimpleNamespace(
+            url=f"https://prod.danawa.com/info/ajax/getProductDescription.ajax.php?pcode={pcode}",
+            method="GET",
+            post_data=None,
+            headers={},
+            resource_type="xhr",
+        )
+        self.body = body
+        self.ok = ok
+
+    def text(self):
+        return self.body
+
+
+class FakePage:
+    def __init__(self, pcode, rows=0, tab=DETAIL_TAB_LABELS[0], fetched_body=SPEC_HTML):
+        self.pcode = pcode
+        self.rows = rows
+        self.tab = tab
+        self.listeners = []
+        self.injected = []
+        self.fetched = []
+        self.clicks = 0
+
+        def fetch(url, **kwargs):
+            self.fetched.append(url)
+            return FakeResponse(pcode, fetched_body)
+
+        self.context = types.SimpleNamespace(request=types.SimpleNamespace(fetch=fetch))
+
+    def evaluate(self, script, arg=None):
+        if script == extract.SPEC_ROWS_JS:
+            return self.rows
+        if script == extract.CLICK_DETAIL_TAB_JS:
+            self.clicks += 1
+            clicked = self.tab if self.tab in arg else None
+            if clicked:
+                for listener in self.listeners:
+                    listener(FakeResponse(self.pcode))
+            return clicked
+        if script == extract.INJECT_DETAIL_FRAGMENT_JS:
+            self.injected.append(arg)
+            return None
+        raise AssertionError(script[:40])
+
+    def on(self, event, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, event, listener):
+        self.listeners.remove(listener)
+
+
+@pytest.fixture(autouse=True)
+def memory(monkeypatch):
+    fresh = SelectorMemory()
+    monkeypatch.setattr(extract, "selector_memory", fresh)
+    monkeypatch.setattr(extract, "wait_for_network_idle", lambda page, timeout_ms=3000: None)
+    return fresh
+
+
+def test_specs_already_in_the_dom_skip_the_tab():
+    cache = DetailFragmentCache()
+    page = FakePage("1", rows=5)
+    assert load_detail_specs(page, PRODUCT_URL.format(1), cache=cache) == "dom"
+    assert page.clicks == 0 and cache.sources["dom"] == 1
+
+
+def test_tab_click_teaches_the_fragment_request():
+    cache = DetailFragmentCache()
+    first = FakePage("1")
+    assert load_detail_specs(first, PRODUCT_URL.format(1), cache=cache) == "tab"
+    assert cache.template["url"].endswith("pcode={pcode}") and first.listeners == []
+
+    second = FakePage("2")
+    assert load_detail_specs(second, PRODUCT_URL.format(2), cache=cache) == "fragment"
+    assert second.clicks == 0 and second.injected == [SPEC_HTML]
+    assert second.fetched[0].endswith("pcode=2")
+    assert (cache.sources["tab"], cache.sources["fragment"]) == (1, 1)
+
+
+def test_failing_fragment_requests_fall_back_to_clicking():
+    cache = DetailFragmentCache()
+    load_detail_specs(FakePage("1"), PRODUCT_URL.format(1), cache=cache)
+    for number in range(2, 2 + DetailFragmentCache.MAX_FETCH_FAILURES):
+        page = FakePage(str(number), fetched_body="<html>점검 중</html>")
+        assert load_detail_specs(page, PRODUCT_URL.format(number), cache=cache) == "tab"
+        assert len(page.fetched) == 1 and page.clicks == 1
+    # 연속 실패로 버린 템플릿은 같은 페이지의 탭 클릭에서 다시 익힘
+    assert (cache.fetch_failures, cache.learn_attempts) == (0, 1)
+    assert cache.template["url"].endswith("pcode={pcode}")
+
+
+def test_tab_clicks_are_label_first_and_remembered(memory):
+    page = FakePage("1", tab=DETAIL_TAB_LABELS[1])
+    assert extract.click_detail_tab_if_present(page)
+    state = memory._state("detail", "tab_label")
+    assert state == {"good": DETAIL_TAB_LABELS[1], "misses": {DETAIL_TAB_LABELS[0]: 1, DETAIL_TAB_LABELS[1]: 0}}
+
+    assert not extract.click_detail_tab_if_present(FakePage("2", tab=None))
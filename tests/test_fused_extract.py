@@ -0,0 +1,84 @@
+import pytest
+
+from danawa_crawler import extract
+from danawa_crawler.core import Deadline
+from danawa_crawler.extract import ExtractPlan, SelectorMemory
+
+PRODUCT_URL = "https://prod.danawa.com/info/?pcode=1"
+
+
+def payload(**overrides):
+    base = {
+        "title": "노트북",
+        "specRows": [[[" CPU "], ["i7 (13세대)"]], [["색상"], ["○", "블랙", "화이트"]]],
+        "prices": {"match": [0, 1], "numAttempt": 0, "items": [["A몰", "12,000원", 0], ["B몰", "11,500", 1], ["C몰", "품절", 0]]},
+        "priceInputs": ["9,000", None],
+        "trend": {"points": [["1", [{"label": "24.01.01", "value": 100}, {"label": "24.02.01", "value": 90}]]], "cut": True},
+    }
+    return {**base, **overrides}
+
+
+class FakePage:
+    def __init__(self, result):
+        self.result = result
+        self.options = None
+        self.calls = 0
+
+    def evaluate(self, script, arg=None):
+        assert script == extract.FUSED_EXTRACT_CALL_JS
+        self.calls += 1
+        self.options = arg
+        return self.result
+
+    def title(self):
+        return "페이지 제목"
+
+
+@pytest.fixture(autouse=True)
+def memory(monkeypatch):
+    fresh = SelectorMemory()
+    monkeypatch.setattr(extract, "selector_memory", fresh)
+    monkeypatch.setattr(extract, "load_detail_specs", lambda page, link, deadline=None: None)
+    return fresh
+
+
+def test_one_evaluate_fills_every_extractor():
+    page = FakePage(payload())
+    deadline = Deadline(None)
+    detail = ExtractPlan.parse("all", "3,1").run(page, PRODUCT_URL, deadline)
+
+    assert page.calls == 1
+    assert page.options["trend"]["periods"] == ["1", "3"]
+    assert (page.options["title"], page.options["specs"]) == (True, True)
+    assert detail["title"] == "노트북"
+    assert detail["specs"] == {"CPU": "i7", "색상": "블랙,화이트,○"}
+    assert (detail["min_price"], detail["max_price"]) == (11500, 12000)
+    assert detail["malls"] == [("A몰", 12000), ("B몰", 11500)]
+    assert detail["price_trend"] == {"1": [{"label": "24.01.01", "price": 100}, {"label": "24.02.01", "price": 90}]}
+    assert deadline.cut_stages == ["trend"]
+
+
+def test_price_falls_back_to_hidden_inputs():
+    page = FakePage(payload(prices={"match": None, "numAttempt": 0, "items": []}))
+    detail = ExtractPlan.parse("price").run(page, PRODUCT_URL, Deadline(None))
+    assert (detail["min_price"], detail["max_price"]) == (9000, 9000)
+    assert "trend" not in page.options and page.options["specs"] is False
+    # 끈 추출기는 빈 값으로 채움
+    assert (detail["title"], detail["specs"], detail["price_trend"]) == ("", {}, {})
+
+
+def test_price_selector_hits_are_remembered(memory):
+    ExtractPlan.parse("price").run(FakePage(payload()), PRODUCT_URL, Deadline(None))
+    assert memory._state("detail", "price_list")["good"] == "ul.list_mall-price li.list-item"
+    assert memory._state("detail", "price_num")["good"] == ".text__num"
+
+
+def test_missing_script_falls_back_to_each_extractor():
+    page = FakePage(None)
+    assert ExtractPlan.parse("title").run(page, PRODUCT_URL, Deadline(None))["title"] == "페이지 제목"
+    assert page.calls == 1
+
+
+def test_fused_can_be_turned_off():
+    assert ExtractPlan.parse("title").fused
+    assert not ExtractPlan.parse("all", None, False).fused
@@ -0,0 +1,234 @@
+import contextlib
+import threading
+import time
+import types
+
+import pytest
+
+from danawa_crawler import listing
+from danawa_crawler.core import RateLimiter
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=112758"
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, name):
+        self.name = name
+        self.browser = FakeBrowser()
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    state = types.SimpleNamespace(launches=0, launch_failures=0, contexts=[], sleeps=[], lock=threading.Lock())
+
+    def open_new_context(playwright, headless, profile):
+        with state.lock:
+            state.launches += 1
+            if state.launches <= state.launch_failures:
+                raise RuntimeError("launch failed")
+            context = FakeContext(f"browser-{state.launches}")
+            state.contexts.append(context)
+        return context
+
+    monkeypatch.setattr(listing, "sync_playwright", contextlib.nullcontext)
+    monkeypatch.setattr(listing, "open_new_context", open_new_context)
+    monkeypatch.setattr(listing, "time", types.SimpleNamespace(sleep=state.sleeps.append))
+    return state
+
+
+def fan_out(pages, workers, **kwargs):
+    return list(listing.fan_out_list_pages(CATEGORY_URL, pages, None, True, workers, RateLimiter(0), **kwargs))
+
+
+def test_pages_are_yielded_in_page_order(monkeypatch, browsers):
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        # 앞 페이지일수록 늦게 끝나도록 해서 도착 순서를 뒤집음
+        time.sleep(0.002 * (6 - page_number))
+        return [f"{page_number}-a", f"{page_number}-b"]
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    results = fan_out(6, workers=3)
+    assert [page_number for page_number, _ in results] == [1, 2, 3, 4, 5, 6]
+    assert results[3] == (4, ["4-a", "4-b"])
+    assert len(browsers.contexts) == 3 and all(context.browser.closed for context in browsers.contexts)
+
+
+def test_pages_after_the_first_empty_page_are_not_opened(monkeypatch, browsers):
+    opened = []
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        opened.append(page_number)
+        return [] if page_number == 3 else [page_number]
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    assert fan_out(5, workers=1) == [(1, [1]), (2, [2]), (3, []), (4, []), (5, [])]
+    assert opened == [1, 2, 3]
+
+
+def test_failed_pages_back_off_and_then_yield_none(monkeypatch, browsers):
+    failures = {2: 2, 4: 10}
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        if failures.get(page_number, 0) > 0:
+            failures[page_number] -= 1
+            raise RuntimeError("timeout")
+        return [page_number]
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    results = fan_out(5, workers=1, max_attempts=3, retry_backoff_s=1.0)
+    # 2페이지는 두 번 실패 뒤 성공, 4페이지는 최종 실패지만 빈 페이지로 보지 않고 5페이지를 계속 염
+    assert results == [(1, [1]), (2, [2]), (3, [3]), (4, None), (5, [5])]
+    assert sorted(browsers.sleeps) == [1.0, 1.0, 2.0, 2.0]
+
+
+def test_dead_browser_hands_remaining_pages_to_other_workers(monkeypatch, browsers):
+    browsers.launch_failures = 1
+    crashed = []
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        if page_number == 2 and not crashed:
+            crashed.append(context.name)
+            context.browser.connected = False
+            raise RuntimeError("Target closed")
+        time.sleep(0.001)
+        return [page_number]
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    results = fan_out(8, workers=3)
+    # 브라우저를 못 띄운 워커와 죽은 워커는 빠지고, 죽을 때 들고 있던 2페이지만 실패로 남음
+    assert results == [(page_number, None if page_number == 2 else [page_number]) for page_number in range(1, 9)]
+    assert browsers.launches == 3 and browsers.sleeps == []
+
+
+def test_remaining_pages_fail_when_every_worker_is_gone(monkeypatch, browsers):
+    browsers.launch_failures = 2
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        context.browser.connected = False
+        raise RuntimeError("Target closed")
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    assert fan_out(4, workers=2) == [(1, None), (2, None), (3, None), (4, None)]
+
+
+class FakeLocator:
+    def __init__(self, page):
+        self.page = page
+        self.first = self
+
+    def count(self):
+        return 1
+
+    def inner_text(self):
+        return str(self.page.shown)
+
+
+class FakePage:
+    def __init__(self, honours_page_param):
+        self.honours_page_param = honours_page_param
+        self.visited = []
+        self.shown = None
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def goto(self, url):
+        self.visited.append(url)
+        self.shown = int(url.rsplit("page=", 1)[1]) if self.honours_page_param and "page=" in url else 1
+
+    def locator(self, selector):
+        return FakeLocator(self)
+
+    def close(self):
+        pass
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+
+    def acquire(self):
+        self.acquired += 1
+
+
+@pytest.fixture
+def list_page(monkeypatch):
+    moves = []
+    monkeypatch.setattr(listing, "wait_for_network_idle", lambda page: None)
+    monkeypatch.setattr(listing, "slow_scroll", lambda page: None)
+
+    def paginate_category(page, current_url, page_num):
+        moves.append(page_num)
+        page.shown = page_num
+        return True
+
+    monkeypatch.setattr(listing, "paginate_category", paginate_category)
+
+    def harvest(honours_page_param, page_number):
+        page = FakePage(honours_page_param)
+        limiter = CountingLimiter()
+        context = types.SimpleNamespace(new_page=lambda: page)
+        items = listing.harvest_list_page(
+            context, CATEGORY_URL, page_number, None, rate_limiter=limiter, harvest=lambda p: [p.shown]
+        )
+        return items, page.visited, limiter.acquired, moves
+
+    return harvest
+
+
+def test_list_page_url_sets_only_the_page_parameter():
+    assert listing.list_page_url(CATEGORY_URL, 1) == CATEGORY_URL
+    assert listing.list_page_url(CATEGORY_URL + "&page=2&x=", 3) == CATEGORY_URL + "&x=&page=3"
+
+
+def test_page_is_loaded_once_by_url(list_page):
+    items, visited, acquired, moves = list_page(True, 4)
+    assert (items, visited, acquired, moves) == ([4], [CATEGORY_URL + "&page=4"], 1, [])
+
+
+def test_move_page_is_used_only_when_the_url_parameter_is_ignored(list_page):
+    items, visited, acquired, moves = list_page(False, 4)
+    assert (items, len(visited), acquired, moves) == ([4], 1, 2, [4])
+
+
+def test_nojs_profile_does_not_harvest_page_one_again(list_page, monkeypatch):
+    with pytest.raises(RuntimeError):
+        listing.harvest_list_page(
+            types.SimpleNamespace(new_page=lambda: FakePage(False)),
+            CATEGORY_URL,
+            3,
+            None,
+            harvest=lambda p: [p.shown],
+            move_page=False,
+        )
+    # 주소로 열린 페이지가 N페이지로 확인되면 JS 없이도 그대로 모음
+    page = FakePage(True)
+    items = listing.harvest_list_page(
+        types.SimpleNamespace(new_page=lambda: page), CATEGORY_URL, 3, None, harvest=lambda p: [p.shown], move_page=False
+    )
+    assert items == [3]
+
+
+def test_fan_out_never_uses_move_page_under_nojs(monkeypatch, browsers):
+    calls = []
+
+    def harvest_list_page(context, category_url, page_number, items_per_page, rate_limiter=None, harvest=None, move_page=True):
+        calls.append(move_page)
+        return [page_number]
+
+    monkeypatch.setattr(listing, "harvest_list_page", harvest_list_page)
+    fan_out(2, workers=1, launch_profile="nojs")
+    fan_out(2, workers=1, launch_profile="lean")
+    assert calls == [False, False, True, True]
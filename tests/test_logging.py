@@ -0,0 +1,74 @@
+import json
+import logging
+import threading
+import time
+
+import pytest
+
+from danawa_crawler.core import ProductLogContext, log, setup_logging
+
+PRODUCT_URL = "https://prod.danawa.com/info/?pcode={}"
+
+
+@pytest.fixture
+def restore_logger():
+    saved = (list(log.handlers), log.level, log.propagate)
+    yield
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    for handler in saved[0]:
+        log.addHandler(handler)
+    log.setLevel(saved[1])
+    log.propagate = saved[2]
+
+
+def read_lines(path, count):
+    # 쓰기는 백그라운드 리스너 스레드가 하므로 줄이 다 쌓일 때까지 잠깐 기다림
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+        if len(lines) >= count:
+            return [json.loads(line) for line in lines]
+        time.sleep(0.01)
+    raise AssertionError(f"{count}줄을 기다렸지만 {len(lines)}줄만 쓰였습니다")
+
+
+def test_json_lines_carry_the_product_context_of_each_thread(tmp_path, restore_logger):
+    path = tmp_path / "crawl.log"
+    setup_logging("info", json_format=True, log_file=str(path))
+
+    def work(number):
+        with ProductLogContext(PRODUCT_URL.format(number)) as context:
+            log.info("  상품 %s 수집", number, extra={"data": {"event": "product"}})
+            contexts[number] = context.cid
+
+    contexts = {}
+    threads = [threading.Thread(target=work, args=(number,)) for number in (1, 2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.info("끝")
+
+    entries = read_lines(path, 3)
+    by_msg = {entry["msg"]: entry for entry in entries}
+    for number in (1, 2):
+        entry = by_msg[f"상품 {number} 수집"]
+        assert (entry["pcode"], entry["cid"], entry["event"]) == (str(number), contexts[number], "product")
+        assert entry["level"] == "info"
+    assert "pcode" not in by_msg["끝"]
+    assert contexts[1] != contexts[2] and contexts[1].startswith("1-")
+
+
+def test_debug_records_are_dropped_at_info_level(tmp_path, restore_logger):
+    path = tmp_path / "crawl.log"
+    setup_logging("info", json_format=True, log_file=str(path))
+    log.debug("페이지 이동 시도")
+    log.warning("경고")
+    assert [entry["msg"] for entry in read_lines(path, 1)] == ["경고"]
+    assert not log.propagate and log.level == logging.INFO
+
+
+def test_context_without_link_is_a_no_op():
+    with ProductLogContext(None) as context:
+        assert (context.pcode, context.cid) == (None, None)
@@ -0,0 +1,87 @@
+import csv
+import hashlib
+import json
+import os
+
+import pytest
+
+from danawa_crawler.storage import (
+    CsvRowSink,
+    open_output_text,
+    output_chunk_paths,
+    output_manifest_path,
+)
+
+FIELDNAMES = ["상품명", "URL", "상세정보"]
+
+
+def row(number):
+    return {"상품명": f"상품{number}", "URL": f"https://prod.danawa.com/info/?pcode={number}", "최저가": "1000"}
+
+
+def read_rows(output_csv):
+    rows = []
+    for path in output_chunk_paths(output_csv):
+        with open_output_text(path) as f:
+            rows.extend(csv.DictReader(f))
+    return rows
+
+
+def test_plain_output_has_no_manifest(tmp_path):
+    output_csv = str(tmp_path / "out.csv")
+    sink = CsvRowSink(output_csv, fieldnames=FIELDNAMES)
+    sink.write(row(1), [("CPU", "i5"), ("램", "16GB")])
+    sink.close()
+    sink.close()
+    assert not os.path.exists(output_manifest_path(output_csv))
+    assert read_rows(output_csv) == [{"상품명": "상품1", "URL": row(1)["URL"], "상세정보": "CPU:i5/램:16GB"}]
+
+
+def test_gzip_rotation_writes_chunks_and_manifest(tmp_path):
+    output_csv = str(tmp_path / "out.csv")
+    sink = CsvRowSink(output_csv, fieldnames=FIELDNAMES, compression="gzip", rotate_rows=2)
+    for number in range(5):
+        sink.write(row(number), [])
+    sink.close()
+
+    with open(output_manifest_path(output_csv), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert [chunk["file"] for chunk in manifest["chunks"]] == [
+        "out.part0001.csv.gz", "out.part0002.csv.gz", "out.part0003.csv.gz",
+    ]
+    assert [chunk["rows"] for chunk in manifest["chunks"]] == [2, 2, 1]
+    assert (manifest["rows"], manifest["compression"], manifest["fieldnames"]) == (5, "gzip", FIELDNAMES)
+    for chunk in manifest["chunks"]:
+        with open(tmp_path / chunk["file"], "rb") as f:
+            data = f.read()
+        assert (len(data), hashlib.sha256(data).hexdigest()) == (chunk["bytes"], chunk["sha256"])
+
+    assert [item["상품명"] for item in read_rows(output_csv)] == [f"상품{number}" for number in range(5)]
+
+
+def test_size_rotation(tmp_path):
+    output_csv = str(tmp_path / "out.csv")
+    sink = CsvRowSink(output_csv, fieldnames=FIELDNAMES, rotate_mb=200 / (1024 * 1024))
+    for number in range(6):
+        sink.write(row(number), [("설명", "x" * 100)])
+    sink.close()
+    with open(output_manifest_path(output_csv), encoding="utf-8") as f:
+        chunks = json.load(f)["chunks"]
+    assert len(chunks) > 1 and all(chunk["file"].endswith(".csv") for chunk in chunks)
+    assert sum(chunk["rows"] for chunk in chunks) == 6
+    assert len(read_rows(output_csv)) == 6
+
+
+def test_zstd_long_format(tmp_path):
+    pytest.importorskip("zstandard")
+    output_csv = str(tmp_path / "out.csv")
+    sink = CsvRowSink(output_csv, long_format=True, compression="zstd")
+    sink.write({**row(1), "부분수집": "trend"}, [("CPU", "i5")])
+    sink.close()
+    assert output_chunk_paths(output_csv) == [output_csv + ".zst"]
+    assert [(item["key"], item["value"]) for item in read_rows(output_csv)] == [("CPU", "i5"), ("부분수집", "trend")]
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CsvRowSink(str(tmp_path / "out.csv"), compression="brotli")
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from danawa_crawler.storage import BloomFilter, PcodeStore, SeenProducts
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter.for_capacity(1000)
+    values = list(range(10_000, 11_000))
+    for value in values:
+        bloom.add(value)
+    assert all(bloom.might_contain(value) for value in values)
+    false_positives = sum(bloom.might_contain(value) for value in range(50_000, 60_000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_save_and_load(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    bloom = BloomFilter.for_capacity(10)
+    bloom.add(123)
+    bloom.save(path)
+    loaded = BloomFilter.load(path)
+    assert (loaded.num_bits, loaded.num_hashes) == (bloom.num_bits, bloom.num_hashes)
+    assert loaded.might_contain(123)
+    mapped = loaded.bits.obj
+    loaded.bits.release()
+    mapped.close()
+
+
+def test_pcode_store_membership_and_persistence(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    store = PcodeStore(path)
+    store.add("200")
+    store.add(100)
+    store.add("100")
+    store.add("not-a-pcode")
+    assert len(store) == 2
+    assert "100" in store and 200 in store and "300" not in store
+    store.close()
+
+    reopened = PcodeStore(path)
+    assert len(reopened) == 2 and "200" in reopened
+    reopened.compact()
+    assert not os.path.exists(path + ".log")
+    reopened.add(150)
+    reopened.close()
+
+    merged = PcodeStore(path)
+    assert [key in merged for key in (100, 150, 200, 175)] == [True, True, True, False]
+    merged.compact()
+    assert len(merged) == 3
+    merged.close()
+
+
+def test_pcode_store_with_bloom_filter(tmp_path):
+    path = str(tmp_path / "seen.bin")
+    store = PcodeStore(path, use_bloom=True)
+    for key in range(1, 50):
+        store.add(key)
+    store.compact()
+    assert os.path.exists(path + ".bloom")
+    store.close()
+
+    reopened = PcodeStore(path, use_bloom=True)
+    assert reopened.bloom is not None
+    assert all(key in reopened for key in range(1, 50))
+    assert 10_000 not in reopened
+    reopened.close()
+
+
+def test_pcode_store_rejects_foreign_file(tmp_path):
+    path = tmp_path / "seen.bin"
+    path.write_bytes(b"not a pcode store at all")
+    with pytest.raises(ValueError):
+        PcodeStore(str(path))
+
+
+def test_seen_products_counts_duplicates_and_known(tmp_path):
+    store = PcodeStore(str(tmp_path / "seen.bin"))
+    store.add("1")
+    seen = SeenProducts(store)
+    assert seen.add("1") is False
+    assert seen.add("2") is True
+    assert seen.add("2") is False
+    seen.mark_done("2")
+    assert (seen.known, seen.duplicates, len(seen)) == (1, 1, 2)
+    assert "2" in store
+    store.close()
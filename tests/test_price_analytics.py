@@ -0,0 +1,72 @@
+import csv
+import math
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from danawa_crawler.analytics import analyze_price_trends  # noqa: E402
+from danawa_crawler.extract import encode_price_trend  # noqa: E402
+
+
+def trend(*points):
+    return encode_price_trend({"1": [{"label": label, "price": price} for label, price in points]})
+
+
+@pytest.fixture
+def output_csv(tmp_path):
+    path = tmp_path / "out.csv"
+    rows = [
+        ("노트북", "A", "1", trend(("24.01.01", 1000), ("24.01.25", 900), ("24.02.01", 800))),
+        ("노트북", "B", "2", trend(("03.01", 500), ("03.08", 600))),
+        ("모니터", "C", "3", ""),
+    ]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["카테고리", "상품명", "URL", "가격추이", "상세정보"])
+        for category, title, pcode, cell in rows:
+            writer.writerow([category, title, f"https://prod.danawa.com/info/?pcode={pcode}", cell, ""])
+    return str(path)
+
+
+def read(path):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def test_product_statistics(output_csv):
+    stats_path, _ = analyze_price_trends(output_csv, change_weeks=(1, 4))
+    a, b, c = read(stats_path)
+
+    assert (a["관측수"], a["현재가"], a["최저"], a["최고"], a["평균"]) == ("3", "800", "800", "1000", "900")
+    assert a["변동성(%)"] == f"{math.sqrt(20000 / 3) / 900 * 100:.2f}"
+    # 1주 전(7일 전 1.25)은 900, 4주 전(28일 전)은 그 이전 가장 최근 관측인 1.1의 1000
+    assert a["1주변화(%)"] == f"{(800 / 900 - 1) * 100:.2f}"
+    assert a["4주변화(%)"] == "-20.00"
+
+    assert (b["관측수"], b["현재가"], b["평균"], b["변동성(%)"]) == ("2", "600", "550", f"{50 / 550 * 100:.2f}")
+    assert (b["1주변화(%)"], b["4주변화(%)"]) == ("20.00", "")
+
+    assert (c["관측수"], c["현재가"], c["최저"], c["변동성(%)"], c["1주변화(%)"]) == ("0", "", "", "", "")
+
+
+def test_category_statistics(output_csv):
+    _, categories_path = analyze_price_trends(output_csv, change_weeks=(1, 4))
+    laptops, monitors = read(categories_path)
+
+    assert (laptops["카테고리"], laptops["상품수"], laptops["추이있음"], laptops["평균현재가"]) == ("노트북", "2", "2", "700")
+    volatility_a = math.sqrt(20000 / 3) / 900 * 100
+    volatility_b = 50 / 550 * 100
+    assert laptops["평균변동성(%)"] == f"{(volatility_a + volatility_b) / 2:.2f}"
+    assert laptops["평균1주변화(%)"] == f"{((800 / 900 - 1) * 100 + 20) / 2:.2f}"
+    assert laptops["1주하락비율(%)"] == "50.00"
+    assert (laptops["평균4주변화(%)"], laptops["4주하락비율(%)"]) == ("-20.00", "100.00")
+
+    assert (monitors["상품수"], monitors["추이있음"], monitors["평균현재가"], monitors["1주하락비율(%)"]) == ("1", "0", "", "")
+
+
+def test_long_format_output_is_rejected(tmp_path):
+    path = tmp_path / "long.csv"
+    path.write_text("상품명,URL,key,value\n", encoding="utf-8-sig")
+    with pytest.raises(ValueError):
+        analyze_price_trends(str(path))
@@ -0,0 +1,60 @@
+import types
+
+import pytest
+
+from danawa_crawler import crawler
+
+
+class FakePage:
+    def __init__(self, list_appears):
+        self.list_appears = list_appears
+        self.calls = []
+        self.prices_loaded = False
+
+    def set_default_timeout(self, timeout):
+        pass
+
+    def goto(self, url, wait_until=None, timeout=None):
+        self.calls.append(("goto", wait_until))
+
+    def wait_for_selector(self, selector, state=None, timeout=None):
+        self.calls.append(("selector", selector))
+        if not self.list_appears:
+            raise TimeoutError("price list never appeared")
+        self.prices_loaded = True
+
+    def evaluate(self, script):
+        return "1,200원" if self.prices_loaded else ""
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fetch(monkeypatch):
+    def extract_price_range(page):
+        # 가격 목록이 채워지기 전에 읽으면 값이 없음
+        return (1000, 1500) if page.prices_loaded else (None, None)
+
+    def wait_for_network_idle(page):
+        page.calls.append(("networkidle", None))
+
+    monkeypatch.setattr(crawler, "extract_price_range", extract_price_range)
+    monkeypatch.setattr(crawler, "wait_for_network_idle", wait_for_network_idle)
+
+    def run(page):
+        return crawler.fetch_product_prices(types.SimpleNamespace(new_page=lambda: page), "12345")
+
+    return run
+
+
+def test_prices_are_read_after_the_price_list_appears(fetch):
+    page = FakePage(list_appears=True)
+    assert fetch(page) == {"최저가": "1000", "최고가": "1500", "현재가": "1200"}
+    assert page.calls == [("goto", "domcontentloaded"), ("selector", crawler.PRICE_LIST_WAIT_SELECTOR)]
+
+
+def test_missing_price_list_falls_back_to_network_idle(fetch):
+    page = FakePage(list_appears=False)
+    assert fetch(page) == {}
+    assert [name for name, _ in page.calls] == ["goto", "selector", "networkidle"]
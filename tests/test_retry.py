@@ -0,0 +1,86 @@
+import types
+
+import pytest
+
+from danawa_crawler import core
+from danawa_crawler.core import CircuitBreaker, RetryQueue, SuspectPageError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(core, "time", fake)
+    monkeypatch.setattr(core, "random", types.SimpleNamespace(uniform=lambda low, high: 1.0))
+    return fake
+
+
+def test_retry_queue_backs_off_exponentially_up_to_the_cap(clock):
+    retries = RetryQueue(max_attempts=10, base_delay_s=5.0, max_delay_s=30.0)
+    delays = [retries.record_failure("a", "boom") for _ in range(5)]
+    assert delays == [5.0, 10.0, 20.0, 30.0, 30.0]
+
+
+def test_retry_queue_gives_up_after_max_attempts(clock):
+    retries = RetryQueue(max_attempts=2, base_delay_s=1.0)
+    assert retries.record_failure("a", "first") == 1.0
+    assert retries.record_failure("a", "second") is None
+    assert retries.permanent_failures == {"a": "second"}
+
+
+def test_retry_queue_pops_in_ready_time_order(clock):
+    retries = RetryQueue(max_attempts=5, base_delay_s=10.0)
+    retries.attempts["slow"] = 1
+    assert retries.record_failure("slow", "x") == 20.0
+    retries.record_failure("fast", "x")
+    retries.record_failure("also-fast", "x")
+    assert retries.pop_ready() is None
+    assert retries.next_ready_in() == 10.0
+
+    clock.sleep(10.0)
+    assert [retries.pop_ready(), retries.pop_ready(), retries.pop_ready()] == ["fast", "also-fast", None]
+    clock.sleep(10.0)
+    assert retries.pop_ready() == "slow"
+    assert len(retries) == 0
+
+
+def test_circuit_breaker_waits_for_min_requests(clock):
+    breaker = CircuitBreaker(window=10, threshold=0.5, min_requests=4, cooldown_s=60.0)
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.trips == 0 and breaker.open_until == 0.0
+
+
+def test_circuit_breaker_opens_cools_down_and_closes(clock):
+    breaker = CircuitBreaker(window=10, threshold=0.5, min_requests=4, cooldown_s=60.0)
+    for success in (True, False, True, False):
+        breaker.record(success)
+    assert breaker.trips == 1
+    assert breaker.open_until == clock.now + 60.0
+
+    breaker.wait_if_open()
+    assert clock.now == 1060.0
+    for _ in range(4):
+        breaker.record(True)
+    breaker.wait_if_open()
+    assert (breaker.trips, clock.now) == (1, 1060.0)
+
+
+def test_circuit_breaker_ignores_deferred_products(clock):
+    breaker = CircuitBreaker(window=10, threshold=0.5, min_requests=2, cooldown_s=60.0)
+    for _ in range(4):
+        breaker.record_error(SuspectPageError("empty specs"))
+    assert breaker.trips == 0
+    breaker.record_error(RuntimeError("timeout"))
+    breaker.record_error(RuntimeError("timeout"))
+    assert breaker.trips == 1
@@ -0,0 +1,87 @@
+from danawa_crawler.extract import SelectorMemory
+
+VARIANTS = ["a", "b", "c"]
+
+
+def picker(memory, present, probed):
+    def probe(variant):
+        probed.append(variant)
+        return variant in present
+
+    return memory.pick("list:1", "slot", VARIANTS, probe)
+
+
+def test_hit_moves_the_matching_variant_first():
+    memory = SelectorMemory()
+    assert memory.order("list:1", "slot", VARIANTS) == VARIANTS
+    memory.record_hits("list:1", "slot", {"a": 0, "b": 2})
+    assert memory.order("list:1", "slot", VARIANTS) == ["b", "a", "c"]
+    assert memory.order("list:2", "slot", VARIANTS) == VARIANTS
+
+
+def test_all_misses_are_not_recorded():
+    memory = SelectorMemory()
+    for _ in range(SelectorMemory.DEAD_AFTER + 1):
+        memory.record_hits("list:1", "slot", {"a": 0, "b": 0, "c": 0})
+    assert memory.order("list:1", "slot", VARIANTS) == VARIANTS
+
+
+def test_variant_dies_after_repeated_misses_while_another_hits():
+    memory = SelectorMemory()
+    for _ in range(SelectorMemory.DEAD_AFTER):
+        assert "a" in memory.order("list:1", "slot", VARIANTS)
+        memory.record_hits("list:1", "slot", {"a": 0, "b": 1})
+    assert memory.order("list:1", "slot", VARIANTS) == ["b", "c"]
+
+    # 기억한 변형이 빗나가고 다른 변형이 맞으면 그 변형을 기억함
+    memory.record_hits("list:1", "slot", {"c": 1, "b": 0})
+    assert memory.order("list:1", "slot", VARIANTS) == ["c", "b"]
+    # 죽은 변형도 한 번 맞으면 빗나감 수가 0이 되어 다시 살아남
+    memory.record_hits("list:1", "slot", {"a": 1})
+    assert memory.order("list:1", "slot", VARIANTS) == ["a", "b", "c"]
+
+
+def test_pick_counts_misses_only_for_probed_variants():
+    memory = SelectorMemory()
+    probed = []
+    assert picker(memory, {"b", "c"}, probed) == "b"
+    assert probed == ["a", "b"]
+    state = memory._state("list:1", "slot")
+    assert state == {"good": "b", "misses": {"a": 1, "b": 0}}
+
+
+def test_pick_relearns_when_remembered_variants_all_miss():
+    memory = SelectorMemory()
+    for _ in range(SelectorMemory.DEAD_AFTER):
+        memory.record_hits("list:1", "slot", {"a": 0, "b": 1})
+    probed = []
+    assert picker(memory, {"a"}, probed) == "a"
+    assert probed == ["b", "c", "a"]
+    assert memory.order("list:1", "slot", VARIANTS)[0] == "a"
+
+    probed = []
+    assert picker(memory, set(), probed) is None
+    assert probed == ["a", "b", "c"]
+
+
+def test_first_hit_returns_the_result_of_the_attempt_that_hit():
+    memory = SelectorMemory()
+    for _ in range(SelectorMemory.DEAD_AFTER):
+        memory.record_hits("detail", "slot", {"a": 0, "b": 1})
+    attempts = []
+
+    def run(variants):
+        attempts.append(list(variants))
+        found = [variant for variant in variants if variant == "a"]
+        return found, {variant: int(variant == "a") for variant in variants}
+
+    assert memory.first_hit("detail", "slot", VARIANTS, run) == ["a"]
+    assert attempts == [["b", "c"], VARIANTS]
+
+
+def test_memory_persists_to_json(tmp_path):
+    path = str(tmp_path / "selectors.json")
+    memory = SelectorMemory(path)
+    memory.record_hits("list:1", "slot", {"a": 0, "b": 1})
+    memory.save()
+    assert SelectorMemory(path).order("list:1", "slot", VARIANTS) == ["b", "a", "c"]
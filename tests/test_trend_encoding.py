@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from danawa_crawler.extract import decode_price_trend, encode_price_trend
+
+
+def series(points):
+    return [{"label": label, "price": price} for label, price in points]
+
+
+def test_round_trip_with_overlapping_periods():
+    trend = {
+        "1": series([("24.03.01", 1200), ("24.03.15", 1100), ("24.04.01", 1100)]),
+        "3": series([("24.01.01", 1500), ("24.02.01", 1300), ("24.03.01", 1200), ("24.03.15", 1100), ("24.04.01", 1100)]),
+    }
+    encoded = encode_price_trend(trend)
+    assert decode_price_trend(encoded) == trend
+    payload = json.loads(encoded)
+    assert payload["f"] == "99.99.99"
+    assert len(payload["p"]) == 5  # 겹치는 점은 한 번만 저장
+
+
+def test_round_trip_keeps_leading_zeros_and_missing_prices():
+    trend = {"1": series([("01.05", None), ("01.06", 900), ("01.07", None), ("01.08", 950)])}
+    assert decode_price_trend(encode_price_trend(trend)) == trend
+
+
+def test_round_trip_with_mixed_label_shapes():
+    trend = {"12": series([("2023년", 3000), ("24.01", 2800), ("최근", 2500)])}
+    encoded = encode_price_trend(trend)
+    assert "l" in json.loads(encoded)
+    assert decode_price_trend(encoded) == trend
+
+
+def test_round_trip_keeps_period_order_and_repeated_points():
+    trend = {
+        "6": series([("24.01", 100), ("24.02", 100), ("24.02", 100)]),
+        "1": series([("24.02", 100)]),
+    }
+    decoded = decode_price_trend(encode_price_trend(trend))
+    assert decoded == trend and list(decoded) == ["6", "1"]
+
+
+def test_empty_and_legacy_values():
+    assert encode_price_trend({}) == ""
+    assert decode_price_trend("") == {}
+    legacy = {"1": [{"label": "24.01.01", "price": 100}]}
+    assert decode_price_trend(json.dumps(legacy)) == legacy
+
+
+def test_unknown_version_is_rejected():
+    with pytest.raises(ValueError):
+        decode_price_trend(json.dumps({"v": 99, "p": [], "s": []}))
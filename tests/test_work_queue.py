@@ -0,0 +1,82 @@
+import types
+
+import pytest
+
+from danawa_crawler import scheduler
+from danawa_crawler.scheduler import BatchCategory, WorkQueue
+
+CATEGORY_URL = "https://prod.danawa.com/list/?cate=112758"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = types.SimpleNamespace(now=1000.0)
+    fake.time = lambda: fake.now
+    monkeypatch.setattr(scheduler, "time", fake)
+    monkeypatch.setattr(scheduler, "random", types.SimpleNamespace(uniform=lambda low, high: 1.0))
+    return fake
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    work_queue = WorkQueue(str(tmp_path / "queue.db"))
+    category = BatchCategory(0, CATEGORY_URL, 2, None, 3, "out.csv")
+    assert work_queue.seed([category]) == 2
+    assert work_queue.seed([category]) == 0
+    return work_queue
+
+
+def test_lease_hands_out_each_task_once(queue):
+    first = queue.lease("node-a", lease_s=30)
+    second = queue.lease("node-b", lease_s=30)
+    assert (first["kind"], first["page"], second["page"]) == ("list", 1, 2)
+    assert queue.lease("node-c", lease_s=30) is None
+    assert queue.counts()["leased"] == 2
+
+
+def test_expired_lease_is_released_to_another_node(queue, clock):
+    task = queue.lease("node-a", lease_s=30)
+    queue.lease("node-a", lease_s=30)
+    clock.now += 20
+    assert queue.heartbeat(task["id"], "node-a", lease_s=30)
+    clock.now += 15  # 연장하지 않은 두 번째 작업만 만료
+    again = queue.lease("node-b", lease_s=30)
+    assert again["id"] != task["id"]
+    clock.now += 20
+    assert queue.lease("node-b", lease_s=30)["id"] == task["id"]
+    assert not queue.heartbeat(task["id"], "node-a", lease_s=30)
+    # 만료된 노드의 실패 보고는 새 임대를 건드리지 않음
+    assert queue.fail(task["id"], "node-a", "late", max_attempts=3, base_delay_s=1.0) is None
+    assert queue.counts()["leased"] == 2
+
+
+def test_failures_back_off_then_give_up(queue, clock):
+    task = queue.lease("node-a", lease_s=30)
+    assert queue.fail(task["id"], "node-a", "boom", max_attempts=2, base_delay_s=10.0) == 10.0
+    other = queue.lease("node-a", lease_s=30)
+    assert other["id"] != task["id"]
+    assert queue.lease("node-a", lease_s=30) is None
+
+    clock.now += 10
+    retry = queue.lease("node-a", lease_s=30)
+    assert (retry["id"], retry["attempts"]) == (task["id"], 1)
+    assert queue.fail(task["id"], "node-a", "boom again", max_attempts=2, base_delay_s=10.0) is None
+    assert [row["error"] for row in queue.failed_tasks()] == ["boom again"]
+
+
+def test_listing_queues_details_up_to_the_category_limit(queue):
+    listing = queue.lease("node-a", lease_s=30)
+    links = [f"https://prod.danawa.com/info/?pcode={pcode}&cate=1" for pcode in (11, 12, 11, 13, 14)]
+    assert queue.complete_listing(listing["id"], CATEGORY_URL, listing["page"], links) == 3
+
+    queue.lease("node-a", lease_s=30)  # 2페이지 목록 작업
+    details = [queue.lease("node-a", lease_s=30) for _ in range(3)]
+    assert [task["kind"] for task in details] == ["detail"] * 3
+    assert [task["url"] for task in details] == [f"https://prod.danawa.com/info/?pcode={pcode}" for pcode in (11, 12, 13)]
+    for task in details:
+        queue.complete_detail(task["id"], task["url"], {"url": task["url"]}, "node-a")
+    queue.complete_detail(details[0]["id"], details[0]["url"], {"url": details[0]["url"]}, "node-b")
+
+    category = queue.categories()[0]
+    assert [detail["url"] for detail in queue.category_details(category)] == [task["url"] for task in details]
+    assert not queue.is_drained()